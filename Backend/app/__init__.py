@@ -1,16 +1,33 @@
+import os
 from flask import Flask
 from flask_cors import CORS
 from config import Config
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
+from app.utils.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    from app.services.request_metrics import instrument_pools
+    instrument_pools(app.config)
     db.init_app(app)
-    CORS(app)
+    migrate.init_app(
+        app, db,
+        directory=os.path.join(os.path.dirname(app.root_path), 'migrations'),
+        transaction_per_migration=True
+    )
+    from app.services import market_data
+    market_data.init_app(app)
+    from app.services.quote_cache import quote_cache
+    quote_cache.init_app(app)
+    from app.services.request_metrics import request_metrics
+    request_metrics.init_app(app)
+    CORS(app, expose_headers=['X-Next-Cursor', 'X-Total-Count'])
     jwt = JWTManager(app)
 
     from app.routes.stock import stock_bp
@@ -25,6 +42,9 @@ def create_app():
     from app.routes.admin_auth import admin_auth
     from app.routes.help import help_bp
     from app.routes.user import user_bp
+    from app.routes.stream import stream_bp
+    from app.routes.orders import orders_bp
+    from app.routes.backtest import backtest_bp
 
     app.register_blueprint(stock_bp, url_prefix='/api')
     app.register_blueprint(transaction_bp, url_prefix='/api')
@@ -36,6 +56,9 @@ def create_app():
     app.register_blueprint(news_bp, url_prefix='/api')
     app.register_blueprint(help_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(stream_bp, url_prefix='/api')
+    app.register_blueprint(orders_bp, url_prefix='/api')
+    app.register_blueprint(backtest_bp, url_prefix='/api')
     app.register_blueprint(admin_bp, url_prefix='/super-secret-admin-zone')
     app.register_blueprint(admin_auth, url_prefix='/super-secret-admin-zone')
     with app.app_context():
@@ -43,5 +66,33 @@ def create_app():
         from app.models.portfolio import Portfolio
         from app.models.transaction import Transaction
         from app.models.stock_cache import StockCache
+        from app.models.price_history import PriceBar, PriceHistorySync
+        from app.models.order import Order
+        from app.models.equity_snapshot import EquitySnapshot
+        from app.models.service_lease import ServiceLease
+
+    from app.services.price_refresher import price_refresher
+    price_refresher.init_app(app)
+    from app.services.leaderboard import leaderboard
+    leaderboard.init_app(app)
+    from app.services.forecast_service import forecast_service
+    forecast_service.init_app(app)
+    from app.services.equity_snapshots import snapshot_backfill
+    snapshot_backfill.init_app(app)
+    from app.services.backtest import backtester
+    backtester.init_app(app)
+    from app.services.history_store import history_store
+    history_store.init_app(app)
+    from app.services.help_cache import help_cache
+    help_cache.init_app(app)
+    from app.services.news_service import news_service
+    news_service.init_app(app)
+    from app.services.price_hub import price_hub
+    price_hub.init_app(app)
+    from app.services.order_engine import order_engine
+    order_engine.init_app(app)
+
+    from app.cli import register_commands
+    register_commands(app)
 
     return app
@@ -0,0 +1,102 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Print the full plan for every query.')
+@with_appcontext
+def check_query_plans_command(verbose):
+    """Flag hot-path queries that would do a full table scan."""
+    from app.utils.query_plan import check_query_plans
+
+    failed = 0
+    for result in check_query_plans():
+        if result['full_scans']:
+            failed += 1
+            click.echo(f"[!] {result['name']}: full scan on {', '.join(result['full_scans'])}")
+        else:
+            click.echo(f"[✔] {result['name']}")
+        if verbose or result['full_scans']:
+            for line in result['plan']:
+                click.echo(f'      {line}')
+
+    if failed:
+        raise click.ClickException(f'{failed} queries would scan a full table')
+
+
+@click.command('snapshot-equity')
+@click.option('--date', 'day', type=click.DateTime(formats=['%Y-%m-%d']), help='Snapshot up to this trading day instead of the last close.')
+@click.option('--user-id', 'user_ids', type=int, multiple=True, help='Limit to these users (repeatable).')
+@click.option('--rebuild', is_flag=True, help='Drop existing snapshots and backfill from the transaction history.')
+@with_appcontext
+def snapshot_equity_command(day, user_ids, rebuild):
+    """Write end-of-day equity snapshots; run daily after the close."""
+    from app.services.equity_snapshots import clear_snapshots, snapshot_equity
+
+    user_ids = list(user_ids) or None
+    if rebuild:
+        click.echo(f'Removed {clear_snapshots(user_ids)} snapshots')
+    written = snapshot_equity(day=day.date() if day else None, user_ids=user_ids)
+    click.echo(f'Wrote {written} snapshots')
+
+
+@click.group('ingest')
+def ingest_group():
+    """Bulk-load symbols and price history from CSV or Parquet files."""
+
+
+def _report(stats):
+    click.echo(
+        f'Imported {stats.rows} rows from {stats.files} files in {stats.seconds:.1f}s '
+        f'({stats.rows_per_second:,.0f} rows/s)'
+    )
+
+
+def _echo_file(path, rows):
+    click.echo(f'  {path}: {rows} rows')
+
+
+@ingest_group.command('symbols')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows read and written per batch.')
+@with_appcontext
+def ingest_symbols_command(paths, chunk_size):
+    """Upsert stock_cache rows (symbol, long_name, logo_url, price)."""
+    from app.services.ingest import IngestError, import_symbols
+
+    try:
+        _report(import_symbols(paths, chunk_size=chunk_size, on_file=_echo_file))
+    except IngestError as e:
+        raise click.ClickException(str(e))
+
+
+@ingest_group.command('history')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--interval', default='1d', show_default=True, help='Bar interval of the files.')
+@click.option('--symbol', help='Symbol for single-symbol files (defaults to the file name).')
+@click.option('--tz', help='Timezone of naive timestamps (defaults to MARKET_TIMEZONE).')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows read and written per batch.')
+@with_appcontext
+def ingest_history_command(paths, interval, symbol, tz, chunk_size):
+    """Upsert OHLCV bars into price_history."""
+    from app.services.ingest import IngestError, import_history
+
+    try:
+        stats = import_history(
+            paths,
+            interval=interval,
+            tz=tz or current_app.config['MARKET_TIMEZONE'],
+            symbol=symbol,
+            chunk_size=chunk_size,
+            on_file=_echo_file
+        )
+    except IngestError as e:
+        raise click.ClickException(str(e))
+    _report(stats)
+
+
+def register_commands(app):
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(snapshot_equity_command)
+    app.cli.add_command(ingest_group)
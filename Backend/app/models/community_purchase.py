@@ -3,6 +3,10 @@ from datetime import datetime
 
 class CommunityPurchase(db.Model):
     __tablename__ = 'community_purchase'
+    __table_args__ = (
+        db.Index('uq_community_purchase_user_id_item_id', 'user_id', 'item_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     item_id = db.Column(db.Integer, db.ForeignKey('community_shop.id'), nullable=False)
@@ -3,6 +3,10 @@ from datetime import datetime
 
 class CommunityShop(db.Model):
     __tablename__ = 'community_shop'
+    __table_args__ = (
+        db.Index('ix_community_shop_available', 'available'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -0,0 +1,11 @@
+from app import db
+
+class EquitySnapshot(db.Model):
+    __tablename__ = 'equity_snapshots'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # trading day, in the market timezone
+    cash = db.Column(db.Float, nullable=False)
+    positions_value = db.Column(db.Float, nullable=False)
+    equity = db.Column(db.Float, nullable=False)
+    positions = db.Column(db.JSON, nullable=False)  # {symbol: shares} at the close
@@ -1,10 +1,32 @@
 from app import db
+from sqlalchemy import event, inspect
+from app.utils.text import html_to_text
 
 class LearningArticle(db.Model):
     __tablename__ = 'learning_articles'
+    __table_args__ = (
+        db.Index('ix_learning_articles_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     summary = db.Column(db.Text)
     content = db.Column(db.Text)
+    content_text = db.Column(db.Text)  # plain text derived from content, kept in sync below
     source_url = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=db.func.now())
+
+    def ensure_content_text(self):
+        # Rows written before content_text existed, or by bulk inserts that
+        # skip the ORM events, are filled in on first read
+        if self.content_text is None and self.content is not None:
+            self.content_text = html_to_text(self.content)
+            return True
+        return False
+
+
+@event.listens_for(LearningArticle, 'before_insert')
+@event.listens_for(LearningArticle, 'before_update')
+def _render_content_text(mapper, connection, target):
+    if target.content_text is None or inspect(target).attrs.content.history.has_changes():
+        target.content_text = html_to_text(target.content)
@@ -0,0 +1,26 @@
+from app import db
+from datetime import datetime
+
+class Order(db.Model):
+    __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_status_symbol', 'status', 'symbol'),
+        db.Index('ix_orders_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    symbol = db.Column(db.String(10), nullable=False)
+    side = db.Column(db.String(4), nullable=False)  # BUY / SELL
+    order_type = db.Column(db.String(10), nullable=False)  # LIMIT / STOP / STOP_LIMIT
+    shares = db.Column(db.Float, nullable=False)
+    limit_price = db.Column(db.Float, nullable=True)
+    stop_price = db.Column(db.Float, nullable=True)
+    time_in_force = db.Column(db.String(3), nullable=False, default='GTC')  # GTC / DAY
+    status = db.Column(db.String(10), nullable=False, default='OPEN')  # OPEN / FILLED / CANCELLED / EXPIRED / REJECTED
+    triggered = db.Column(db.Boolean, nullable=False, default=False)  # stop reached on a STOP_LIMIT order
+    reason = db.Column(db.String(255), nullable=True)
+    fill_price = db.Column(db.Float, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    filled_at = db.Column(db.DateTime, nullable=True)
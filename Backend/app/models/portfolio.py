@@ -3,7 +3,10 @@ from datetime import datetime
 
 class Portfolio(db.Model):
     __tablename__ = 'portfolio'
-    
+    __table_args__ = (
+        db.Index('uq_portfolio_user_id_symbol', 'user_id', 'symbol', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     symbol = db.Column(db.String(10), nullable=False)
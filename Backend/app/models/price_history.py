@@ -0,0 +1,23 @@
+from app import db
+from datetime import datetime
+
+class PriceBar(db.Model):
+    __tablename__ = 'price_history'
+
+    symbol = db.Column(db.String(10), primary_key=True)
+    interval = db.Column(db.String(5), primary_key=True)
+    ts = db.Column(db.DateTime, primary_key=True)  # UTC bar start
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    volume = db.Column(db.Float, nullable=True)
+
+class PriceHistorySync(db.Model):
+    __tablename__ = 'price_history_sync'
+
+    symbol = db.Column(db.String(10), primary_key=True)
+    interval = db.Column(db.String(5), primary_key=True)
+    period = db.Column(db.String(10), nullable=False)  # longest period fetched so far
+    tz = db.Column(db.String(50), nullable=True)  # exchange timezone reported by the provider
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,8 @@
+from app import db
+
+class ServiceLease(db.Model):
+    __tablename__ = 'service_leases'
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)  # host:pid:nonce of the process running the service
+    expires_at = db.Column(db.DateTime, nullable=False)
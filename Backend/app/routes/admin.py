@@ -10,23 +10,71 @@ from app.models.community_shop import CommunityShop
 from app.models.community_purchase import CommunityPurchase
 from app.models.stock_cache import StockCache
 from app.utils.auth import admin_required
+from app.utils.replica import use_replica
+from app.services.quote_cache import quote_cache
+from app.services.leaderboard import leaderboard
+from app.services.valuation import value_users
+from app.services.transaction_history import history_response
+from app.services.admin_listing import Listing
 
 admin_bp = Blueprint('admin_bp', __name__)
 
+USER_LISTING = Listing('users', {
+    'id': User.id,
+    'username': User.username,
+    'email': User.email,
+    'balance': User.balance,
+    'community_score': User.community_score
+}, filters=('id',), search=('username', 'email'))
+
+PORTFOLIO_LISTING = Listing('portfolio', {
+    'id': Portfolio.id,
+    'user_id': Portfolio.user_id,
+    'symbol': Portfolio.symbol,
+    'shares': Portfolio.shares,
+    'avg_price': Portfolio.avg_price,
+    'updated_at': Portfolio.updated_at
+}, filters=('user_id', 'symbol'), search=('symbol',))
+
+SHOP_LISTING = Listing('community_shop', {
+    'id': CommunityShop.id,
+    'name': CommunityShop.name,
+    'description': CommunityShop.description,
+    'cost': CommunityShop.cost,
+    'score_value': CommunityShop.score_value,
+    'emoji': CommunityShop.emoji,
+    'available': CommunityShop.available
+}, filters=('available',), search=('name',))
+
+STOCK_CACHE_LISTING = Listing('stock_cache', {
+    'id': StockCache.id,
+    'symbol': StockCache.symbol,
+    'price': StockCache.price,
+    'last_updated': StockCache.last_updated
+}, filters=('symbol',), search=('symbol',))
+
 # _____________USERS_____________________
 
 @admin_bp.route('/admin/users', methods=['GET'])
 @admin_required
+@use_replica
 def get_users():
-    users = User.query.all()
-    user_list = [{
+    return USER_LISTING.response(request.args)
+
+@admin_bp.route('/admin/users/valuation', methods=['GET'])
+@admin_required
+@use_replica
+def get_users_valuation():
+    users = db.session.query(User.id, User.username, User.balance).all()
+    totals = value_users()
+    empty = {'portfolio_value': 0.0, 'total_cost_basis': 0.0, 'net_gain_loss': 0.0}
+    return jsonify([{
         'id': user.id,
         'username': user.username,
-        'email': user.email,
         'balance': user.balance,
-        'community_score': user.community_score
-    } for user in users]
-    return jsonify(user_list), 200
+        **totals.get(user.id, empty),
+        'total_equity': round(user.balance + totals.get(user.id, empty)['portfolio_value'], 2)
+    } for user in users]), 200
 
 @admin_bp.route('/admin/users/<int:user_id>', methods=['PUT'])
 @admin_required
@@ -40,6 +88,7 @@ def update_user(user_id):
     user.balance = data.get('balance', user.balance)
     user.community_score = data.get('community_score', user.community_score)
     db.session.commit()
+    leaderboard.apply_user(user)
     return jsonify({'message': 'User updated'})
 
 @admin_bp.route('/admin/users/<int:user_id>', methods=['DELETE'])
@@ -50,51 +99,30 @@ def delete_user(user_id):
         return jsonify({'error': 'User not found'}), 404
     db.session.delete(user)
     db.session.commit()
+    leaderboard.remove_user(user_id)
     return jsonify({'message': 'User deleted'})
 
 # ----------- TRANSACTIONS --------------
 @admin_bp.route('/admin/transactions', methods=['GET'])
 @admin_required
+@use_replica
 def list_transactions():
-    txns = Transaction.query.all()
-    return jsonify([{
-        'id': t.id,
-        'user_id': t.user_id,
-        'symbol': t.symbol,
-        'shares': t.shares,
-        'price': t.price,
-        'type': t.type,
-        'timestamp': t.timestamp
-    } for t in txns])
+    user_id = request.args.get('user_id', type=int)
+    return history_response(user_id, default_fields=['id', 'user_id', 'symbol', 'shares', 'price', 'type', 'timestamp'])
 
 # ----------- PORTFOLIO --------------
 @admin_bp.route('/admin/portfolio', methods=['GET'])
 @admin_required
+@use_replica
 def list_portfolios():
-    portfolios = Portfolio.query.all()
-    return jsonify([{
-        'id': p.id,
-        'user_id': p.user_id,
-        'symbol': p.symbol,
-        'shares': p.shares,
-        'avg_price': p.avg_price,
-        'updated_at': p.updated_at
-    } for p in portfolios])
+    return PORTFOLIO_LISTING.response(request.args)
 
 # ----------- COMMUNITY SHOP --------------
 @admin_bp.route('/admin/community-shop', methods=['GET'])
 @admin_required
+@use_replica
 def list_community_shop():
-    items = CommunityShop.query.all()
-    return jsonify([{
-        'id': i.id,
-        'name': i.name,
-        'description': i.description,
-        'cost': i.cost,
-        'score_value': i.score_value,
-        'emoji': i.emoji,
-        'available': i.available
-    } for i in items])
+    return SHOP_LISTING.response(request.args)
 
 @admin_bp.route('/admin/community-shop', methods=['POST'])
 @admin_required
@@ -141,11 +169,11 @@ def delete_shop_item(item_id):
 # ----------- STOCK CACHE --------------
 @admin_bp.route('/admin/stock-cache', methods=['GET'])
 @admin_required
+@use_replica
 def list_stock_cache():
-    cache = StockCache.query.all()
-    return jsonify([{
-        'id': c.id,
-        'symbol': c.symbol,
-        'price': c.price,
-        'last_updated': c.last_updated
-    } for c in cache])
+    return STOCK_CACHE_LISTING.response(request.args)
+
+@admin_bp.route('/admin/quote-cache', methods=['GET'])
+@admin_required
+def quote_cache_stats():
+    return jsonify(quote_cache.stats()), 200
@@ -4,6 +4,7 @@ from app.models.user import User
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
 from datetime import datetime
+from app.services.leaderboard import leaderboard
 
 auth_bp = Blueprint('auth_bp', __name__)
 
@@ -46,6 +47,7 @@ def register():
     )
     db.session.add(new_user)
     db.session.commit()
+    leaderboard.apply_user(new_user)
 
     return jsonify({'message': 'User registered successfully'}), 201
 
@@ -0,0 +1,37 @@
+import math
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.backtest import backtester, BacktestError, BacktestTimeout
+
+backtest_bp = Blueprint('backtest_bp', __name__)
+
+
+@backtest_bp.route('/backtest', methods=['POST'])
+@jwt_required()
+def run_backtest():
+    data = request.json or {}
+    strategy = data.get('strategy')
+    symbols = data.get('symbols')
+    if not isinstance(strategy, dict) or not isinstance(symbols, list):
+        return jsonify({'error': 'symbols and strategy are required'}), 400
+
+    try:
+        symbols = list(dict.fromkeys(str(symbol).upper() for symbol in symbols))
+        end = date.fromisoformat(data['end']) if data.get('end') else date.today()
+        start = date.fromisoformat(data['start']) if data.get('start') else end - timedelta(days=365)
+        capital = float(data.get('capital', 100000))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid start, end or capital'}), 400
+    if start >= end or start >= date.today() or not math.isfinite(capital) or capital <= 0:
+        return jsonify({'error': 'Invalid start, end or capital'}), 400
+
+    try:
+        result = backtester.run(symbols, start, end, strategy, capital, sweep=data.get('sweep'))
+    except BacktestTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except BacktestError as e:
+        return jsonify({'error': str(e)}), 400
+
+    result.update({'symbols': symbols, 'start': start.isoformat(), 'end': end.isoformat(), 'capital': capital})
+    return jsonify(result), 200
@@ -4,7 +4,9 @@ from app.models.user import User
 from app.models.community_shop import CommunityShop
 from app.models.community_purchase import CommunityPurchase
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.leaderboard import leaderboard
 
 community_bp = Blueprint('community_bp', __name__)
 
@@ -49,7 +51,13 @@ def buy_item():
     
     purchase = CommunityPurchase(user_id=current_user_id, item_id=item_id, timestamp=datetime.utcnow())
     db.session.add(purchase)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request bought the same item first
+        db.session.rollback()
+        return jsonify({'error': 'Item already purchased'}), 400
+    leaderboard.apply_user(user)
 
     return jsonify({
         'message': 'Item purchased successfully',
@@ -1,37 +1,28 @@
-from flask import Blueprint, jsonify, request
-from app import db
-from app.models.learning_article import LearningArticle
-from bs4 import BeautifulSoup
+from flask import Blueprint, Response, jsonify, request
+from app.services.help_cache import help_cache, load_article
+from app.utils.replica import use_replica
 
 help_bp = Blueprint('help_bp', __name__)
 
+
+def _conditional(body, etag):
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Clients revalidate every time; unchanged content costs a 304
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @help_bp.route('/help/articles', methods=['GET'])
+@use_replica
 def get_all_articles():
-    articles = LearningArticle.query.order_by(LearningArticle.created_at.desc()).limit(10).all()
-    cleaned_articles = []
-    for a in articles:
-        soup = BeautifulSoup(a.content, 'lxml')
-        cleaned_content = soup.get_text(separator='\n')
-        cleaned_articles.append({
-            "id": a.id,
-            "title": a.title,
-            "content": cleaned_content,
-            "external_url": a.source_url
-        })
-    return jsonify(cleaned_articles), 200
+    body, etag = help_cache.list_articles()
+    return _conditional(body, etag)
 
 @help_bp.route('/help/article/<int:article_id>', methods=['GET'])
+@use_replica
 def get_article(article_id):
-    article = LearningArticle.query.get(article_id)
-    if not article:
+    rendered = load_article(article_id)
+    if rendered is None:
         return jsonify({"error": "Article not found"}), 404
-    
-    soup = BeautifulSoup(article.content, 'lxml')
-    cleaned_content = soup.get_text(separator='\n')
-
-    return jsonify({
-        "id": article.id,
-        "title": article.title,
-        "content": cleaned_content,
-        "external_url": article.source_url
-    }), 200
\ No newline at end of file
+    return _conditional(*rendered)
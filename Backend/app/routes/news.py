@@ -1,32 +1,17 @@
-from flask import Blueprint, jsonify, request
-import requests
-import os
+from flask import Blueprint, Response, jsonify, request
+from app.services.news_service import news_service, NewsUnavailable
 
 news_bp = Blueprint('news_bp', __name__)
 
-NEWS_API_KEY = os.getenv('NEWS_API_KEY')
-
 @news_bp.route('/news', methods=['GET'])
 def get_business_news():
-    url = "https://newsapi.org/v2/top-headlines"
-    params = {
-        'category': 'business',
-        'country': 'us',
-        'apiKey': NEWS_API_KEY,
-        'language': 'en',
-    }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        return jsonify({'error': 'Failed to fetch news'}), response.status_code
-    articles = response.json().get('articles', [])
-    top_news = [
-        {
-            'title': article['title'],
-            'description': article['description'],
-            'url': article['url'],
-            'publishedAt': article['publishedAt'],
-            'source': article['source']['name']
-        } for article in articles
-    ]
+    try:
+        body, etag = news_service.get_headlines()
+    except NewsUnavailable as e:
+        return jsonify({'error': 'Failed to fetch news'}), e.status
 
-    return jsonify(top_news), 200
\ No newline at end of file
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = news_service.ttl
+    return response.make_conditional(request)
@@ -0,0 +1,153 @@
+import math
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
+from app import db
+from app.models.user import User
+from app.models.order import Order
+from app.models.portfolio import Portfolio
+from app.services.order_engine import order_engine, order_entry
+from app.services.stock_service import get_stock_price
+from app.utils.market import next_market_close
+
+orders_bp = Blueprint('orders_bp', __name__)
+
+ORDER_TYPES = ('LIMIT', 'STOP', 'STOP_LIMIT')
+TIME_IN_FORCE = ('GTC', 'DAY')
+ORDER_STATUSES = ('OPEN', 'FILLED', 'CANCELLED', 'EXPIRED', 'REJECTED')
+
+
+def serialize_order(order):
+    return {
+        'id': order.id,
+        'symbol': order.symbol,
+        'type': order.side,
+        'order_type': order.order_type,
+        'shares': order.shares,
+        'limit_price': order.limit_price,
+        'stop_price': order.stop_price,
+        'time_in_force': order.time_in_force,
+        'status': order.status,
+        'triggered': order.triggered,
+        'reason': order.reason,
+        'fill_price': round(order.fill_price, 2) if order.fill_price is not None else None,
+        'created_at': order.created_at.isoformat() if order.created_at else None,
+        'expires_at': order.expires_at.isoformat() if order.expires_at else None,
+        'filled_at': order.filled_at.isoformat() if order.filled_at else None
+    }
+
+
+def _price(data, key):
+    value = data.get(key)
+    if value is None:
+        return None
+    value = float(value)
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError(key)
+    return value
+
+
+@orders_bp.route('/orders', methods=['POST'])
+@jwt_required()
+def place_order():
+    # Without the engine nothing would ever match a resting order
+    if not order_engine.enabled:
+        return jsonify({'error': 'Limit and stop orders are not available'}), 503
+    data = request.json or {}
+    user_id = int(get_jwt_identity())
+    try:
+        symbol = str(data.get('symbol') or '').upper()
+        side = str(data.get('type', '')).upper()
+        order_type = str(data.get('order_type', '')).upper()
+        time_in_force = str(data.get('time_in_force', 'GTC')).upper()
+        shares = float(data.get('shares', 0))
+        limit_price = _price(data, 'limit_price')
+        stop_price = _price(data, 'stop_price')
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Missing or invalid data'}), 400
+
+    if not symbol or side not in ('BUY', 'SELL') or not math.isfinite(shares) or shares <= 0:
+        return jsonify({'error': 'Missing or invalid data'}), 400
+    if order_type not in ORDER_TYPES:
+        return jsonify({'error': f"Invalid order_type. Choose from: {', '.join(ORDER_TYPES)}"}), 400
+    if time_in_force not in TIME_IN_FORCE:
+        return jsonify({'error': f"Invalid time_in_force. Choose from: {', '.join(TIME_IN_FORCE)}"}), 400
+    if order_type in ('LIMIT', 'STOP_LIMIT') and limit_price is None:
+        return jsonify({'error': 'limit_price is required for this order type'}), 400
+    if order_type in ('STOP', 'STOP_LIMIT') and stop_price is None:
+        return jsonify({'error': 'stop_price is required for this order type'}), 400
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return jsonify({'error': 'User not found'}), 404
+    if side == 'SELL':
+        holding = Portfolio.query.filter_by(user_id=user_id, symbol=symbol).first()
+        if not holding or holding.shares < shares:
+            return jsonify({'error': 'Not enough shares to sell'}), 400
+    elif user.balance < shares * (limit_price or stop_price):
+        return jsonify({'error': 'Insufficient funds'}), 400
+
+    stock_data = get_stock_price(symbol)
+    if 'error' in stock_data:
+        return jsonify({'error': 'Stock price fetch failed'}), 400
+
+    order = Order(
+        user_id=user_id,
+        symbol=symbol,
+        side=side,
+        order_type=order_type,
+        shares=shares,
+        limit_price=limit_price if order_type != 'STOP' else None,
+        stop_price=stop_price if order_type != 'LIMIT' else None,
+        time_in_force=time_in_force,
+        status='OPEN',
+        triggered=False,
+        expires_at=next_market_close(current_app.config['MARKET_TIMEZONE']) if time_in_force == 'DAY' else None
+    )
+    db.session.add(order)
+    db.session.commit()
+    # Checked against the current price right away, so a marketable order fills immediately
+    order_engine.submit(order_entry(order), stock_data['price'])
+    return jsonify(serialize_order(order)), 201
+
+
+@orders_bp.route('/orders', methods=['GET'])
+@jwt_required()
+def list_orders():
+    user_id = int(get_jwt_identity())
+    status = request.args.get('status', '').upper()
+    query = Order.query.filter_by(user_id=user_id)
+    if status:
+        if status not in ORDER_STATUSES:
+            return jsonify({'error': f"Invalid status. Choose from: {', '.join(ORDER_STATUSES)}"}), 400
+        query = query.filter_by(status=status)
+    orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(500).all()
+    return jsonify([serialize_order(order) for order in orders]), 200
+
+
+@orders_bp.route('/orders/<int:order_id>', methods=['GET'])
+@jwt_required()
+def get_order(order_id):
+    order = Order.query.filter_by(id=order_id, user_id=int(get_jwt_identity())).first()
+    if not order:
+        return jsonify({'error': 'Order not found'}), 404
+    return jsonify(serialize_order(order)), 200
+
+
+@orders_bp.route('/orders/<int:order_id>', methods=['DELETE'])
+@jwt_required()
+def cancel_order(order_id):
+    user_id = int(get_jwt_identity())
+    cancelled = db.session.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.user_id == user_id, Order.status == 'OPEN')
+        .values(status='CANCELLED')
+    ).rowcount
+    db.session.commit()
+    if not cancelled:
+        order = Order.query.filter_by(id=order_id, user_id=user_id).first()
+        if not order:
+            return jsonify({'error': 'Order not found'}), 404
+        return jsonify({'error': f'Order is already {order.status.lower()}'}), 400
+    order_engine.cancel(order_id)
+    return jsonify({'message': 'Order cancelled', 'id': order_id}), 200
@@ -1,10 +1,13 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+import numpy as np
+import pytz
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from app.models.user import User
-from app.models.transaction import Transaction
-from app.models.portfolio import Portfolio
-from app.services.stock_service import get_stock_price
-from datetime import datetime
+from app.models.equity_snapshot import EquitySnapshot
+from app.services.valuation import value_portfolio
+from app.services.equity_snapshots import performance, snapshot_backfill, snapshots_behind
+from app.services.market_data import period_to_timedelta
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 portfolio_bp = Blueprint('portfolio_bp', __name__)
@@ -13,34 +16,11 @@ portfolio_bp = Blueprint('portfolio_bp', __name__)
 @jwt_required()
 def get_portfolio():
     user_id = get_jwt_identity()
-    portfolio_entries = Portfolio.query.filter_by(user_id=user_id).all()
-    portfolio_data = []
-    for entry in portfolio_entries:
-        stock_data = get_stock_price(entry.symbol)
-        if 'error' in stock_data:
-            # In a real app, you might want to handle this more gracefully
-            # For now, we can skip the entry or use a placeholder
-            market_price = entry.avg_price # fallback to average price
-        else:
-            market_price = stock_data.get('price')
-
-        market_value = entry.shares * market_price
-        profit = round(market_value - (entry.avg_price * entry.shares), 2)
-
-        entry_data = {
-            'symbol': entry.symbol,
-            'shares': entry.shares,
-            'avg_price': round(entry.avg_price, 2),
-            'market_price': round(market_price, 2),
-            'market_value': round(market_value, 2),
-            'profit': profit,
-            'total_invested': round(entry.avg_price * entry.shares, 2)
-        }
-        portfolio_data.append(entry_data)
+    valuation = value_portfolio(user_id)
 
     return jsonify({
         'user_id': user_id,
-        'portfolio': portfolio_data
+        'portfolio': valuation.rows()
     }), 200
 
 
@@ -52,31 +32,17 @@ def get_portfolio_value():
     if not user:
         return jsonify({'message': 'User not found'}), 404
 
-    portfolio_entries = Portfolio.query.filter_by(user_id=user_id).all()
-    total_value = 0.0
-    total_cost = 0.0
-    breakdown = []
-
-    for entry in portfolio_entries:
-        stock_data = get_stock_price(entry.symbol)
-        if 'error' in stock_data:
-            current_price = entry.avg_price # fallback
-        else:
-            current_price = stock_data.get('price')
-        
-        market_value = current_price * entry.shares if current_price else 0.0
-        cost = entry.avg_price * entry.shares
-        profit = market_value - cost
-        total_value += market_value
-        total_cost += cost
-        breakdown.append({
-            'symbol': entry.symbol,
-            'shares': entry.shares,
-            'avg_price': round(entry.avg_price, 2),
-            'current_price': round(current_price, 2) if current_price else None,
-            'market_value': round(market_value, 2),
-            'profit': round(profit, 2)
-        })
+    valuation = value_portfolio(user_id)
+    total_value = valuation.total_value
+    total_cost = valuation.total_cost
+    breakdown = [{
+        'symbol': row['symbol'],
+        'shares': row['shares'],
+        'avg_price': row['avg_price'],
+        'current_price': row['market_price'] if row['market_price'] else None,
+        'market_value': row['market_value'],
+        'profit': row['profit']
+    } for row in valuation.rows()]
 
     return jsonify({
         'user_id': user_id,
@@ -99,3 +65,68 @@ def get_portfolio_value():
         }
     }), 200
 
+
+@portfolio_bp.route('/portfolio/performance', methods=['GET'])
+@jwt_required()
+def get_portfolio_performance():
+    user_id = int(get_jwt_identity())
+    user = db.session.get(User, user_id)
+    if not user:
+        return jsonify({'message': 'User not found'}), 404
+
+    range = request.args.get('range', '1y')
+    try:
+        delta = period_to_timedelta(range)
+    except ValueError:
+        return jsonify({'error': 'Invalid range'}), 400
+
+    # Missing days are backfilled in the background; until then the series is
+    # whatever has been snapshotted plus today's live point
+    if snapshots_behind(user_id):
+        snapshot_backfill.request(user_id)
+    query = db.session.query(
+        EquitySnapshot.day, EquitySnapshot.cash, EquitySnapshot.positions_value, EquitySnapshot.equity
+    ).filter(EquitySnapshot.user_id == user_id)
+    if delta is not None:
+        query = query.filter(EquitySnapshot.day >= (datetime.utcnow() - delta).date())
+    rows = query.order_by(EquitySnapshot.day).all()
+
+    days = [row.day for row in rows]
+    cash = np.array([row.cash for row in rows], dtype=np.float64)
+    positions_value = np.array([row.positions_value for row in rows], dtype=np.float64)
+
+    # Today's point is valued live until tonight's snapshot is written
+    today = datetime.now(pytz.timezone(current_app.config['MARKET_TIMEZONE'])).date()
+    if not days or days[-1] < today:
+        days.append(today)
+        cash = np.append(cash, user.balance)
+        positions_value = np.append(positions_value, value_portfolio(user_id).total_value)
+
+    equity = cash + positions_value
+    returns, drawdown, summary = performance(equity)
+    daily_returns = [None] + np.round(returns, 6).tolist()
+
+    return jsonify({
+        'user_id': user_id,
+        'range': range,
+        'series': [
+            {
+                'date': day.isoformat(),
+                'equity': day_equity,
+                'cash': day_cash,
+                'positions_value': day_value,
+                'return': day_return,
+                'drawdown': day_drawdown
+            }
+            for day, day_equity, day_cash, day_value, day_return, day_drawdown in zip(
+                days,
+                np.round(equity, 2).tolist(),
+                np.round(cash, 2).tolist(),
+                np.round(positions_value, 2).tolist(),
+                daily_returns,
+                np.round(drawdown, 6).tolist()
+            )
+        ],
+        'summary': summary,
+        'backfilling': snapshot_backfill.is_pending(user_id)
+    }), 200
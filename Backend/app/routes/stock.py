@@ -1,8 +1,8 @@
-from flask import Blueprint, jsonify,request
+from flask import Blueprint, jsonify,request, current_app
 from app.services.stock_service import get_stock_price
-import yfinance as yf
-import pandas as pd
-from prophet import Prophet
+from app.services.history_store import history_store
+from app.utils.series import history_columns, history_rows, downsample
+from app.services.forecast_service import forecast_service
 
 stock_bp = Blueprint('stock_bp', __name__)
 
@@ -16,17 +16,35 @@ def fetch_history(symbol):
     symbol = symbol.upper()
     range = request.args.get('range', '1d')
     interval = request.args.get('interval', '1m')
+    response_format = request.args.get('format', 'rows')
+    points = request.args.get('points', type=int)
+    method = request.args.get('downsample', 'lttb')
     if not symbol:
         return jsonify({'error': 'Symbol is required'}), 400
+    if response_format not in ('rows', 'columnar'):
+        return jsonify({'error': 'Invalid format. Use "rows" or "columnar".'}), 400
+    if method not in ('lttb', 'ohlc'):
+        return jsonify({'error': 'Invalid downsample method. Use "lttb" or "ohlc".'}), 400
     try:
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period=range, interval=interval)
+        history = history_store.get_history(symbol, period=range, interval=interval)
         if history.empty:
             return jsonify({'error': 'No data found for the symbol'}), 404
-        history_list = [
-            {"date": str(idx.date()), "open": float(row['Open']), "close": float(row['Close'])}
-            for idx, row in history.iterrows()
-        ]
+        t, o, h, l, c, v = downsample(history_columns(history), points, method)
+
+        if response_format == 'columnar':
+            return jsonify({
+                'symbol': symbol,
+                'interval': interval,
+                'range': range,
+                't': t.tolist(),
+                'o': o.tolist(),
+                'h': h.tolist(),
+                'l': l.tolist(),
+                'c': c.tolist(),
+                'v': v.tolist()
+            }), 200
+
+        history_list = history_rows((t, o, h, l, c, v), history.index.tz)
         return jsonify({
             'symbol': symbol,
             'history': history_list,
@@ -39,32 +57,25 @@ def fetch_history(symbol):
 @stock_bp.route('/stock/forecast', methods=['GET'])
 def fetch_forecast():
     symbol = request.args.get('symbol', '').upper()
-    days = int(request.args.get('days', 7))
-
     if not symbol:
         return jsonify({'error': 'Symbol is required'}), 400
 
+    max_days = current_app.config.get('FORECAST_MAX_DAYS', 365)
     try:
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period='1y', interval='1d')
+        days = int(request.args.get('days', 7))
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    if not 1 <= days <= max_days:
+        return jsonify({'error': f'days must be between 1 and {max_days}'}), 400
 
-        if history.empty:
+    try:
+        forecast = forecast_service.forecast(symbol, days)
+        if forecast is None:
             return jsonify({'error': 'No historical data found to generate forecast'}), 404
 
-        df = history.reset_index()
-        df = df.rename(columns={'Date': 'ds', 'Close': 'y'})
-        df['ds'] = pd.to_datetime(df['ds']).dt.tz_localize(None)
-        df = df[['ds', 'y']]
-
-        model = Prophet()
-        model.fit(df)
-
-        future = model.make_future_dataframe(periods=days)
-        forecast = model.predict(future)
-
         return jsonify({
             'symbol': symbol,
-            'forecast': forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict(orient='records')
+            'forecast': forecast
         }), 200
     except Exception as e:
         return jsonify({'error': f'Failed to generate forecast for {symbol}: {str(e)}'}), 500
@@ -0,0 +1,138 @@
+import json
+import time
+from flask import Blueprint, Response, jsonify, request, stream_with_context, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from app.models.user import User
+from app.services.price_hub import price_hub
+from app.services.stock_service import get_stock_prices
+from app.services.valuation import Valuation, load_holdings
+
+stream_bp = Blueprint('stream_bp', __name__)
+
+
+# Milliseconds EventSource waits before reconnecting once a stream ends
+RECONNECT_MS = 3000
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def _too_many_streams():
+    response = jsonify({'error': 'Too many open streams, retry shortly'})
+    response.headers['Retry-After'] = str(RECONNECT_MS // 1000)
+    return response, 503
+
+
+def _event_stream(events, subscription):
+    # Streams end after PRICE_STREAM_MAX_AGE and the client reconnects, so a
+    # thread is never held indefinitely; the slot and subscription are
+    # released when the response closes, even if the stream never started
+    response = Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+    def release():
+        price_hub.unsubscribe(subscription)
+        price_hub.release_stream()
+    response.call_on_close(release)
+    return response
+
+
+def _wait(subscription, deadline):
+    # Waits for ticks until the next keepalive or the end of the stream's lifetime
+    return subscription.wait(max(min(price_hub.keepalive, deadline - time.monotonic()), 0))
+
+
+def _price_events(subscription):
+    deadline = time.monotonic() + price_hub.stream_lifetime
+    quotes = get_stock_prices(sorted(subscription.symbols))
+    db.session.rollback()
+    yield f'retry: {RECONNECT_MS}\n\n'
+    yield _sse('snapshot', list(quotes.values()))
+    while time.monotonic() < deadline:
+        ticks = _wait(subscription, deadline)
+        if not ticks:
+            yield ': keepalive\n\n'
+            continue
+        for symbol, (price, timestamp) in ticks.items():
+            yield _sse('price', {'symbol': symbol, 'price': round(price, 3), 'timestamp': timestamp})
+
+
+def _load_account(user_id):
+    holdings = load_holdings([user_id])
+    user = db.session.get(User, user_id)
+    balance = user.balance if user else 0.0
+    # Release the read transaction; the stream stays open for a long time
+    db.session.rollback()
+    return holdings, balance
+
+
+def _portfolio_events(user_id, subscription):
+    deadline = time.monotonic() + price_hub.stream_lifetime
+    yield f'retry: {RECONNECT_MS}\n\n'
+    holdings, balance = _load_account(user_id)
+    price_hub.update(subscription, set(holdings.symbol.tolist()))
+    prices = get_stock_prices(sorted(subscription.symbols)) if len(holdings) else {}
+    db.session.rollback()
+    last_value = None
+    while time.monotonic() < deadline:
+        valuation = Valuation(holdings, prices)
+        value = round(valuation.total_value, 2)
+        if value != last_value or subscription.holdings_changed:
+            yield _sse('portfolio', {
+                'portfolio_value': value,
+                'total_cost_basis': round(valuation.total_cost, 2),
+                'net_gain_loss': round(valuation.total_value - valuation.total_cost, 2),
+                'balance': round(balance, 2),
+                'total_equity': round(balance + valuation.total_value, 2),
+                'change': round(value - last_value, 2) if last_value is not None else 0.0
+            })
+            last_value = value
+
+        ticks = _wait(subscription, deadline)
+        if subscription.holdings_changed:
+            subscription.holdings_changed = False
+            holdings, balance = _load_account(user_id)
+            symbols = set(holdings.symbol.tolist())
+            missing = sorted(symbols - set(prices))
+            price_hub.update(subscription, symbols)
+            if missing:
+                prices.update(get_stock_prices(missing))
+                db.session.rollback()
+            last_value = None
+        elif not ticks:
+            yield ': keepalive\n\n'
+            continue
+        prices.update({symbol: {'price': price} for symbol, (price, _) in ticks.items()})
+
+
+# Streams hold one of the process's PRICE_STREAM_MAX_CONNECTIONS slots, so
+# only signed-in users may open them. EventSource cannot send headers, so
+# the token may also come as ?jwt=<token>
+@stream_bp.route('/stream/prices', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_prices():
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return jsonify({'error': 'At least one symbol is required'}), 400
+    if len(symbols) > price_hub.max_symbols:
+        return jsonify({'error': f'At most {price_hub.max_symbols} symbols per stream'}), 400
+    if not price_hub.acquire_stream():
+        return _too_many_streams()
+    subscription = price_hub.subscribe(symbols)
+    return _event_stream(_price_events(subscription), subscription)
+
+
+@stream_bp.route('/stream/portfolio', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_portfolio():
+    user_id = int(get_jwt_identity())
+    if not price_hub.acquire_stream():
+        return _too_many_streams()
+    subscription = price_hub.subscribe([], user_id)
+    return _event_stream(_portfolio_events(user_id, subscription), subscription)
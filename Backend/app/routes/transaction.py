@@ -1,125 +1,91 @@
-from flask import Blueprint, request, jsonify
-from app import db
-from app.models.user import User
-from app.models.transaction import Transaction
-from app.models.portfolio import Portfolio
-from app.services.stock_service import get_stock_price
-from datetime import datetime
+import math
+from flask import Blueprint, request, jsonify, current_app
+from app.services.order_service import execute_order, execute_batch
+from app.services.transaction_history import history_response
+from app.utils.replica import use_replica
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 transaction_bp = Blueprint('transaction_bp', __name__)
 
 
+def _symbol_and_shares(data):
+    # (None, None) unless the symbol is a non-blank string and shares a
+    # finite positive number; NaN compares false with everything, so it
+    # would pass `shares <= 0`
+    symbol = data.get('symbol')
+    try:
+        shares = float(data.get('shares', 0))
+    except (TypeError, ValueError):
+        return None, None
+    if not isinstance(symbol, str) or not symbol.strip() or not math.isfinite(shares) or shares <= 0:
+        return None, None
+    return symbol.strip(), shares
+
+
 @transaction_bp.route('/transaction/buy', methods=['POST'])
 @jwt_required()
 def buy_stock():
-    data = request.json
+    data = request.json or {}
     user_id = get_jwt_identity()
-    symbol = data.get('symbol')
-    shares = float(data.get('shares', 0))
+    symbol, shares = _symbol_and_shares(data)
     tz = data.get('tz')
 
-    if not all([user_id, symbol, shares]) or shares <= 0:
+    if not user_id or shares is None:
         return jsonify({'error': 'Missing or invalid data'}), 400
 
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
-    stock_data = get_stock_price(symbol)
-    if 'error' in stock_data:
-        return jsonify(stock_data), 500
-
-    price = stock_data['price']
-    total_cost = price * shares
-
-    if user.balance < total_cost:
-        return jsonify({'error': 'Insufficient funds'}), 400
-
-    # Update portfolio
-    portfolio = Portfolio.query.filter_by(user_id=user_id, symbol=symbol.upper()).first()
-    if portfolio:
-        new_total_shares = portfolio.shares + shares
-        portfolio.avg_price = ((portfolio.avg_price * portfolio.shares) + (price * shares)) / new_total_shares
-        portfolio.shares = new_total_shares
-    else:
-        portfolio = Portfolio(user_id=user_id, symbol=symbol.upper(), shares=shares, avg_price=price)
-        db.session.add(portfolio)
-
-    # Update balance and add transaction
-    user.balance -= total_cost
-    transaction = Transaction(user_id=user_id, symbol=symbol.upper(), shares=shares, price=price, type='BUY', timestamp=datetime.utcnow())
-    
-    db.session.add(transaction)
-    db.session.commit()
-
-    return jsonify({
-        'message': 'Stock purchased successfully',
-        'new_balance': user.balance
-    }), 200
+    result, status = execute_order(user_id, symbol, shares, 'BUY')
+    return jsonify(result), status
 
 
 @transaction_bp.route('/transaction/sell', methods=['POST'])
 @jwt_required()
 def sell_stock():
-    data = request.json
+    data = request.json or {}
     user_id = get_jwt_identity()
-    symbol = data.get('symbol')
-    shares = float(data.get('shares', 0))
+    symbol, shares = _symbol_and_shares(data)
 
-    if not all([user_id, symbol, shares]) or shares <= 0:
+    if not user_id or shares is None:
         return jsonify({'error': 'Missing or invalid data'}), 400
 
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
-    portfolio = Portfolio.query.filter_by(user_id=user_id, symbol=symbol.upper()).first()
-    if not portfolio or portfolio.shares < shares:
-        return jsonify({'error': 'Not enough shares to sell'}), 400
+    result, status = execute_order(user_id, symbol, shares, 'SELL')
+    return jsonify(result), status
 
-    stock_data = get_stock_price(symbol)
-    if 'error' in stock_data:
-        return jsonify({'error': 'Stock price fetch failed'}), 400
-    
-    price = stock_data['price']
-    total_earned = price * shares
-    user.balance += total_earned
 
-    portfolio.shares -= shares
-    if portfolio.shares == 0:
-        db.session.delete(portfolio)
-
-    transaction = Transaction(user_id=user_id, symbol=symbol.upper(), shares=shares, price=price, type='SELL', timestamp=datetime.utcnow())
-    
-    db.session.add(transaction)
-    db.session.commit()
+@transaction_bp.route('/transaction/batch', methods=['POST'])
+@jwt_required()
+def batch_orders():
+    data = request.json or {}
+    user_id = get_jwt_identity()
+    orders = data.get('orders')
 
-    return jsonify({
-        'message': 'Stock sold successfully',
-        'new_balance': user.balance
-    }), 200
+    if not isinstance(orders, list) or not orders:
+        return jsonify({'error': 'Missing or invalid data'}), 400
+    if len(orders) > current_app.config['TRANSACTION_BATCH_MAX_LEGS']:
+        return jsonify({'error': f"A batch can contain at most {current_app.config['TRANSACTION_BATCH_MAX_LEGS']} orders"}), 400
+
+    legs = []
+    for order in orders:
+        try:
+            symbol = order.get('symbol')
+            if not isinstance(symbol, str):
+                raise TypeError('symbol')
+            symbol = symbol.strip().upper()
+            side = str(order.get('type', '')).upper()
+            shares = float(order.get('shares', 0))
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({'error': 'Missing or invalid data'}), 400
+        # NaN compares false with everything, so it would pass `shares <= 0`
+        if not symbol or side not in ('BUY', 'SELL') or not math.isfinite(shares) or shares <= 0:
+            return jsonify({'error': 'Missing or invalid data'}), 400
+        legs.append({'symbol': symbol, 'side': side, 'shares': shares})
+
+    result, status = execute_batch(user_id, legs)
+    return jsonify(result), status
 
 
 @transaction_bp.route('/transaction/history', methods=['GET'])
 @jwt_required()
+@use_replica
 def transaction_history():
     user_id = get_jwt_identity()
-    transactions = Transaction.query.filter_by(user_id=user_id).order_by(Transaction.timestamp.desc()).all()
-    if not transactions:
-        return jsonify({'message': 'No transactions found for this user'}), 404
-    history = []
-    for transaction in transactions:
-        symbol = transaction.symbol
-        type  = transaction.type
-        shares = transaction.shares
-        price = round(transaction.price, 2)
-        timestamp = transaction.timestamp.isoformat()
-        history.append({
-            'symbol': symbol,
-            'type': type,
-            'shares': shares,
-            'price': price,
-            'timestamp': timestamp
-        })
-    return jsonify(history), 200
\ No newline at end of file
+    return history_response(user_id, empty_message='No transactions found for this user')
@@ -0,0 +1,100 @@
+from datetime import date, datetime
+from flask import Response, current_app, jsonify, stream_with_context
+from app import db
+from app.utils.pagination import page_size, parse_fields
+from app.utils.streaming import STREAM_CHUNK_SIZE, ndjson_lines, csv_chunks
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _coerce(column, raw):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return raw.lower() in TRUE_VALUES
+    if python_type in (int, float):
+        return python_type(raw)
+    return raw
+
+
+class Listing:
+    def __init__(self, name, columns, filters=(), search=(), default_sort='id'):
+        self.name = name
+        self.columns = columns
+        self.filters = filters
+        self.search = search
+        self.default_sort = default_sort
+
+    def _query(self, fields, args):
+        query = db.session.query(*[self.columns[field].label(field) for field in fields])
+
+        for field in self.filters:
+            if field in args:
+                query = query.filter(self.columns[field] == _coerce(self.columns[field], args[field]))
+
+        term = args.get('q')
+        if term and self.search:
+            pattern = f'%{term}%'
+            query = query.filter(db.or_(*[self.columns[field].ilike(pattern) for field in self.search]))
+
+        sort = args.get('sort', self.default_sort)
+        descending = sort.startswith('-')
+        column = self.columns[sort.lstrip('-')]
+        primary = self.columns['id']
+        if descending:
+            query = query.order_by(column.desc(), primary.desc())
+        else:
+            query = query.order_by(column.asc(), primary.asc())
+        return query
+
+    def _validate(self, args):
+        fields = parse_fields(args, self.columns, list(self.columns))
+        if fields is None:
+            return None, f"Invalid fields. Choose from: {', '.join(self.columns)}"
+        if args.get('sort', self.default_sort).lstrip('-') not in self.columns:
+            return None, f"Invalid sort. Choose from: {', '.join(self.columns)}"
+        for field in self.filters:
+            if field in args:
+                try:
+                    _coerce(self.columns[field], args[field])
+                except ValueError:
+                    return None, f'Invalid value for {field}'
+        return fields, None
+
+    def _rows(self, query):
+        for row in query.execution_options(yield_per=STREAM_CHUNK_SIZE):
+            yield [_serialize(value) for value in row]
+
+    def response(self, args):
+        fields, error = self._validate(args)
+        if error:
+            return jsonify({'error': error}), 400
+        query = self._query(fields, args)
+
+        response_format = args.get('format', 'json')
+        if response_format == 'ndjson':
+            return Response(stream_with_context(ndjson_lines(fields, self._rows(query))), mimetype='application/x-ndjson')
+        if response_format == 'csv':
+            return Response(
+                stream_with_context(csv_chunks(fields, self._rows(query))),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename={self.name}.csv'}
+            )
+        if response_format != 'json':
+            return jsonify({'error': 'Invalid format. Use "json", "ndjson" or "csv".'}), 400
+
+        limit = page_size(args, current_app.config['ADMIN_PAGE_SIZE'], current_app.config['ADMIN_PAGE_SIZE_MAX'])
+        page = args.get('page', 1, type=int)
+        if limit is None or page is None or page < 1:
+            return jsonify({'error': 'Invalid page or limit'}), 400
+
+        total = query.order_by(None).count()
+        rows = query.limit(limit).offset((page - 1) * limit).all()
+        response = jsonify([{field: _serialize(value) for field, value in zip(fields, row)} for row in rows])
+        response.headers['X-Total-Count'] = str(total)
+        return response, 200
@@ -0,0 +1,303 @@
+import itertools
+import multiprocessing
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, wait
+import numpy as np
+import pandas as pd
+from app.services.history_store import history_store, period_covering
+from app.services.order_service import blended_avg_price
+from app.services.equity_snapshots import performance
+
+MAX_WINDOW = 250
+# Signals need this much history before the first simulated day
+WARMUP = timedelta(days=MAX_WINDOW * 7 // 5 + 14)
+# Rebalance legs worth less than a cent are skipped
+MIN_TRADE_VALUE = 0.01
+
+
+class BacktestError(ValueError):
+    pass
+
+
+class BacktestTimeout(BacktestError):
+    pass
+
+
+# ----------- DATA --------------
+
+def load_prices(symbols, start, end):
+    # Aligned (dates, open, close) arrays over the union of trading days;
+    # a symbol's gaps are forward-filled and it is NaN before its first bar
+    panel = history_store.get_panel(symbols, period_covering(pd.Timestamp(start) - WARMUP))
+    missing = panel['close'].columns[panel['close'].isna().all()].tolist()
+    if missing:
+        raise BacktestError(f"No price history for {', '.join(missing)}")
+
+    # Daily bars start at midnight exchange time; shifting the UTC stamp by
+    # half a day lands on the session date for any exchange timezone
+    sessions = (pd.DatetimeIndex(panel['close'].index) + pd.Timedelta(hours=12)).normalize()
+    close = panel['close'].set_axis(sessions)
+    keep = close.index <= pd.Timestamp(end)
+    close = close[keep].ffill()
+    # Days without a bar for a symbol trade at its previous close
+    open_ = panel['open'].set_axis(sessions)[keep].fillna(close.shift())
+    start_row = int(np.searchsorted(close.index.values, np.datetime64(pd.Timestamp(start))))
+    if start_row >= len(close.index) - 1:
+        raise BacktestError('Not enough price history in the requested range')
+    return {
+        'dates': close.index.values.astype('datetime64[D]'),
+        'symbols': list(symbols),
+        'open': open_[symbols].to_numpy(),
+        'close': close[symbols].to_numpy(),
+        'start_row': start_row
+    }
+
+
+def rolling_mean(values, window):
+    # Trailing mean per column, NaN until `window` valid bars are available
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1, values.shape[1]))
+    total = np.vstack([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    count = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    out = np.full(values.shape, np.nan)
+    if window <= len(values):
+        window_count = count[window:] - count[:-window]
+        out[window - 1:] = np.where(window_count == window, (total[window:] - total[:-window]) / window, np.nan)
+    return out
+
+
+# ----------- STRATEGIES --------------
+# Each returns (target, trade): the target weight of equity per day and
+# symbol, and which symbols trade that day. Both describe the signal at the
+# close; fills happen at the next open.
+
+def _int_param(params, name, default, low, high):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise BacktestError(f'{name} must be an integer')
+    if not low <= value <= high:
+        raise BacktestError(f'{name} must be between {low} and {high}')
+    return value
+
+
+def sma_crossover(data, params):
+    fast = _int_param(params, 'fast', 20, 1, MAX_WINDOW)
+    slow = _int_param(params, 'slow', 50, 2, MAX_WINDOW)
+    if fast >= slow:
+        raise BacktestError('fast must be shorter than slow')
+    close = data['close']
+    long = rolling_mean(close, fast) > rolling_mean(close, slow)
+    # Every symbol gets an equal slice of equity while its fast average is above the slow one
+    target = long / close.shape[1]
+    trade = np.vstack([long[:1], long[1:] != long[:-1]])
+    return target, trade
+
+
+def rebalance(data, params):
+    every = _int_param(params, 'every', 21, 1, 2520)
+    weights = params.get('weights')
+    symbols = data['symbols']
+    if weights is None:
+        weights = {symbol: 1 / len(symbols) for symbol in symbols}
+    if not isinstance(weights, dict) or set(weights) - set(symbols):
+        raise BacktestError('weights must map symbols in the universe to target weights')
+    try:
+        vector = np.array([float(weights.get(symbol, 0)) for symbol in symbols])
+    except (TypeError, ValueError):
+        raise BacktestError('weights must be numbers')
+    if (vector < 0).any() or vector.sum() <= 0 or vector.sum() > 1 + 1e-9:
+        raise BacktestError('weights must be non-negative and sum to at most 1')
+
+    rows = len(data['close'])
+    target = np.tile(vector, (rows, 1))
+    trade = np.zeros(target.shape, dtype=bool)
+    # Counted from the first simulated day; the signal row is the close before it
+    first = max(data['start_row'] - 1, 0)
+    trade[first::every] = True
+    return target, trade
+
+
+STRATEGIES = {
+    'sma_crossover': sma_crossover,
+    'rebalance': rebalance,
+}
+
+
+# ----------- SIMULATION --------------
+
+def simulate(open_, close, target, trade, capital):
+    # Fills follow buy_stock/sell_stock: cost and proceeds are shares * price,
+    # buys need the cash, sells need the shares, and the average price blends
+    # on every buy. Buys that would overdraw are scaled to the cash left after
+    # the day's sells. Only days with a trade are stepped through; positions
+    # in between are constant, so the equity curve is filled in afterwards.
+    rows, width = close.shape
+    cash = float(capital)
+    shares = np.zeros(width)
+    avg_price = np.zeros(width)
+    events = np.flatnonzero(trade.any(axis=1))
+    event_shares = np.zeros((len(events), width))
+    event_cash = np.zeros(len(events))
+    fills = []
+    realized = 0.0
+
+    for k, row in enumerate(events):
+        price = np.nan_to_num(open_[row])
+        tradable = trade[row] & (price > 0)
+        equity = cash + shares @ price
+        desired = np.where(tradable, target[row] * equity / np.where(price > 0, price, 1.0), shares)
+        delta = np.where(np.abs(desired - shares) * price >= MIN_TRADE_VALUE, desired - shares, 0.0)
+
+        sold = np.where(delta < 0, np.minimum(-delta, shares), 0.0)
+        cash += sold @ price
+        realized += float(sold @ (price - avg_price))
+        shares = shares - sold
+
+        bought = np.where(delta > 0, delta, 0.0)
+        cost = bought @ price
+        if cost > cash:
+            bought = bought * (cash / cost)
+            cost = bought @ price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_price = np.where(bought > 0, blended_avg_price(shares, avg_price, bought, price), avg_price)
+        shares = shares + bought
+        cash = max(cash - cost, 0.0)
+        avg_price = np.where(shares > 0, avg_price, 0.0)
+
+        event_shares[k] = shares
+        event_cash[k] = cash
+        for column in np.flatnonzero(sold):
+            fills.append((row, column, 'SELL', sold[column], price[column]))
+        for column in np.flatnonzero(bought):
+            fills.append((row, column, 'BUY', bought[column], price[column]))
+
+    position = np.searchsorted(events, np.arange(rows), side='right')
+    held = np.vstack([np.zeros((1, width)), event_shares])[position]
+    cash_curve = np.concatenate([[float(capital)], event_cash])[position]
+    equity_curve = cash_curve + (held * np.nan_to_num(close)).sum(axis=1)
+    return equity_curve, cash_curve, fills, realized
+
+
+def run_strategy(data, strategy, capital, details=True):
+    kind = strategy.get('type')
+    if kind not in STRATEGIES:
+        raise BacktestError(f"Unknown strategy. Choose from: {', '.join(STRATEGIES)}")
+    params = {key: value for key, value in strategy.items() if key != 'type'}
+    target, trade = STRATEGIES[kind](data, params)
+
+    # Signals at close t fill at the open of t + 1, starting on the first day
+    start = data['start_row']
+    target = target[start - 1:-1] if start else np.vstack([np.zeros((1, target.shape[1])), target[:-1]])
+    trade = trade[start - 1:-1] if start else np.vstack([np.zeros((1, trade.shape[1]), dtype=bool), trade[:-1]])
+    # Positions are opened to the initial target on the first day
+    trade[0] = True
+    equity, cash, fills, realized = simulate(data['open'][start:], data['close'][start:], target, trade, capital)
+
+    returns, drawdown, summary = performance(equity)
+    summary.update({
+        'final_equity': round(float(equity[-1]), 2),
+        'realized_pnl': round(realized, 2),
+        'trades': len(fills)
+    })
+    result = {'strategy': strategy, 'summary': summary}
+    if details:
+        dates = data['dates'][start:]
+        result['series'] = [
+            {'date': str(day), 'equity': day_equity, 'cash': day_cash, 'drawdown': day_drawdown}
+            for day, day_equity, day_cash, day_drawdown in zip(
+                dates.tolist(),
+                np.round(equity, 2).tolist(),
+                np.round(cash, 2).tolist(),
+                np.round(drawdown, 6).tolist()
+            )
+        ]
+        result['trades'] = [
+            {
+                'date': str(dates[row]),
+                'symbol': data['symbols'][column],
+                'type': side,
+                'shares': round(float(shares), 6),
+                'price': round(float(price), 2)
+            }
+            for row, column, side, shares, price in fills
+        ]
+    return result
+
+
+def _run_many(data, strategies, capital):
+    return [run_strategy(data, strategy, capital, details=False) for strategy in strategies]
+
+
+def expand_sweep(strategy, sweep, limit):
+    if not sweep:
+        return [strategy]
+    if not isinstance(sweep, dict) or not all(isinstance(values, list) and values for values in sweep.values()):
+        raise BacktestError('sweep must map parameter names to non-empty lists')
+    names = list(sweep)
+    total = int(np.prod([len(sweep[name]) for name in names]))
+    if total > limit:
+        raise BacktestError(f'sweep has {total} combinations, the limit is {limit}')
+    return [dict(strategy, **dict(zip(names, values))) for values in itertools.product(*(sweep[name] for name in names))]
+
+
+class Backtester:
+    def __init__(self, workers=2, max_symbols=50, max_runs=200, timeout=120):
+        self.workers = workers
+        self.max_symbols = max_symbols
+        self.max_runs = max_runs
+        self.timeout = timeout
+        self._pool = None
+
+    def init_app(self, app):
+        self.workers = app.config.get('BACKTEST_WORKERS', self.workers)
+        self.max_symbols = app.config.get('BACKTEST_MAX_SYMBOLS', self.max_symbols)
+        self.max_runs = app.config.get('BACKTEST_MAX_RUNS', self.max_runs)
+        self.timeout = app.config.get('BACKTEST_TIMEOUT', self.timeout)
+        app.extensions['backtester'] = self
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def _abandon(self, futures):
+        # Queued chunks are dropped; chunks already running cannot be
+        # interrupted, so the pool is retired and the next sweep gets a fresh
+        # one instead of queueing behind them
+        for future in futures:
+            future.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def run(self, symbols, start, end, strategy, capital, sweep=None):
+        if not symbols or len(symbols) > self.max_symbols:
+            raise BacktestError(f'Between 1 and {self.max_symbols} symbols are required')
+        if strategy.get('type') not in STRATEGIES:
+            raise BacktestError(f"Unknown strategy. Choose from: {', '.join(STRATEGIES)}")
+        strategies = expand_sweep(strategy, sweep, self.max_runs)
+        data = load_prices(symbols, start, end)
+
+        if len(strategies) == 1:
+            return run_strategy(data, strategies[0], capital)
+
+        if self.workers <= 0:
+            results = _run_many(data, strategies, capital)
+        else:
+            # One chunk per worker, so the price arrays are pickled once per worker
+            chunks = [strategies[i::self.workers] for i in range(min(self.workers, len(strategies)))]
+            futures = [self._executor().submit(_run_many, data, chunk, capital) for chunk in chunks]
+            done, pending = wait(futures, timeout=self.timeout)
+            if pending:
+                self._abandon(futures)
+                raise BacktestTimeout(f'The sweep did not finish within {self.timeout} seconds; try fewer combinations')
+            results = [result for future in futures for result in future.result()]
+        results.sort(key=lambda result: result['summary']['total_return'] or 0, reverse=True)
+        return {'runs': len(results), 'results': results}
+
+
+backtester = Backtester()
@@ -0,0 +1,374 @@
+import logging
+import threading
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.user import User
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.models.equity_snapshot import EquitySnapshot
+from app.models.community_purchase import CommunityPurchase
+from app.models.community_shop import CommunityShop
+from app.services.history_store import history_store, period_covering
+from app.utils.market import last_session_date
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+# ----------- CALENDAR --------------
+
+def _days(values):
+    return np.asarray(values, dtype='datetime64[D]')
+
+
+def trading_days(start, end):
+    if start > end:
+        return _days([])
+    return _days(pd.bdate_range(pd.Timestamp(start), pd.Timestamp(end)).values)
+
+
+def local_days(timestamps, tz):
+    # Naive UTC timestamps -> trading date in the market timezone
+    index = pd.DatetimeIndex(list(timestamps)).tz_localize('UTC').tz_convert(tz)
+    return _days(index.tz_localize(None).normalize().values)
+
+
+def day_end(day, tz):
+    # Naive UTC instant the local day ends; anything earlier counts towards its close
+    following = pd.Timestamp(day) + pd.Timedelta(days=1)
+    return following.tz_localize(tz).tz_convert('UTC').tz_localize(None).to_pydatetime()
+
+
+# ----------- PRICES --------------
+
+def daily_closes(symbols, days):
+    # days x symbols matrix of the last close on or before each day; NaN
+    # where a symbol has no bar yet
+    closes = np.full((len(days), len(symbols)), np.nan)
+    if not len(days):
+        return closes
+    period = period_covering(days[0])
+    for column, symbol in enumerate(symbols):
+        try:
+            frame = history_store.get_history(symbol, period=period, interval='1d')
+        except Exception:
+            logger.warning('No daily history for %s, valuing it at trade prices', symbol)
+            continue
+        if frame.empty:
+            continue
+        # Daily bars are stamped with the session date in the exchange's timezone
+        index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+        bar_days = _days(index.normalize().values)
+        last = np.searchsorted(bar_days, days, side='right') - 1
+        found = last >= 0
+        closes[found, column] = frame['Close'].to_numpy(dtype=np.float64)[last[found]]
+    return closes
+
+
+def _fill_missing(closes, symbols, trades):
+    # Gaps fall back to the last traded price, then to the average cost
+    missing = np.isnan(closes).any(axis=0)
+    if not missing.any():
+        return closes
+    fallback = {trade.symbol: trade.price for trade in trades}
+    needed = [symbol for symbol, gap in zip(symbols, missing) if gap and symbol not in fallback]
+    if needed:
+        fallback.update(
+            db.session.query(Portfolio.symbol, func.avg(Portfolio.avg_price))
+            .filter(Portfolio.symbol.in_(needed))
+            .group_by(Portfolio.symbol)
+            .all()
+        )
+    for column in np.flatnonzero(missing):
+        gaps = np.isnan(closes[:, column])
+        closes[gaps, column] = fallback.get(symbols[column]) or 0.0
+    return closes
+
+
+# ----------- SNAPSHOTS --------------
+
+class SnapshotBatch:
+    def __init__(self, days, symbols, closes):
+        self.days = days
+        self.columns = {symbol: column for column, symbol in enumerate(symbols)}
+        self.closes = closes
+
+    def user_rows(self, user_id, balance, first_day, positions, trades, tz, purchases=()):
+        offset = np.searchsorted(self.days, np.datetime64(first_day, 'D'))
+        days = self.days[offset:]
+        if not len(days):
+            return []
+        symbols = sorted(set(positions) | {trade.symbol for trade in trades})
+        local = {symbol: i for i, symbol in enumerate(symbols)}
+
+        shares = np.tile(np.array([positions.get(symbol, 0.0) for symbol in symbols], dtype=np.float64), (len(days), 1))
+        cash = np.full(len(days), float(balance))
+        # Net cash moved on each day; index len(days) collects anything after the last one
+        flows = np.zeros(len(days) + 1)
+        if trades:
+            trade_day = np.searchsorted(days, local_days([trade.timestamp for trade in trades], tz), side='left')
+            signed = np.array([trade.shares if trade.type == 'BUY' else -trade.shares for trade in trades], dtype=np.float64)
+            prices = np.array([trade.price for trade in trades], dtype=np.float64)
+            column = np.array([local[trade.symbol] for trade in trades], dtype=np.int64)
+
+            inside = trade_day < len(days)
+            delta = np.zeros_like(shares)
+            np.add.at(delta, (trade_day[inside], column[inside]), signed[inside])
+            shares += np.cumsum(delta, axis=0)
+            flows += np.bincount(trade_day, weights=-signed * prices, minlength=len(days) + 1)
+        if purchases:
+            purchase_day = np.searchsorted(days, local_days([purchase.timestamp for purchase in purchases], tz), side='left')
+            costs = np.array([purchase.cost for purchase in purchases], dtype=np.float64)
+            flows += np.bincount(purchase_day, weights=-costs, minlength=len(days) + 1)
+
+        # Cash is anchored on the live balance: the cash at each close is the
+        # balance minus the net cash of every trade and shop purchase after it
+        later = np.cumsum(flows[::-1])[::-1]
+        cash -= later[1:len(days) + 1]
+
+        columns = np.array([self.columns[symbol] for symbol in symbols], dtype=np.int64)
+        values = shares * self.closes[offset:, columns]
+        positions_value = values.sum(axis=1)
+        equity = cash + positions_value
+        shares = np.round(shares, 6)
+
+        return [
+            {
+                'user_id': user_id,
+                'day': day,
+                'cash': day_cash,
+                'positions_value': day_value,
+                'equity': day_equity,
+                'positions': {symbol: held for symbol, held in zip(symbols, row) if held}
+            }
+            for day, day_cash, day_value, day_equity, row in zip(
+                days.astype(object).tolist(),
+                np.round(cash, 4).tolist(),
+                np.round(positions_value, 4).tolist(),
+                np.round(equity, 4).tolist(),
+                shares.tolist()
+            )
+        ]
+
+
+def _latest_snapshots(user_ids, target):
+    latest = (
+        select(EquitySnapshot.user_id, func.max(EquitySnapshot.day).label('day'))
+        .where(EquitySnapshot.user_id.in_(user_ids), EquitySnapshot.day <= target)
+        .group_by(EquitySnapshot.user_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(EquitySnapshot).join(
+            latest, (EquitySnapshot.user_id == latest.c.user_id) & (EquitySnapshot.day == latest.c.day)
+        )
+    ).scalars()
+    return {snapshot.user_id: snapshot for snapshot in rows}
+
+
+def _snapshot_users(users, target, tz):
+    user_ids = [user.id for user in users]
+    latest = _latest_snapshots(user_ids, target)
+
+    # Users with a snapshot roll forward from it and only need the trades
+    # made since; the rest are backfilled from when the account opened
+    plans = {}
+    for user in users:
+        prior = latest.get(user.id)
+        if prior is None:
+            plans[user.id] = (None, {}, None)
+        elif prior.day < target:
+            plans[user.id] = (prior.day + timedelta(days=1), dict(prior.positions), day_end(prior.day, tz))
+    if not plans:
+        return 0
+
+    since = [plan[2] for plan in plans.values()]
+    query = db.session.query(
+        Transaction.user_id, Transaction.timestamp, Transaction.symbol, Transaction.shares, Transaction.price, Transaction.type
+    ).filter(Transaction.user_id.in_(list(plans)))
+    if None not in since:
+        query = query.filter(Transaction.timestamp >= min(since))
+    trades = {}
+    for trade in query.order_by(Transaction.user_id, Transaction.timestamp, Transaction.id):
+        cutoff = plans[trade.user_id][2]
+        if cutoff is None or trade.timestamp >= cutoff:
+            trades.setdefault(trade.user_id, []).append(trade)
+
+    # Community shop purchases also spend cash. They store no price, so the
+    # item's current cost stands in for what was paid
+    query = db.session.query(
+        CommunityPurchase.user_id, CommunityPurchase.timestamp, CommunityShop.cost
+    ).join(CommunityShop, CommunityShop.id == CommunityPurchase.item_id).filter(
+        CommunityPurchase.user_id.in_(list(plans)), CommunityPurchase.timestamp.isnot(None)
+    )
+    if None not in since:
+        query = query.filter(CommunityPurchase.timestamp >= min(since))
+    purchases = {}
+    for purchase in query:
+        cutoff = plans[purchase.user_id][2]
+        if cutoff is None or purchase.timestamp >= cutoff:
+            purchases.setdefault(purchase.user_id, []).append(purchase)
+
+    for user in users:
+        plan = plans.get(user.id)
+        if plan is None or plan[0] is not None:
+            continue
+        opened = [user.created_at] if user.created_at else []
+        if user.id in trades:
+            opened.append(trades[user.id][0].timestamp)
+        if user.id in purchases:
+            opened.append(min(purchase.timestamp for purchase in purchases[user.id]))
+        if not opened:
+            del plans[user.id]
+            continue
+        plans[user.id] = (local_days([min(opened)], tz)[0].astype(object), {}, None)
+
+    plans = {user_id: plan for user_id, plan in plans.items() if plan[0] <= target}
+    if not plans:
+        return 0
+    days = trading_days(min(plan[0] for plan in plans.values()), target)
+    symbols = set()
+    for user_id, (_, positions, _) in plans.items():
+        symbols.update(positions)
+        symbols.update(trade.symbol for trade in trades.get(user_id, []))
+    symbols = sorted(symbols)
+    all_trades = [trade for user_trades in trades.values() for trade in user_trades]
+    batch = SnapshotBatch(days, symbols, _fill_missing(daily_closes(symbols, days), symbols, all_trades))
+
+    rows = []
+    for user in users:
+        plan = plans.get(user.id)
+        if plan is not None:
+            rows.extend(batch.user_rows(
+                user.id, user.balance or 0.0, plan[0], plan[1], trades.get(user.id, []), tz, purchases.get(user.id, [])
+            ))
+    if rows:
+        db.session.execute(insert(EquitySnapshot), rows)
+    return len(rows)
+
+
+def snapshot_equity(day=None, user_ids=None, batch_size=500):
+    # End-of-day job: writes one snapshot per user per trading day up to `day`
+    # (the last closed session by default). Safe to re-run; days that already
+    # have a snapshot are skipped.
+    tz = current_app.config['MARKET_TIMEZONE']
+    target = day or last_session_date(tz)
+    query = db.session.query(User.id, User.balance, User.created_at)
+    if user_ids is not None:
+        query = query.filter(User.id.in_(list(user_ids)))
+    users = query.order_by(User.id).all()
+
+    written = 0
+    for start in range(0, len(users), batch_size):
+        try:
+            written += _snapshot_users(users[start:start + batch_size], target, tz)
+            db.session.commit()
+        except IntegrityError:
+            # Another worker wrote the same days first
+            db.session.rollback()
+    return written
+
+
+def snapshots_behind(user_id):
+    tz = current_app.config['MARKET_TIMEZONE']
+    latest = db.session.query(func.max(EquitySnapshot.day)).filter(EquitySnapshot.user_id == user_id).scalar()
+    return latest is None or latest < last_session_date(tz)
+
+
+class SnapshotBackfill:
+    # Rolls users forward on a background thread when the scheduled job has
+    # not caught up, so a first read never backfills years of history inline
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._running = set()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['snapshot_backfill'] = self
+
+    def request(self, user_id):
+        with self._lock:
+            if user_id in self._pending or user_id in self._running:
+                return
+            self._pending.add(user_id)
+        self.start()
+        self._wake.set()
+
+    def is_pending(self, user_id):
+        with self._lock:
+            return user_id in self._pending or user_id in self._running
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='snapshot-backfill', daemon=True)
+            self._thread.start()
+
+    def run_pending(self):
+        with self._lock:
+            self._running, self._pending = self._pending, set()
+        if not self._running:
+            return 0
+        try:
+            return snapshot_equity(user_ids=sorted(self._running))
+        finally:
+            with self._lock:
+                self._running = set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    self.run_pending()
+                except Exception:
+                    logger.exception('Equity snapshot backfill failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+
+snapshot_backfill = SnapshotBackfill()
+
+
+def clear_snapshots(user_ids=None):
+    query = db.session.query(EquitySnapshot)
+    if user_ids is not None:
+        query = query.filter(EquitySnapshot.user_id.in_(list(user_ids)))
+    deleted = query.delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+# ----------- PERFORMANCE --------------
+
+def performance(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    if not len(equity):
+        return np.array([]), np.array([]), {
+            'total_return': None, 'max_drawdown': None, 'volatility': None, 'days': 0
+        }
+    previous = equity[:-1]
+    returns = np.divide(np.diff(equity), previous, out=np.zeros(len(previous)), where=previous != 0)
+    peak = np.maximum.accumulate(equity)
+    drawdown = np.divide(equity, peak, out=np.ones_like(equity), where=peak > 0) - 1
+    summary = {
+        'total_return': round(float(equity[-1] / equity[0] - 1), 6) if equity[0] else None,
+        'max_drawdown': round(float(drawdown.min()), 6),
+        # Annualised from daily returns
+        'volatility': round(float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)), 6) if len(returns) > 1 else None,
+        'days': len(equity)
+    }
+    return returns, drawdown, summary
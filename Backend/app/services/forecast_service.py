@@ -0,0 +1,175 @@
+import os
+import re
+import json
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+import pandas as pd
+from app.services.history_store import history_store
+
+MAX_HORIZONS_PER_MODEL = 16
+
+
+def _fit_model(records):
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+
+    df = pd.DataFrame(records)
+    df['ds'] = pd.to_datetime(df['ds'])
+    model = Prophet()
+    model.fit(df)
+    return model_to_json(model)
+
+
+class ForecastService:
+    def __init__(self, cache_dir=None, max_models=32, max_disk_models=256, workers=2, fit_timeout=300):
+        self.cache_dir = cache_dir
+        self.max_models = max_models
+        self.max_disk_models = max_disk_models
+        self.workers = workers
+        self.fit_timeout = fit_timeout
+        self._models = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def init_app(self, app):
+        # Fitted models are a disposable cache, kept out of the source tree by default
+        self.cache_dir = app.config.get('FORECAST_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'forecast_models')
+        self.max_models = app.config.get('FORECAST_CACHE_SIZE', self.max_models)
+        self.max_disk_models = app.config.get('FORECAST_DISK_CACHE_SIZE', self.max_disk_models)
+        self.workers = app.config.get('FORECAST_WORKERS', self.workers)
+        self.fit_timeout = app.config.get('FORECAST_FIT_TIMEOUT', self.fit_timeout)
+        app.extensions['forecast_service'] = self
+
+    # ----------- CACHE --------------
+
+    def _model_path(self, symbol):
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Z0-9._^=-]', '_', symbol) + '.json')
+
+    def _remember(self, key, model):
+        entry = {'model': model, 'forecasts': {}}
+        with self._lock:
+            self._models[key] = entry
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return entry
+
+    def _load_from_disk(self, symbol, last_date):
+        from prophet.serialize import model_from_json
+
+        path = self._model_path(symbol)
+        if not self.cache_dir or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            if stored.get('last_date') != last_date:
+                return None
+            return model_from_json(stored['model'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_to_disk(self, symbol, last_date, model_json):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._model_path(symbol)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'symbol': symbol, 'last_date': last_date, 'model': model_json}, f)
+        os.replace(tmp_path, path)
+
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        if len(files) > self.max_disk_models:
+            files.sort(key=os.path.getmtime)
+            for stale in files[:len(files) - self.max_disk_models]:
+                os.remove(stale)
+
+    # ----------- FITTING --------------
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def _submit_fit(self, records):
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(_fit_model(records))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._executor().submit(_fit_model, records)
+
+    def _get_model(self, symbol, last_date, df):
+        from prophet.serialize import model_from_json
+
+        key = (symbol, last_date)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry:
+                self._models.move_to_end(key)
+                return entry
+
+        model = self._load_from_disk(symbol, last_date)
+        if model is not None:
+            return self._remember(key, model)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                records = {'ds': df['ds'].astype(str).tolist(), 'y': df['y'].tolist()}
+                future = self._submit_fit(records)
+                self._inflight[key] = future
+
+        try:
+            model_json = future.result(timeout=self.fit_timeout)
+        finally:
+            if owner:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        with self._lock:
+            entry = self._models.get(key)
+        if entry:
+            return entry
+
+        if owner:
+            self._save_to_disk(symbol, last_date, model_json)
+        return self._remember(key, model_from_json(model_json))
+
+    def forecast(self, symbol, days):
+        history = history_store.get_history(symbol, period='1y', interval='1d')
+        if history.empty:
+            return None
+
+        df = history.reset_index()
+        df = df.rename(columns={df.columns[0]: 'ds', 'Close': 'y'})
+        df['ds'] = pd.to_datetime(df['ds']).dt.tz_localize(None)
+        df = df[['ds', 'y']]
+        last_date = df['ds'].max().date().isoformat()
+
+        entry = self._get_model(symbol, last_date, df)
+        forecasts = entry['forecasts']
+        if days in forecasts:
+            return forecasts[days]
+
+        model = entry['model']
+        future = model.make_future_dataframe(periods=days)
+        prediction = model.predict(future)
+        result = prediction[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict(orient='records')
+        if len(forecasts) < MAX_HORIZONS_PER_MODEL:
+            forecasts[days] = result
+        return result
+
+
+forecast_service = ForecastService()
@@ -0,0 +1,101 @@
+import json
+import time
+import hashlib
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models.learning_article import LearningArticle
+
+CHANGED_KEY = 'learning_articles_changed'
+
+
+def _article_payload(article):
+    return {
+        "id": article.id,
+        "title": article.title,
+        "content": article.content_text,
+        "external_url": article.source_url
+    }
+
+
+def _render(payload):
+    body = json.dumps(payload).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()
+
+
+def load_article(article_id):
+    article = db.session.get(LearningArticle, article_id)
+    if article is None:
+        return None
+    # Rendered before the commit expires the article, which would reload it
+    # from the replica in a use_replica view
+    changed = article.ensure_content_text()
+    rendered = _render(_article_payload(article))
+    if changed:
+        db.session.commit()
+    return rendered
+
+
+class HelpCache:
+    def __init__(self, ttl=300, limit=10):
+        self.ttl = ttl
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._entry = None
+        self._version = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('HELP_CACHE_TTL', self.ttl)
+        app.extensions['help_cache'] = self
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entry = None
+
+    def _build(self):
+        articles = LearningArticle.query.order_by(LearningArticle.created_at.desc()).limit(self.limit).all()
+        changed = any([article.ensure_content_text() for article in articles])
+        rendered = _render([_article_payload(article) for article in articles])
+        if changed:
+            db.session.commit()
+        return rendered
+
+    def list_articles(self):
+        # Returns (json body, etag); edits in this process invalidate on
+        # commit, edits from other workers show up once the ttl expires
+        with self._lock:
+            entry = self._entry
+            version = self._version
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1], entry[2]
+
+        body, etag = self._build()
+        with self._lock:
+            if self._version == version:
+                self._entry = (time.monotonic() + self.ttl, body, etag)
+        return body, etag
+
+
+help_cache = HelpCache()
+
+
+@event.listens_for(LearningArticle, 'after_insert')
+@event.listens_for(LearningArticle, 'after_update')
+@event.listens_for(LearningArticle, 'after_delete')
+def _mark_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop(CHANGED_KEY, False):
+        help_cache.invalidate()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop(CHANGED_KEY, None)
@@ -0,0 +1,215 @@
+import threading
+import logging
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.price_history import PriceBar, PriceHistorySync
+from app.services.market_data import HISTORY_COLUMNS, get_provider, period_to_timedelta
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SECONDS = {
+    '1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800,
+    '60m': 3600, '90m': 5400, '1h': 3600,
+    '1d': 86400, '5d': 432000, '1wk': 604800, '1mo': 2678400, '3mo': 8035200,
+}
+
+COVERING_PERIODS = ('1mo', '3mo', '6mo', '1y', '2y', '5y', '10y')
+
+
+def _period_rank(period):
+    delta = period_to_timedelta(period)
+    return timedelta.max if delta is None else delta
+
+
+def period_covering(start, padding=timedelta(days=7)):
+    # Shortest provider period that reaches back to `start`
+    age = pd.Timestamp.now(tz='UTC').tz_localize(None) - pd.Timestamp(start)
+    for period in COVERING_PERIODS:
+        if period_to_timedelta(period) > age + padding:
+            return period
+    return 'max'
+
+
+def _empty_frame():
+    frame = pd.DataFrame(columns=HISTORY_COLUMNS, dtype=float)
+    frame.index = pd.DatetimeIndex([], tz='UTC', name='Date')
+    return frame
+
+
+class HistoryStore:
+    def __init__(self, max_tail_age=900):
+        self.max_tail_age = max_tail_age
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def init_app(self, app):
+        self.max_tail_age = app.config.get('HISTORY_MAX_TAIL_AGE', self.max_tail_age)
+        app.extensions['history_store'] = self
+
+    def _lock_for(self, symbol, interval):
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    # ----------- WRITES --------------
+
+    def store_bars(self, symbol, interval, frame):
+        if frame is None or frame.empty:
+            return 0
+        # Filter first so the timestamps stay aligned with the remaining rows
+        frame = frame.fillna({'Volume': 0}).dropna(subset=['Close'])
+        index = pd.DatetimeIndex(frame.index)
+        index = index.tz_convert('UTC') if index.tz is not None else index.tz_localize('UTC')
+        stamps = index.tz_localize(None).to_pydatetime()
+        rows = [
+            {
+                'symbol': symbol,
+                'interval': interval,
+                'ts': ts,
+                'open': float(row[0]),
+                'high': float(row[1]),
+                'low': float(row[2]),
+                'close': float(row[3]),
+                'volume': float(row[4])
+            }
+            for ts, row in zip(stamps, frame[HISTORY_COLUMNS].itertuples(index=False, name=None))
+        ]
+        if not rows:
+            return 0
+        db.session.execute(
+            delete(PriceBar).where(
+                PriceBar.symbol == symbol,
+                PriceBar.interval == interval,
+                PriceBar.ts >= rows[0]['ts'],
+                PriceBar.ts <= rows[-1]['ts']
+            )
+        )
+        db.session.execute(insert(PriceBar), rows)
+        return len(rows)
+
+    def _record_sync(self, sync, symbol, interval, period, tz):
+        if sync is None:
+            sync = PriceHistorySync(symbol=symbol, interval=interval, period=period)
+            db.session.add(sync)
+        elif _period_rank(period) > _period_rank(sync.period):
+            sync.period = period
+        if tz:
+            sync.tz = tz
+        sync.synced_at = datetime.utcnow()
+        return sync
+
+    def mark_synced(self, symbol, interval, period, tz=None):
+        # Records bars loaded out of band, e.g. by a bulk import, so reads
+        # only refresh the tail instead of refetching the whole period
+        sync = db.session.get(PriceHistorySync, (symbol, interval))
+        return self._record_sync(sync, symbol, interval, period, tz)
+
+    def _sync(self, symbol, period, interval):
+        provider = get_provider()
+        sync = db.session.get(PriceHistorySync, (symbol, interval))
+        now = datetime.utcnow()
+
+        if sync is None or _period_rank(period) > _period_rank(sync.period):
+            frame = provider.get_history(symbol, period=period, interval=interval)
+            self.store_bars(symbol, interval, frame)
+            tz = str(frame.index.tz) if getattr(frame.index, 'tz', None) is not None else None
+            self._record_sync(sync, symbol, interval, period, tz)
+            return
+
+        max_age = min(INTERVAL_SECONDS.get(interval, 86400), self.max_tail_age)
+        if now - sync.synced_at < timedelta(seconds=max_age):
+            return
+
+        last_ts = db.session.query(db.func.max(PriceBar.ts)).filter_by(symbol=symbol, interval=interval).scalar()
+        try:
+            if last_ts is None:
+                raise ValueError('No stored bars')
+            frame = provider.get_history(symbol, interval=interval, start=pd.Timestamp(last_ts, tz='UTC'))
+        except Exception:
+            frame = provider.get_history(symbol, period=sync.period, interval=interval)
+        self.store_bars(symbol, interval, frame)
+        self._record_sync(sync, symbol, interval, sync.period, None)
+
+    # ----------- READS --------------
+
+    def _read(self, symbol, interval, since):
+        query = db.session.query(
+            PriceBar.ts, PriceBar.open, PriceBar.high, PriceBar.low, PriceBar.close, PriceBar.volume
+        ).filter(PriceBar.symbol == symbol, PriceBar.interval == interval)
+        if since is not None:
+            query = query.filter(PriceBar.ts >= since)
+        rows = query.order_by(PriceBar.ts).all()
+        if not rows:
+            return _empty_frame()
+        frame = pd.DataFrame.from_records(rows, columns=['Date'] + HISTORY_COLUMNS)
+        frame.index = pd.DatetimeIndex(pd.to_datetime(frame.pop('Date')), name='Date').tz_localize('UTC')
+        return frame
+
+    def _select_period(self, frame, period, tz):
+        if tz:
+            frame.index = frame.index.tz_convert(tz)
+        if frame.empty or not period or period == 'max':
+            return frame
+        if period.endswith('d') and period[:-1].isdigit():
+            # Day periods count trading sessions, matching the provider's behaviour
+            sessions = frame.index.normalize()
+            keep = sessions.unique()[-int(period[:-1]):]
+            return frame[sessions.isin(keep)]
+        last_bar = frame.index[-1]
+        return frame[frame.index >= last_bar - period_to_timedelta(period, last_bar)]
+
+    def sync(self, symbol, period, interval):
+        # Returns the sync error, if any, so callers can still serve stored bars
+        with self._lock_for(symbol, interval):
+            try:
+                self._sync(symbol, period, interval)
+                db.session.commit()
+            except IntegrityError:
+                # Another worker stored the same bars first
+                db.session.rollback()
+            except Exception as e:
+                db.session.rollback()
+                logger.exception('History sync failed for %s %s', symbol, interval)
+                return e
+        return None
+
+    def get_history(self, symbol, period='1d', interval='1m'):
+        symbol = symbol.upper()
+        delta = period_to_timedelta(period)
+        sync_error = self.sync(symbol, period, interval)
+
+        since = None
+        last_ts = db.session.query(db.func.max(PriceBar.ts)).filter_by(symbol=symbol, interval=interval).scalar()
+        if delta is not None and last_ts is not None:
+            # Over-read for day periods so weekends and holidays are covered
+            padding = delta * 2 + timedelta(days=5) if period.endswith('d') else delta
+            since = last_ts - padding
+        sync = db.session.get(PriceHistorySync, (symbol, interval))
+        frame = self._read(symbol, interval, since)
+        if frame.empty and sync_error is not None:
+            raise sync_error
+        return self._select_period(frame, period, sync.tz if sync else None)
+
+    def get_panel(self, symbols, period, interval='1d', columns=('open', 'close')):
+        # Bars for many symbols in one read: {column: DataFrame of dates x
+        # symbols}, indexed by naive UTC bar start
+        symbols = [symbol.upper() for symbol in symbols]
+        for symbol in symbols:
+            self.sync(symbol, period, interval)
+        statement = select(PriceBar.symbol, PriceBar.ts, *(getattr(PriceBar, column) for column in columns)).where(
+            PriceBar.symbol.in_(symbols), PriceBar.interval == interval
+        )
+        delta = period_to_timedelta(period)
+        if delta is not None:
+            statement = statement.where(PriceBar.ts >= datetime.utcnow() - delta)
+        frame = pd.DataFrame(db.session.execute(statement).all(), columns=['symbol', 'ts', *columns])
+        db.session.rollback()
+        return {
+            column: frame.pivot(index='ts', columns='symbol', values=column).reindex(columns=symbols).sort_index()
+            for column in columns
+        }
+
+
+history_store = HistoryStore()
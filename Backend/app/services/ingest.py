@@ -0,0 +1,246 @@
+import os
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from app import db
+from app.models.stock_cache import StockCache
+from app.models.price_history import PriceBar
+from app.services.history_store import history_store, COVERING_PERIODS
+from app.services.market_data import period_to_timedelta
+from app.utils.bulk import upsert
+
+TIME_COLUMNS = ('date', 'datetime', 'timestamp', 'ts', 'ds', '__index_level_0__')
+DATA_EXTENSIONS = ('.csv', '.parquet')
+
+
+class IngestError(ValueError):
+    pass
+
+
+class IngestStats:
+    def __init__(self):
+        self.rows = 0
+        self.files = 0
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def data_files(paths, exclude=()):
+    # Expands directories to the CSV/Parquet files directly inside them
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(DATA_EXTENSIONS) and name not in exclude
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def read_chunks(path, chunk_size):
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def _lower(frame):
+    frame.columns = [str(column).strip().lower() for column in frame.columns]
+    return frame
+
+
+def _text(values):
+    return [None if pd.isna(value) or value == '' else str(value) for value in values]
+
+
+# ----------- SYMBOLS --------------
+
+def _last_closes(symbols):
+    latest = (
+        db.session.query(PriceBar.symbol, func.max(PriceBar.ts).label('ts'))
+        .filter(PriceBar.symbol.in_(symbols), PriceBar.interval == '1d')
+        .group_by(PriceBar.symbol)
+        .subquery()
+    )
+    return dict(
+        db.session.query(PriceBar.symbol, PriceBar.close)
+        .join(latest, (PriceBar.symbol == latest.c.symbol) & (PriceBar.ts == latest.c.ts))
+        .filter(PriceBar.interval == '1d')
+        .all()
+    )
+
+
+def import_symbols(paths, chunk_size=5000, on_file=None):
+    # Columns: symbol, and optionally long_name, logo_url, price. Rows without
+    # a price take the last stored daily close; an existing cached price is
+    # only overwritten when the file provides one.
+    stats = IngestStats()
+    now = datetime.utcnow()
+    for path in data_files(paths):
+        file_rows = 0
+        for frame in read_chunks(path, chunk_size):
+            frame = _lower(frame)
+            if 'symbol' not in frame.columns:
+                raise IngestError(f'{path}: a symbol column is required')
+            frame = frame[frame['symbol'].notna()].drop_duplicates('symbol', keep='last')
+            symbols = frame['symbol'].astype(str).str.strip().str.upper().tolist()
+            prices = (
+                pd.to_numeric(frame['price'], errors='coerce').tolist() if 'price' in frame.columns
+                else [np.nan] * len(symbols)
+            )
+            closes = _last_closes(symbols)
+
+            update = ['last_updated']
+            for column in ('long_name', 'logo_url'):
+                if column in frame.columns:
+                    update.append(column)
+
+            priced, unpriced = [], []
+            for symbol, price, long_name, logo_url in zip(
+                symbols,
+                prices,
+                _text(frame['long_name']) if 'long_name' in frame.columns else [None] * len(symbols),
+                _text(frame['logo_url']) if 'logo_url' in frame.columns else [None] * len(symbols)
+            ):
+                row = {
+                    'symbol': symbol,
+                    'price': price if not np.isnan(price) else closes.get(symbol, 0.0),
+                    'long_name': long_name,
+                    'logo_url': logo_url,
+                    'last_updated': now
+                }
+                if np.isnan(price):
+                    unpriced.append(row)
+                else:
+                    priced.append(row)
+            # The fallback price only applies to newly inserted symbols
+            file_rows += upsert(StockCache, priced, ['symbol'], update=update + ['price'])
+            file_rows += upsert(StockCache, unpriced, ['symbol'], update=update)
+            db.session.commit()
+        stats.rows += file_rows
+        stats.files += 1
+        if on_file:
+            on_file(path, file_rows)
+    return stats
+
+
+# ----------- HISTORY --------------
+
+def _symbol_from_filename(path, interval):
+    # Replay-style names: AAPL.csv or AAPL_1d.parquet
+    name = os.path.splitext(os.path.basename(path))[0]
+    suffix = f'_{interval}'
+    if name.endswith(suffix):
+        name = name[:-len(suffix)]
+    return name.upper()
+
+
+def bar_rows(frame, symbol, interval, tz):
+    frame = _lower(frame)
+    time_column = next((column for column in TIME_COLUMNS if column in frame.columns), None)
+    if time_column is None or 'close' not in frame.columns:
+        raise IngestError('a date/timestamp column and a close column are required')
+
+    stamps = pd.to_datetime(frame[time_column], utc=False)
+    # Naive timestamps are exchange-local, matching what the provider returns
+    if stamps.dt.tz is None:
+        stamps = stamps.dt.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
+    stamps = stamps.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    close = pd.to_numeric(frame['close'], errors='coerce')
+    bars = pd.DataFrame({
+        'symbol': frame['symbol'].astype(str).str.strip().str.upper() if 'symbol' in frame.columns else symbol,
+        'ts': stamps,
+        'open': pd.to_numeric(frame['open'], errors='coerce') if 'open' in frame.columns else close,
+        'high': pd.to_numeric(frame['high'], errors='coerce') if 'high' in frame.columns else close,
+        'low': pd.to_numeric(frame['low'], errors='coerce') if 'low' in frame.columns else close,
+        'close': close,
+        'volume': pd.to_numeric(frame['volume'], errors='coerce') if 'volume' in frame.columns else 0.0,
+    })
+    bars = bars[bars['ts'].notna() & bars['close'].notna()]
+    bars = bars.fillna({'open': bars['close'], 'high': bars['close'], 'low': bars['close'], 'volume': 0.0})
+    # A key may only appear once per statement for ON CONFLICT to apply
+    bars = bars.drop_duplicates(['symbol', 'ts'], keep='last')
+
+    return [
+        {
+            'symbol': row_symbol,
+            'interval': interval,
+            'ts': ts,
+            'open': row_open,
+            'high': row_high,
+            'low': row_low,
+            'close': row_close,
+            'volume': row_volume
+        }
+        for row_symbol, ts, row_open, row_high, row_low, row_close, row_volume in zip(
+            bars['symbol'].tolist(),
+            bars['ts'].dt.to_pydatetime().tolist(),
+            bars['open'].tolist(),
+            bars['high'].tolist(),
+            bars['low'].tolist(),
+            bars['close'].tolist(),
+            bars['volume'].tolist()
+        )
+    ]
+
+
+def _covered_period(first_ts, now):
+    # Longest provider period the stored bars fully span, if any
+    covered = None
+    for period in COVERING_PERIODS:
+        if now - period_to_timedelta(period) >= first_ts:
+            covered = period
+    return covered
+
+
+def import_history(paths, interval='1d', tz='UTC', symbol=None, chunk_size=5000, on_file=None):
+    # Long files carry a symbol column; otherwise the symbol comes from
+    # --symbol or the file name. Re-importing a file rewrites the same bars.
+    stats = IngestStats()
+    imported = set()
+    for path in data_files(paths, exclude=('symbols.csv',)):
+        file_symbol = symbol.upper() if symbol else _symbol_from_filename(path, interval)
+        file_rows = 0
+        for frame in read_chunks(path, chunk_size):
+            try:
+                rows = bar_rows(frame, file_symbol, interval, tz)
+            except IngestError as e:
+                raise IngestError(f'{path}: {e}')
+            file_rows += upsert(PriceBar, rows, ['symbol', 'interval', 'ts'])
+            imported.update(row['symbol'] for row in rows)
+            db.session.commit()
+        stats.rows += file_rows
+        stats.files += 1
+        if on_file:
+            on_file(path, file_rows)
+
+    # Imported symbols are marked as synced so the history store only
+    # fetches bars newer than the import on first read
+    now = datetime.utcnow()
+    first_bars = (
+        db.session.query(PriceBar.symbol, func.min(PriceBar.ts))
+        .filter(PriceBar.symbol.in_(sorted(imported)), PriceBar.interval == interval)
+        .group_by(PriceBar.symbol)
+        .all()
+    )
+    for bar_symbol, first_ts in first_bars:
+        period = _covered_period(first_ts, now)
+        if period:
+            history_store.mark_synced(bar_symbol, interval, period, tz)
+    db.session.commit()
+    return stats
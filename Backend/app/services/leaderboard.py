@@ -0,0 +1,305 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from app import db
+from app.models.user import User
+from app.services.stock_service import get_stock_prices, add_price_listener
+from app.services.valuation import load_holdings
+
+EQUITY_WEIGHT = 0.6
+SCORE_WEIGHT = 0.4
+
+
+class Leaderboard:
+    def __init__(self, rebuild_interval=300):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        # Held for a whole rebuild so concurrent cold requests wait for one
+        # build instead of each reading every user
+        self._build_lock = threading.Lock()
+        self.generation = 0
+        self._building = False
+        self._touched = set()
+        self._pending_prices = {}
+        self._reset()
+
+    def _reset(self):
+        self.loaded_at = None
+        self.version = 0
+        self._users = {}
+        self._holdings = {}
+        self._holders = {}
+        self._prices = {}
+        self._by_equity = []
+        self._by_score = []
+        self._snapshots = {}
+
+    def init_app(self, app):
+        self.rebuild_interval = app.config.get('LEADERBOARD_REBUILD_INTERVAL', self.rebuild_interval)
+        app.extensions['leaderboard'] = self
+        add_price_listener(self.apply_prices)
+
+    # ----------- STATE --------------
+
+    def _equity_of(self, user_id):
+        user = self._users[user_id]
+        holdings = self._holdings.get(user_id, {})
+        return user['balance'] + sum(shares * self._prices.get(symbol, 0) for symbol, shares in holdings.items())
+
+    def _unindex(self, user_id):
+        user = self._users.get(user_id)
+        if not user:
+            return
+        for index, value in ((self._by_equity, user['equity']), (self._by_score, user['score'])):
+            key = (value, -user_id)
+            pos = bisect_left(index, key)
+            if pos < len(index) and index[pos] == key:
+                del index[pos]
+
+    def _index(self, user_id):
+        user = self._users[user_id]
+        insort(self._by_equity, (user['equity'], -user_id))
+        insort(self._by_score, (user['score'], -user_id))
+
+    def _set_holding(self, user_id, symbol, shares):
+        holdings = self._holdings.setdefault(user_id, {})
+        holders = self._holders.setdefault(symbol, {})
+        if shares > 0:
+            holdings[symbol] = shares
+            holders[user_id] = shares
+        else:
+            holdings.pop(symbol, None)
+            holders.pop(user_id, None)
+
+    def _touch(self):
+        self.version += 1
+
+    def _load(self, user_ids=None):
+        query = db.session.query(User.id, User.username, User.balance, User.community_score)
+        if user_ids is not None:
+            query = query.filter(User.id.in_(list(user_ids)))
+        users = query.all()
+        holdings = load_holdings(user_ids)
+        symbols = holdings.symbol.tolist()
+        if user_ids is not None:
+            symbols = [symbol for symbol in symbols if symbol not in self._prices]
+        return users, holdings, get_stock_prices(symbols) if symbols else {}
+
+    def _install(self, users, holdings, prices):
+        # Replaces the listed users' balances and holdings with what was read
+        for user in users:
+            self._unindex(user.id)
+            for symbol in self._holdings.pop(user.id, {}):
+                self._holders.get(symbol, {}).pop(user.id, None)
+            self._users[user.id] = {
+                'username': user.username,
+                'balance': user.balance or 0,
+                'score': user.community_score or 0,
+                'equity': 0
+            }
+        for symbol, quote in prices.items():
+            if 'price' in quote:
+                self._prices[symbol] = quote['price']
+        for user_id, symbol, shares in zip(holdings.user_id.tolist(), holdings.symbol.tolist(), holdings.shares.tolist()):
+            if user_id in self._users:
+                current = self._holdings.get(user_id, {}).get(symbol, 0)
+                self._set_holding(user_id, symbol, current + shares)
+        for user in users:
+            self._users[user.id]['equity'] = self._equity_of(user.id)
+            self._index(user.id)
+
+    def rebuild(self):
+        with self._build_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        # Trades, user edits and prices that arrive while the DB is being
+        # read are recorded; afterwards the touched users are re-read (their
+        # rows are absolute, so nothing is counted twice) and the prices
+        # replayed, until a pass finds nothing new
+        with self._lock:
+            self._building = True
+            self._touched = set()
+            self._pending_prices = {}
+        try:
+            users, holdings, prices = self._load()
+            with self._lock:
+                self._reset()
+                self._install(users, holdings, prices)
+                self.loaded_at = time.monotonic()
+            while True:
+                with self._lock:
+                    touched, self._touched = self._touched, set()
+                    pending, self._pending_prices = self._pending_prices, {}
+                    if pending:
+                        self._apply_prices(pending)
+                    if not touched:
+                        self._building = False
+                        self.generation += 1
+                        self._touch()
+                        return
+                users, holdings, prices = self._load(touched)
+                with self._lock:
+                    found = {user.id for user in users}
+                    for user_id in touched - found:
+                        self._drop_user(user_id)
+                    self._install(users, holdings, prices)
+        finally:
+            with self._lock:
+                self._building = False
+
+    def ensure_loaded(self):
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at <= self.rebuild_interval:
+            return
+        generation = self.generation
+        with self._build_lock:
+            # Somebody else finished a rebuild while this request waited
+            if self.generation == generation:
+                self._rebuild()
+
+    # ----------- UPDATES --------------
+
+    def apply_prices(self, prices):
+        with self._lock:
+            if self._building:
+                self._pending_prices.update(prices)
+            if self.loaded_at is None:
+                return
+            self._apply_prices(prices)
+
+    def _apply_prices(self, prices):
+        with self._lock:
+            changed = False
+            for symbol, price in prices.items():
+                old = self._prices.get(symbol, 0)
+                if price == old:
+                    continue
+                self._prices[symbol] = price
+                delta = price - old
+                for user_id, shares in self._holders.get(symbol, {}).items():
+                    self._unindex(user_id)
+                    self._users[user_id]['equity'] += shares * delta
+                    self._index(user_id)
+                    changed = True
+            if changed:
+                self._touch()
+
+    def apply_user(self, user):
+        with self._lock:
+            if self._building:
+                self._touched.add(user.id)
+            if self.loaded_at is None:
+                return
+            self._unindex(user.id)
+            self._users[user.id] = {
+                'username': user.username,
+                'balance': user.balance or 0,
+                'score': user.community_score or 0,
+                'equity': 0
+            }
+            self._users[user.id]['equity'] = self._equity_of(user.id)
+            self._index(user.id)
+            self._touch()
+
+    def apply_trade(self, user_id, symbol, shares_delta, balance, price=None):
+        user_id = int(user_id)
+        symbol = symbol.upper()
+        with self._lock:
+            if self._building:
+                self._touched.add(user_id)
+            if self.loaded_at is None or user_id not in self._users:
+                return
+            self._unindex(user_id)
+            if price is not None and symbol not in self._prices:
+                self._prices[symbol] = price
+            current = self._holdings.get(user_id, {}).get(symbol, 0)
+            self._set_holding(user_id, symbol, current + shares_delta)
+            self._users[user_id]['balance'] = balance
+            self._users[user_id]['equity'] = self._equity_of(user_id)
+            self._index(user_id)
+            self._touch()
+
+    def remove_user(self, user_id):
+        with self._lock:
+            if self._building:
+                self._touched.add(user_id)
+            if self.loaded_at is None:
+                return
+            self._drop_user(user_id)
+            self._touch()
+
+    def _drop_user(self, user_id):
+        self._unindex(user_id)
+        self._users.pop(user_id, None)
+        for symbol in self._holdings.pop(user_id, {}):
+            self._holders.get(symbol, {}).pop(user_id, None)
+
+    # ----------- QUERIES --------------
+
+    def _entry(self, user_id, max_equity):
+        user = self._users[user_id]
+        norm_equity = (user['equity'] / max_equity) * 100 if max_equity > 0 else 0
+        return {
+            'user_id': user_id,
+            'username': user['username'],
+            'total_equity': round(user['equity'], 2),
+            'community_score': user['score'],
+            'total_score': round(EQUITY_WEIGHT * norm_equity + SCORE_WEIGHT * user['score'], 2)
+        }
+
+    def _top_total(self, k, max_equity):
+        # Threshold algorithm over the equity and score indexes: the total
+        # score is monotone in both, so scanning them in parallel can stop
+        # once no unseen user could beat the current k-th best.
+        def total(equity, score):
+            norm_equity = (equity / max_equity) * 100 if max_equity > 0 else 0
+            return round(EQUITY_WEIGHT * norm_equity + SCORE_WEIGHT * score, 2)
+
+        seen = set()
+        best = []
+        depth = 0
+        size = len(self._by_equity)
+        while depth < size:
+            equity_key = self._by_equity[size - 1 - depth]
+            score_key = self._by_score[size - 1 - depth]
+            for _, neg_id in (equity_key, score_key):
+                user_id = -neg_id
+                if user_id in seen:
+                    continue
+                seen.add(user_id)
+                user = self._users[user_id]
+                candidate = (total(user['equity'], user['score']), neg_id)
+                if len(best) < k:
+                    heapq.heappush(best, candidate)
+                elif candidate > best[0]:
+                    heapq.heapreplace(best, candidate)
+            depth += 1
+            if len(best) == k and best[0][0] > total(equity_key[0], score_key[0]):
+                break
+        return [-neg_id for _, neg_id in sorted(best, reverse=True)]
+
+    def top(self, sort_by='total', k=10):
+        self.ensure_loaded()
+        with self._lock:
+            snapshot = self._snapshots.get((sort_by, k))
+            if snapshot and snapshot[0] == self.version:
+                return snapshot[1]
+
+            if not self._by_equity:
+                data = []
+            else:
+                max_equity = self._by_equity[-1][0]
+                if sort_by == 'money':
+                    user_ids = [-neg_id for _, neg_id in reversed(self._by_equity[-k:])]
+                elif sort_by == 'score':
+                    user_ids = [-neg_id for _, neg_id in reversed(self._by_score[-k:])]
+                else:
+                    user_ids = self._top_total(k, max_equity)
+                data = [self._entry(user_id, max_equity) for user_id in user_ids]
+
+            self._snapshots[(sort_by, k)] = (self.version, data)
+            return data
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,228 @@
+import os
+import time
+import asyncio
+import pandas as pd
+import yfinance as yf
+from datetime import timedelta
+from flask import current_app
+
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+PERIOD_UNITS = {
+    'd': lambda n: timedelta(days=n),
+    'wk': lambda n: timedelta(weeks=n),
+    'mo': lambda n: timedelta(days=31 * n),
+    'y': lambda n: timedelta(days=366 * n),
+}
+
+
+def period_to_timedelta(period, now=None):
+    if not period or period == 'max':
+        return None
+    if period == 'ytd':
+        now = now or pd.Timestamp.now(tz='UTC')
+        return now - now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    for unit in ('wk', 'mo', 'd', 'y'):
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return PERIOD_UNITS[unit](int(period[:-len(unit)]))
+    raise ValueError(f'Unsupported period: {period}')
+
+
+def _utc(value):
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+
+
+def quote_from_history(data):
+    price = float(data['Close'].iloc[-1])
+
+    if len(data) > 1:
+        previous_close = float(data['Close'].iloc[-2])
+        change = price - previous_close
+        percent_change = (change / previous_close) * 100 if previous_close != 0 else 0
+    else:
+        daily_open = float(data['Open'].iloc[-1])
+        change = price - daily_open
+        percent_change = (change / daily_open) * 100 if daily_open != 0 else 0
+
+    return {'price': price, 'change': change, 'percent_change': percent_change}
+
+
+class MarketDataProvider:
+    name = None
+
+    def get_quote(self, symbol):
+        return self.get_quotes([symbol]).get(symbol)
+
+    def get_quotes(self, symbols):
+        raise NotImplementedError
+
+    def get_history(self, symbol, period='1d', interval='1m', start=None, end=None):
+        raise NotImplementedError
+
+    def get_metadata(self, symbol):
+        raise NotImplementedError
+
+    # Async variants run the blocking calls on worker threads so callers can
+    # overlap them; providers with native async clients can override these
+    async def aget_quotes(self, symbols):
+        return await asyncio.to_thread(self.get_quotes, symbols)
+
+    async def aget_history(self, symbol, period='1d', interval='1m', start=None, end=None):
+        return await asyncio.to_thread(self.get_history, symbol, period, interval, start, end)
+
+    async def aget_metadata(self, symbol):
+        return await asyncio.to_thread(self.get_metadata, symbol)
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = 'yfinance'
+
+    def get_quotes(self, symbols):
+        data = yf.download(
+            symbols,
+            period='2d',
+            group_by='ticker',
+            auto_adjust=True,
+            progress=False,
+            threads=True
+        )
+        quotes = {}
+        if data is None or data.empty:
+            return quotes
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(subset=['Close'])
+            if not frame.empty:
+                quotes[symbol] = quote_from_history(frame)
+        return quotes
+
+    def get_history(self, symbol, period='1d', interval='1m', start=None, end=None):
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, end=end, interval=interval)
+        return ticker.history(period=period, interval=interval)
+
+    def get_metadata(self, symbol):
+        stock_info = yf.Ticker(symbol).info
+        return {'long_name': stock_info.get('longName'), 'logo_url': stock_info.get('logo_url')}
+
+
+class ReplayProvider(MarketDataProvider):
+    name = 'replay'
+
+    def __init__(self, data_dir, latency_ms=0, step_seconds=0):
+        self.data_dir = data_dir
+        self.latency = latency_ms / 1000.0
+        self.step_seconds = step_seconds
+        self.started_at = time.time()
+        self._frames = {}
+        self._metadata = None
+
+    def _sleep(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _read(self, path):
+        if path.endswith('.parquet'):
+            frame = pd.read_parquet(path)
+        else:
+            frame = pd.read_csv(path)
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            time_column = next(c for c in frame.columns if c.lower() in ('date', 'datetime', 'timestamp', 'ds'))
+            frame = frame.set_index(time_column)
+        frame.index = pd.to_datetime(frame.index, utc=True)
+        frame.index.name = 'Date'
+        frame.columns = [c.capitalize() for c in frame.columns]
+        if 'Volume' not in frame.columns:
+            frame['Volume'] = 0
+        for column in ('Open', 'High', 'Low'):
+            if column not in frame.columns:
+                frame[column] = frame['Close']
+        return frame[HISTORY_COLUMNS].sort_index()
+
+    def _load(self, symbol, interval=None):
+        key = (symbol, interval)
+        if key not in self._frames:
+            names = [f'{symbol}_{interval}', symbol] if interval else [f'{symbol}_1d', symbol]
+            frame = None
+            for name in names:
+                for ext in ('.parquet', '.csv'):
+                    path = os.path.join(self.data_dir, name + ext)
+                    if os.path.exists(path):
+                        frame = self._read(path)
+                        break
+                if frame is not None:
+                    break
+            self._frames[key] = frame
+        return self._frames[key]
+
+    def _cursor(self, frame):
+        if not self.step_seconds:
+            return len(frame) - 1
+        steps = int((time.time() - self.started_at) / self.step_seconds)
+        return steps % len(frame)
+
+    def get_quotes(self, symbols):
+        self._sleep()
+        quotes = {}
+        for symbol in symbols:
+            frame = self._load(symbol)
+            if frame is None or frame.empty:
+                continue
+            cursor = self._cursor(frame)
+            quotes[symbol] = quote_from_history(frame.iloc[max(cursor - 1, 0):cursor + 1])
+        return quotes
+
+    def get_history(self, symbol, period='1d', interval='1m', start=None, end=None):
+        self._sleep()
+        frame = self._load(symbol, interval)
+        if frame is None or frame.empty:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        now = frame.index[self._cursor(frame)]
+        if start is not None:
+            since = _utc(start)
+        else:
+            delta = period_to_timedelta(period, now)
+            since = now - delta if delta is not None else frame.index[0]
+        until = now if end is None else min(now, _utc(end))
+        return frame[(frame.index >= since) & (frame.index <= until)]
+
+    def get_metadata(self, symbol):
+        self._sleep()
+        if self._metadata is None:
+            path = os.path.join(self.data_dir, 'symbols.csv')
+            self._metadata = {}
+            if os.path.exists(path):
+                for row in pd.read_csv(path).to_dict(orient='records'):
+                    self._metadata[str(row['symbol']).upper()] = {
+                        'long_name': None if pd.isna(row.get('long_name')) else row.get('long_name'),
+                        'logo_url': None if pd.isna(row.get('logo_url')) else row.get('logo_url')
+                    }
+        return self._metadata.get(symbol, {'long_name': symbol, 'logo_url': None})
+
+
+def create_provider(config):
+    name = config.get('MARKET_DATA_PROVIDER', 'yfinance')
+    if name == 'yfinance':
+        return YFinanceProvider()
+    if name == 'replay':
+        return ReplayProvider(
+            config['MARKET_DATA_REPLAY_DIR'],
+            latency_ms=config.get('MARKET_DATA_REPLAY_LATENCY_MS', 0),
+            step_seconds=config.get('MARKET_DATA_REPLAY_STEP_SECONDS', 0)
+        )
+    raise ValueError(f'Unknown market data provider: {name}')
+
+
+def init_app(app):
+    app.extensions['market_data'] = create_provider(app.config)
+
+
+def get_provider():
+    return current_app.extensions['market_data']
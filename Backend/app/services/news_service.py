@@ -0,0 +1,213 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class NewsUnavailable(Exception):
+    def __init__(self, message, status=503):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitBreaker:
+    # Opens after `threshold` consecutive failures and lets a single trial
+    # request through once `reset_timeout` seconds have passed
+    def __init__(self, threshold=5, reset_timeout=60):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+
+def _simplify(articles):
+    return [
+        {
+            'title': article['title'],
+            'description': article['description'],
+            'url': article['url'],
+            'publishedAt': article['publishedAt'],
+            'source': article['source']['name']
+        } for article in articles
+    ]
+
+
+class NewsService:
+    def __init__(self):
+        self.base_url = 'https://newsapi.org/v2'
+        self.api_key = None
+        self.ttl = 300
+        self.stale_ttl = 3600
+        self.timeout = (3, 10)
+        self.breaker = CircuitBreaker()
+        self.session = None
+        self._entry = None
+        self._upstream_etag = None
+        self._lock = threading.Lock()
+        self._inflight = None
+
+    def init_app(self, app):
+        config = app.config
+        self.base_url = config.get('NEWS_API_BASE_URL', self.base_url).rstrip('/')
+        self.api_key = config.get('NEWS_API_KEY')
+        self.ttl = config.get('NEWS_CACHE_TTL', self.ttl)
+        self.stale_ttl = config.get('NEWS_STALE_TTL', self.stale_ttl)
+        self.timeout = (config.get('NEWS_CONNECT_TIMEOUT', 3), config.get('NEWS_READ_TIMEOUT', 10))
+        self.breaker = CircuitBreaker(config.get('NEWS_CIRCUIT_THRESHOLD', 5), config.get('NEWS_CIRCUIT_RESET', 60))
+        self.session = requests.Session()
+        pool_size = config.get('NEWS_POOL_SIZE', 10)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        app.extensions['news_service'] = self
+        metrics = app.extensions.get('request_metrics')
+        if metrics is not None and metrics.enabled:
+            metrics.add_collector(lambda: [('news', self.stats())])
+
+    # ----------- UPSTREAM --------------
+
+    def _fetch(self):
+        if not self.breaker.allow():
+            raise NewsUnavailable('News provider temporarily unavailable')
+
+        headers = {}
+        if self._upstream_etag and self._entry is not None:
+            headers['If-None-Match'] = self._upstream_etag
+        params = {
+            'category': 'business',
+            'country': 'us',
+            'apiKey': self.api_key,
+            'language': 'en',
+        }
+        # Every path records an outcome: a half-open breaker only lets its
+        # trial request through, and stays shut until that trial reports
+        try:
+            response = self.session.get(f'{self.base_url}/top-headlines', params=params, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            self.breaker.failure()
+            if not isinstance(e, requests.RequestException):
+                raise
+            raise NewsUnavailable(f'News provider request failed: {e}') from e
+
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.failure()
+            raise NewsUnavailable('Failed to fetch news', response.status_code)
+        # Client errors (bad key, exhausted quota) are not an outage
+        self.breaker.success()
+        if response.status_code == 304 and self._entry is not None:
+            return self._entry[1], self._entry[2]
+        if response.status_code != 200:
+            raise NewsUnavailable('Failed to fetch news', response.status_code)
+
+        self._upstream_etag = response.headers.get('ETag')
+        body = json.dumps(_simplify(response.json().get('articles', []))).encode('utf-8')
+        return body, hashlib.sha1(body).hexdigest()
+
+    def _refresh(self):
+        # Single-flight: concurrent callers wait on the same upstream request
+        with self._lock:
+            flight = self._inflight
+            leader = flight is None
+            if leader:
+                flight = self._inflight = {'done': threading.Event(), 'error': None}
+        if not leader:
+            flight['done'].wait(sum(self.timeout) + 1)
+            if flight['error'] is not None:
+                raise flight['error']
+            return
+
+        try:
+            body, etag = self._fetch()
+            with self._lock:
+                self._entry = (time.monotonic(), body, etag)
+        except NewsUnavailable as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight = None
+            flight['done'].set()
+
+    def _refresh_in_background(self):
+        def run():
+            try:
+                self._refresh()
+            except NewsUnavailable as e:
+                logger.warning('Background news refresh failed: %s', e)
+
+        with self._lock:
+            if self._inflight is not None:
+                return
+        threading.Thread(target=run, name='news-refresh', daemon=True).start()
+
+    # ----------- READS --------------
+
+    def get_headlines(self):
+        # Fresh entries are served directly, stale ones are served while a
+        # background refresh runs, and anything older blocks on upstream
+        entry = self._entry
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                return entry[1], entry[2]
+            if age < self.stale_ttl:
+                self._refresh_in_background()
+                return entry[1], entry[2]
+
+        try:
+            self._refresh()
+        except NewsUnavailable:
+            if entry is not None:
+                # Serve the last good copy rather than an error
+                return entry[1], entry[2]
+            raise
+        entry = self._entry
+        if entry is None:
+            raise NewsUnavailable('Failed to fetch news')
+        return entry[1], entry[2]
+
+    def stats(self):
+        entry = self._entry
+        return {
+            'cached': entry is not None,
+            'age': round(time.monotonic() - entry[0], 1) if entry else None,
+            'circuit': self.breaker.state,
+            'failures': self.breaker.failures
+        }
+
+
+news_service = NewsService()
@@ -0,0 +1,352 @@
+import os
+import time
+import uuid
+import heapq
+import queue
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.order import Order
+from app.models.service_lease import ServiceLease
+from app.services.order_service import OrderRejected, fill_order
+
+logger = logging.getLogger(__name__)
+
+# Each book is a heap of (sign * level, order id). An entry triggers once
+# sign * price >= its key, i.e. while heap[0][0] <= sign * price:
+#   buy_limit  fills when price <= limit  (max-heap on the limit)
+#   sell_limit fills when price >= limit  (min-heap on the limit)
+#   buy_stop   fires when price >= stop   (min-heap on the stop)
+#   sell_stop  fires when price <= stop   (max-heap on the stop)
+BOOK_SIGNS = {'buy_limit': -1, 'sell_limit': 1, 'buy_stop': 1, 'sell_stop': -1}
+LEASE_NAME = 'order_engine'
+
+
+class OrderNotOpen(OrderRejected):
+    def __init__(self):
+        super().__init__({'error': 'Order is no longer open'}, 409)
+
+
+def _book_for(order):
+    side = order['side'].lower()
+    if order['order_type'] == 'LIMIT' or (order['order_type'] == 'STOP_LIMIT' and order['triggered']):
+        return f'{side}_limit', order['limit_price']
+    return f'{side}_stop', order['stop_price']
+
+
+def _unexpired(now):
+    return or_(Order.expires_at.is_(None), Order.expires_at > now)
+
+
+def order_entry(order):
+    return {
+        'id': order.id,
+        'user_id': order.user_id,
+        'symbol': order.symbol,
+        'side': order.side,
+        'order_type': order.order_type,
+        'shares': order.shares,
+        'limit_price': order.limit_price,
+        'stop_price': order.stop_price,
+        'triggered': order.triggered,
+    }
+
+
+class SymbolBook:
+    def __init__(self):
+        self.heaps = {name: [] for name in BOOK_SIGNS}
+
+    def push(self, book, level, order_id):
+        heapq.heappush(self.heaps[book], (BOOK_SIGNS[book] * level, order_id))
+
+    def pop_triggered(self, price, live):
+        # Cancelled or moved orders are dropped lazily when they surface
+        for book, heap in self.heaps.items():
+            threshold = BOOK_SIGNS[book] * price
+            while heap and heap[0][0] <= threshold:
+                _, order_id = heapq.heappop(heap)
+                order = live.get(order_id)
+                if order is not None and order['book'] == book:
+                    return order
+        return None
+
+    def __len__(self):
+        return sum(len(heap) for heap in self.heaps.values())
+
+
+class OrderEngine:
+    def __init__(self, reload_interval=30, lease_seconds=15):
+        self.app = None
+        self.enabled = False
+        self.reload_interval = reload_interval
+        self.lease_seconds = lease_seconds
+        self.holder = None
+        self._books = {}
+        self._live = {}
+        self._last_id = 0
+        self._tasks = queue.Queue()
+        self._subscription = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._loaded_at = None
+        self._lease_until = None
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('ORDER_ENGINE_ENABLED', False)
+        self.reload_interval = app.config.get('ORDER_BOOK_RELOAD_INTERVAL', self.reload_interval)
+        self.lease_seconds = app.config.get('ORDER_ENGINE_LEASE_SECONDS', self.lease_seconds)
+        app.extensions['order_engine'] = self
+        from app.services.price_refresher import price_refresher
+        price_refresher.add_symbol_source(self.symbols)
+        if self.enabled:
+            # Started by the first request rather than here, so CLI commands
+            # (db upgrade, ingest, benchmarks) never run the matcher
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            from app.services.price_hub import price_hub
+            # Taken after any fork, so every worker process has its own identity
+            self.holder = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+            self._subscription = price_hub.subscribe([])
+            self._thread = threading.Thread(target=self._run, name='order-engine', daemon=True)
+            self._thread.start()
+
+    def symbols(self):
+        return [symbol for symbol, book in list(self._books.items()) if len(book)]
+
+    # ----------- REQUESTS (any thread) --------------
+
+    def submit(self, order, price=None):
+        self._tasks.put(('add', order, price))
+        self._wake()
+
+    def cancel(self, order_id):
+        self._tasks.put(('cancel', order_id, None))
+        self._wake()
+
+    def _wake(self):
+        if self._subscription is not None:
+            self._subscription.push({})
+
+    # ----------- BOOKS (engine thread only) --------------
+
+    def _add(self, order):
+        book, level = _book_for(order)
+        order['book'] = book
+        self._live[order['id']] = order
+        self._last_id = max(self._last_id, order['id'])
+        self._books.setdefault(order['symbol'], SymbolBook()).push(book, level, order['id'])
+
+    def _drop_books(self):
+        self._books = {}
+        self._live = {}
+        self._last_id = 0
+        self._loaded_at = None
+
+    def _reload(self):
+        now = datetime.utcnow()
+        expired = db.session.execute(
+            update(Order)
+            .where(Order.status == 'OPEN', Order.expires_at.isnot(None), Order.expires_at <= now)
+            .values(status='EXPIRED')
+        ).rowcount
+        db.session.commit()
+        if expired:
+            logger.info('Expired %d day orders', expired)
+
+        self._drop_books()
+        for order in db.session.execute(select(Order).where(Order.status == 'OPEN')).scalars():
+            self._add(order_entry(order))
+        db.session.rollback()
+        self._loaded_at = time.monotonic()
+        self._resubscribe()
+
+    def _load_new(self):
+        # Orders placed through other worker processes, picked up between reloads
+        added = False
+        query = select(Order).where(Order.status == 'OPEN', Order.id > self._last_id)
+        for order in db.session.execute(query).scalars():
+            self._add(order_entry(order))
+            added = True
+        db.session.rollback()
+        if added:
+            self._resubscribe()
+
+    def _resubscribe(self):
+        from app.services.price_hub import price_hub
+        symbols = set(self.symbols())
+        if self._subscription is not None and symbols != self._subscription.symbols:
+            price_hub.update(self._subscription, symbols)
+
+    def _handle_task(self, task):
+        kind, payload, price = task
+        if kind == 'add':
+            if payload['id'] not in self._live:
+                self._add(payload)
+                self._resubscribe()
+            if price is not None:
+                self._match(payload['symbol'], price)
+        elif kind == 'cancel':
+            self._live.pop(payload, None)
+
+    # ----------- MATCHING --------------
+
+    def _match(self, symbol, price):
+        book = self._books.get(symbol)
+        if book is None:
+            return
+        conflicted = []
+        while True:
+            order = book.pop_triggered(price, self._live)
+            if order is None:
+                break
+            if order['book'].endswith('_stop') and order['order_type'] == 'STOP_LIMIT':
+                self._trigger_stop_limit(order)
+                continue
+            if not self._execute(order, price):
+                conflicted.append(order)
+        # Back on the book only after this pass, so a conflict that keeps
+        # failing waits for the next price instead of spinning here
+        for order in conflicted:
+            self._add(order)
+
+    def _trigger_stop_limit(self, order):
+        # The stop was hit: the order now rests as a limit order
+        changed = db.session.execute(
+            update(Order)
+            .where(Order.id == order['id'], Order.status == 'OPEN', _unexpired(datetime.utcnow()))
+            .values(triggered=True)
+        ).rowcount
+        db.session.commit()
+        if not changed:
+            self._live.pop(order['id'], None)
+            return
+        order['triggered'] = True
+        self._add(order)
+
+    def _execute(self, order, price):
+        # False when the fill lost a write conflict and should be retried
+        self._live.pop(order['id'], None)
+
+        def close_order():
+            now = datetime.utcnow()
+            # Expired DAY orders never fill, even before the reload marks them EXPIRED
+            closed = db.session.execute(
+                update(Order)
+                .where(Order.id == order['id'], Order.status == 'OPEN', _unexpired(now))
+                .values(status='FILLED', fill_price=price, filled_at=now)
+            ).rowcount
+            if closed == 0:
+                raise OrderNotOpen()
+
+        try:
+            fill_order(order['user_id'], order['symbol'], order['shares'], order['side'], price, within=close_order)
+        except OrderNotOpen:
+            # Cancelled, expired or filled elsewhere in the meantime
+            return True
+        except OrderRejected as e:
+            if e.status == 409:
+                return False
+            db.session.execute(
+                update(Order)
+                .where(Order.id == order['id'], Order.status == 'OPEN')
+                .values(status='REJECTED', reason=e.payload.get('error'))
+            )
+            db.session.commit()
+        return True
+
+    # ----------- LEASE --------------
+
+    def _hold_lease(self):
+        # One process at a time matches orders: the holder renews a row in
+        # service_leases and the others take over once it stops renewing
+        now = datetime.utcnow()
+        if self._lease_until is not None and now < self._lease_until - timedelta(seconds=self.lease_seconds / 2):
+            return True
+        until = now + timedelta(seconds=self.lease_seconds)
+        held = db.session.execute(
+            update(ServiceLease)
+            .where(
+                ServiceLease.name == LEASE_NAME,
+                or_(ServiceLease.holder == self.holder, ServiceLease.expires_at < now)
+            )
+            .values(holder=self.holder, expires_at=until)
+        ).rowcount
+        if not held and db.session.get(ServiceLease, LEASE_NAME) is None:
+            db.session.add(ServiceLease(name=LEASE_NAME, holder=self.holder, expires_at=until))
+            held = 1
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another process created the lease first
+            db.session.rollback()
+            held = 0
+
+        if not held:
+            if self._lease_until is not None:
+                logger.info('Order engine lease lost; standing by')
+            self._lease_until = None
+            return False
+        if self._lease_until is None:
+            logger.info('Order engine lease acquired by %s', self.holder)
+        self._lease_until = until
+        return True
+
+    def _standby(self):
+        # Orders submitted here are matched by the lease holder once it loads them
+        self._drop_books()
+        self._resubscribe()
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                break
+        time.sleep(self.lease_seconds / 3)
+
+    # ----------- LOOP --------------
+
+    def _tick(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval:
+            self._reload()
+        else:
+            self._load_new()
+        while True:
+            try:
+                self._handle_task(self._tasks.get_nowait())
+            except queue.Empty:
+                break
+        ticks = self._subscription.wait(1)
+        for symbol, (price, _) in ticks.items():
+            self._match(symbol, price)
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    try:
+                        leader = self._hold_lease()
+                        if leader:
+                            self._tick()
+                    finally:
+                        db.session.remove()
+                if not leader:
+                    self._standby()
+            except Exception:
+                logger.exception('Order engine iteration failed')
+                self._loaded_at = None
+                time.sleep(5)
+
+
+order_engine = OrderEngine()
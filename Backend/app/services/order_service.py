@@ -0,0 +1,247 @@
+import time
+import random
+import logging
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, update, delete, insert
+from sqlalchemy.exc import OperationalError, IntegrityError
+from app import db
+from app.models.user import User
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.services.stock_service import get_stock_price, get_stock_prices
+from app.services.leaderboard import leaderboard
+
+logger = logging.getLogger(__name__)
+
+_trade_listeners = []
+
+
+def add_trade_listener(listener):
+    if listener not in _trade_listeners:
+        _trade_listeners.append(listener)
+
+
+def _notify_trade(user_id):
+    for listener in _trade_listeners:
+        try:
+            listener(user_id)
+        except Exception:
+            logger.exception('Trade listener failed')
+
+
+class OrderRejected(Exception):
+    def __init__(self, payload, status=400):
+        super().__init__(payload.get('error'))
+        self.payload = payload
+        self.status = status
+
+
+def blended_avg_price(shares, avg_price, new_shares, price):
+    return ((avg_price * shares) + (price * new_shares)) / (shares + new_shares)
+
+
+def _lock_user(user_id):
+    # Row lock on databases that support it; the guarded updates below keep
+    # the fill correct on SQLite, where FOR UPDATE is a no-op.
+    locked = db.session.execute(select(User.id).where(User.id == user_id).with_for_update()).scalar()
+    if locked is None:
+        raise OrderRejected({'error': 'User not found'}, 404)
+
+
+def _holding_id(user_id, symbol):
+    return db.session.execute(
+        select(Portfolio.id).where(Portfolio.user_id == user_id, Portfolio.symbol == symbol).order_by(Portfolio.id).limit(1)
+    ).scalar()
+
+
+def _transaction_row(user_id, symbol, shares, price, side, timestamp=None):
+    return {
+        'user_id': user_id,
+        'symbol': symbol,
+        'shares': shares,
+        'price': price,
+        'type': side,
+        'timestamp': timestamp or datetime.utcnow()
+    }
+
+
+def apply_buy(user_id, symbol, shares, price, timestamp=None):
+    total_cost = price * shares
+    debited = db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.balance >= total_cost)
+        .values(balance=User.balance - total_cost)
+    )
+    if debited.rowcount == 0:
+        raise OrderRejected({'error': 'Insufficient funds'})
+
+    holding_id = _holding_id(user_id, symbol)
+    if holding_id is None:
+        db.session.add(Portfolio(user_id=user_id, symbol=symbol, shares=shares, avg_price=price))
+    else:
+        # avg_price is assigned first so MySQL, which applies SET clauses in
+        # order, still blends against the old share count
+        db.session.execute(
+            update(Portfolio)
+            .where(Portfolio.id == holding_id)
+            .ordered_values(
+                (Portfolio.avg_price, ((Portfolio.avg_price * Portfolio.shares) + (price * shares)) / (Portfolio.shares + shares)),
+                (Portfolio.shares, Portfolio.shares + shares)
+            )
+        )
+    return _transaction_row(user_id, symbol, shares, price, 'BUY', timestamp)
+
+
+def apply_sell(user_id, symbol, shares, price, timestamp=None):
+    holding_id = _holding_id(user_id, symbol)
+    removed = 0
+    if holding_id is not None:
+        removed = db.session.execute(
+            update(Portfolio)
+            .where(Portfolio.id == holding_id, Portfolio.shares >= shares)
+            .values(shares=Portfolio.shares - shares)
+        ).rowcount
+    if removed == 0:
+        raise OrderRejected({'error': 'Not enough shares to sell'})
+
+    db.session.execute(delete(Portfolio).where(Portfolio.id == holding_id, Portfolio.shares <= 0))
+    db.session.execute(update(User).where(User.id == user_id).values(balance=User.balance + price * shares))
+    return _transaction_row(user_id, symbol, shares, price, 'SELL', timestamp)
+
+
+def run_in_transaction(work):
+    retries = current_app.config.get('ORDER_MAX_RETRIES', 3)
+    for attempt in range(retries + 1):
+        try:
+            result = work()
+            db.session.commit()
+            return result
+        except OrderRejected:
+            db.session.rollback()
+            raise
+        except (OperationalError, IntegrityError):
+            # Lock timeouts, deadlocks and duplicate holding inserts from a
+            # concurrent order are retried against fresh state
+            db.session.rollback()
+            if attempt == retries:
+                raise OrderRejected({'error': 'Order conflicted with a concurrent update, please retry'}, 409)
+            time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+
+
+def fill_order(user_id, symbol, shares, side, price, within=None):
+    # `within` runs inside the fill's transaction, e.g. to close the resting
+    # order being filled; raising OrderRejected from it rolls the fill back
+    user_id = int(user_id)
+    symbol = symbol.upper()
+    apply = apply_buy if side == 'BUY' else apply_sell
+
+    def work():
+        _lock_user(user_id)
+        db.session.execute(insert(Transaction), [apply(user_id, symbol, shares, price)])
+        if within is not None:
+            within()
+        return db.session.execute(select(User.balance).where(User.id == user_id)).scalar()
+
+    new_balance = run_in_transaction(work)
+    leaderboard.apply_trade(user_id, symbol, shares if side == 'BUY' else -shares, new_balance, price)
+    _notify_trade(user_id)
+    return new_balance
+
+
+def execute_order(user_id, symbol, shares, side):
+    user_id = int(user_id)
+    symbol = symbol.upper()
+
+    if db.session.get(User, user_id) is None:
+        return {'error': 'User not found'}, 404
+    if side == 'SELL':
+        holding = Portfolio.query.filter_by(user_id=user_id, symbol=symbol).first()
+        if not holding or holding.shares < shares:
+            return {'error': 'Not enough shares to sell'}, 400
+    # Release the read transaction before the network call so no locks or
+    # snapshots are held while waiting on the provider
+    db.session.rollback()
+
+    stock_data = get_stock_price(symbol)
+    if 'error' in stock_data:
+        if side == 'BUY':
+            return stock_data, 500
+        return {'error': 'Stock price fetch failed'}, 400
+
+    try:
+        new_balance = fill_order(user_id, symbol, shares, side, stock_data['price'])
+    except OrderRejected as e:
+        return e.payload, e.status
+
+    message = 'Stock purchased successfully' if side == 'BUY' else 'Stock sold successfully'
+    return {'message': message, 'new_balance': new_balance}, 200
+
+
+def execute_batch(user_id, legs):
+    user_id = int(user_id)
+    user = db.session.get(User, user_id)
+    if user is None:
+        return {'error': 'User not found'}, 404
+
+    symbols = sorted({leg['symbol'] for leg in legs})
+    holdings = {}
+    for symbol, shares in db.session.query(Portfolio.symbol, Portfolio.shares).filter(
+        Portfolio.user_id == user_id, Portfolio.symbol.in_(symbols)
+    ):
+        holdings[symbol] = holdings.get(symbol, 0) + shares
+    balance = user.balance
+    db.session.rollback()
+
+    prices = get_stock_prices(symbols)
+    failed = [symbol for symbol in symbols if 'error' in prices[symbol]]
+    if failed:
+        return {'error': 'Stock price fetch failed', 'symbols': failed}, 400
+
+    # Validate the whole batch up front; sells settle before buys so their
+    # proceeds can fund the buys
+    cash = balance
+    selling = {}
+    for leg in legs:
+        if leg['side'] == 'SELL':
+            selling[leg['symbol']] = selling.get(leg['symbol'], 0) + leg['shares']
+            cash += prices[leg['symbol']]['price'] * leg['shares']
+    short = [symbol for symbol, shares in selling.items() if holdings.get(symbol, 0) < shares]
+    if short:
+        return {'error': 'Not enough shares to sell', 'symbols': sorted(short)}, 400
+    cost = sum(prices[leg['symbol']]['price'] * leg['shares'] for leg in legs if leg['side'] == 'BUY')
+    if cost > cash:
+        return {'error': 'Insufficient funds'}, 400
+
+    ordered = [leg for leg in legs if leg['side'] == 'SELL'] + [leg for leg in legs if leg['side'] == 'BUY']
+    now = datetime.utcnow()
+
+    def work():
+        _lock_user(user_id)
+        rows = []
+        for leg in ordered:
+            apply = apply_buy if leg['side'] == 'BUY' else apply_sell
+            rows.append(apply(user_id, leg['symbol'], leg['shares'], prices[leg['symbol']]['price'], now))
+        db.session.execute(insert(Transaction), rows)
+        return db.session.execute(select(User.balance).where(User.id == user_id)).scalar()
+
+    try:
+        new_balance = run_in_transaction(work)
+    except OrderRejected as e:
+        return e.payload, e.status
+
+    for leg in ordered:
+        shares = leg['shares'] if leg['side'] == 'BUY' else -leg['shares']
+        leaderboard.apply_trade(user_id, leg['symbol'], shares, new_balance, prices[leg['symbol']]['price'])
+    _notify_trade(user_id)
+
+    return {
+        'message': 'Batch executed successfully',
+        'new_balance': new_balance,
+        'fills': [{
+            'symbol': leg['symbol'],
+            'type': leg['side'],
+            'shares': leg['shares'],
+            'price': prices[leg['symbol']]['price']
+        } for leg in ordered]
+    }, 200
@@ -0,0 +1,190 @@
+import time
+import logging
+import threading
+from app import db
+from app.services.stock_service import add_price_listener, get_stock_prices
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, symbols, user_id=None):
+        self.symbols = set(symbols)
+        self.user_id = user_id
+        self.holdings_changed = False
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def push(self, ticks):
+        # Ticks are conflated per symbol, so a slow client only ever has the
+        # latest price waiting for each symbol instead of a growing backlog
+        with self._lock:
+            self._pending.update(ticks)
+        self._ready.set()
+
+    def notify_holdings(self):
+        self.holdings_changed = True
+        self._ready.set()
+
+    def wait(self, timeout):
+        if not self._ready.wait(timeout):
+            return {}
+        with self._lock:
+            ticks, self._pending = self._pending, {}
+            self._ready.clear()
+        return ticks
+
+
+class PriceHub:
+    def __init__(self, interval=5, max_symbols=50, max_streams=24, stream_lifetime=300):
+        self.app = None
+        self.interval = interval
+        self.max_symbols = max_symbols
+        self.max_streams = max_streams
+        self.stream_lifetime = stream_lifetime
+        self.keepalive = 15
+        self._streams = 0
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._by_symbol = {}
+        self._last = {}
+        self._thread = None
+        self._wake = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('PRICE_STREAM_INTERVAL', self.interval)
+        self.max_symbols = app.config.get('PRICE_STREAM_MAX_SYMBOLS', self.max_symbols)
+        self.keepalive = app.config.get('PRICE_STREAM_KEEPALIVE', self.keepalive)
+        self.max_streams = app.config.get('PRICE_STREAM_MAX_CONNECTIONS', self.max_streams)
+        self.stream_lifetime = app.config.get('PRICE_STREAM_MAX_AGE', self.stream_lifetime)
+        app.extensions['price_hub'] = self
+        add_price_listener(self.publish)
+        from app.services.price_refresher import price_refresher
+        price_refresher.add_symbol_source(self.symbols)
+        from app.services.order_service import add_trade_listener
+        add_trade_listener(self.holdings_changed)
+
+    # ----------- SUBSCRIPTIONS --------------
+
+    def subscribe(self, symbols, user_id=None):
+        subscription = Subscription(symbols, user_id)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            self._index(subscription)
+        self._ensure_polling()
+        return subscription
+
+    def update(self, subscription, symbols):
+        with self._lock:
+            self._unindex(subscription)
+            subscription.symbols = set(symbols)
+            self._index(subscription)
+        self._wake.set()
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self._unindex(subscription)
+
+    def _index(self, subscription):
+        for symbol in subscription.symbols:
+            self._by_symbol.setdefault(symbol, set()).add(subscription)
+
+    def _unindex(self, subscription):
+        for symbol in subscription.symbols:
+            subscribers = self._by_symbol.get(symbol)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_symbol[symbol]
+                    self._last.pop(symbol, None)
+
+    def symbols(self):
+        with self._lock:
+            return list(self._by_symbol)
+
+    # Every open stream holds a request thread, so streams are capped per
+    # process below the server's thread count to leave room for the API
+    def acquire_stream(self):
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return False
+            self._streams += 1
+            return True
+
+    def release_stream(self):
+        with self._lock:
+            self._streams = max(self._streams - 1, 0)
+
+    def stats(self):
+        with self._lock:
+            return {'streams': self._streams, 'subscriptions': len(self._subscriptions), 'symbols': len(self._by_symbol)}
+
+    def last_prices(self, symbols):
+        with self._lock:
+            return {symbol: self._last[symbol] for symbol in symbols if symbol in self._last}
+
+    # ----------- FAN-OUT --------------
+
+    def publish(self, prices):
+        # Called with {symbol: price} after any upstream fetch; unchanged
+        # prices are not re-sent
+        now = time.time()
+        deliveries = {}
+        with self._lock:
+            for symbol, price in prices.items():
+                subscribers = self._by_symbol.get(symbol)
+                if not subscribers or self._last.get(symbol, (None,))[0] == price:
+                    continue
+                self._last[symbol] = (price, now)
+                for subscription in subscribers:
+                    deliveries.setdefault(subscription, {})[symbol] = (price, now)
+        for subscription, ticks in deliveries.items():
+            subscription.push(ticks)
+
+    def holdings_changed(self, user_id):
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.user_id == user_id]
+        for subscription in subscriptions:
+            subscription.notify_holdings()
+
+    # ----------- POLLING --------------
+
+    def _ensure_polling(self):
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='price-hub', daemon=True)
+            self._thread.start()
+
+    def poll_once(self):
+        # One quote lookup per subscribed symbol per interval, shared by every
+        # subscriber; fresh quote-cache entries are reused without an upstream call
+        symbols = self.symbols()
+        if not symbols:
+            return
+        quotes = get_stock_prices(symbols)
+        self.publish({symbol: quote['price'] for symbol, quote in quotes.items() if 'price' in quote})
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            if not self.symbols():
+                self._wake.wait(self.interval)
+                continue
+            with self.app.app_context():
+                try:
+                    self.poll_once()
+                except Exception:
+                    logger.exception('Price stream poll failed')
+                finally:
+                    db.session.remove()
+            self._wake.wait(self.interval)
+
+
+price_hub = PriceHub()
@@ -0,0 +1,80 @@
+import threading
+import logging
+from datetime import datetime
+from app import db
+from app.models.portfolio import Portfolio
+from app.services.stock_service import get_recent_symbols, refresh_stock_prices
+from app.utils.market import is_market_open
+
+logger = logging.getLogger(__name__)
+
+
+class PriceRefresher:
+    def __init__(self):
+        self.app = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._symbol_sources = []
+        self.last_run = None
+        self.last_symbol_count = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['price_refresher'] = self
+        if app.config.get('PRICE_REFRESHER_ENABLED'):
+            self.start()
+
+    def add_symbol_source(self, source):
+        # init_app runs once per create_app(); keep one entry per source
+        if source not in self._symbol_sources:
+            self._symbol_sources.append(source)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='price-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def collect_symbols(self):
+        held = [row[0] for row in db.session.query(Portfolio.symbol).distinct()]
+        recent = get_recent_symbols(self.app.config['PRICE_REFRESH_RECENT_WINDOW'])
+        symbols = set(symbol.upper() for symbol in held) | set(recent)
+        for source in self._symbol_sources:
+            symbols.update(symbol.upper() for symbol in source())
+        return sorted(symbols)
+
+    def refresh_once(self):
+        symbols = self.collect_symbols()
+        batch_size = self.app.config['PRICE_REFRESH_BATCH_SIZE']
+        ttl = self.app.config['PRICE_MAX_STALENESS']
+        for start in range(0, len(symbols), batch_size):
+            refresh_stock_prices(symbols[start:start + batch_size], ttl=ttl)
+        self.last_symbol_count = len(symbols)
+        return len(symbols)
+
+    def current_interval(self):
+        status, _ = is_market_open(self.app.config['MARKET_TIMEZONE'])
+        if status.get('market_open'):
+            return self.app.config['PRICE_REFRESH_INTERVAL_OPEN']
+        return self.app.config['PRICE_REFRESH_INTERVAL_CLOSED']
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    self.refresh_once()
+                    self.last_run = datetime.utcnow()
+                except Exception:
+                    logger.exception('Background price refresh failed')
+                    db.session.rollback()
+                finally:
+                    interval = self.current_interval()
+                    db.session.remove()
+            self._stop.wait(interval)
+
+
+price_refresher = PriceRefresher()
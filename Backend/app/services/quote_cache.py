@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.results = {}
+        self.error = None
+
+
+class QuoteCache:
+    def __init__(self, ttl=15, max_size=2048, wait_timeout=30):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('QUOTE_CACHE_TTL', self.ttl)
+        self.max_size = app.config.get('QUOTE_CACHE_MAX_SIZE', self.max_size)
+        app.extensions['quote_cache'] = self
+
+    def _store(self, symbol, quote, expires_at):
+        self._entries[symbol] = (expires_at, quote)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, symbols, loader):
+        now = time.monotonic()
+        results = {}
+        waiting = []
+        to_load = []
+        flight = None
+
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry and entry[0] > now:
+                    self._entries.move_to_end(symbol)
+                    results[symbol] = entry[1]
+                    self.hits += 1
+                elif symbol in self._inflight:
+                    waiting.append((symbol, self._inflight[symbol]))
+                    self.coalesced += 1
+                else:
+                    if flight is None:
+                        flight = _Flight()
+                    self._inflight[symbol] = flight
+                    to_load.append(symbol)
+                    self.misses += 1
+
+        if to_load:
+            loaded = {}
+            try:
+                loaded = loader(to_load)
+            except Exception as e:
+                # Waiters see the leader's failure, not a timeout
+                flight.error = e
+                raise
+            finally:
+                expires_at = time.monotonic() + self.ttl
+                with self._lock:
+                    for symbol in to_load:
+                        quote = loaded.get(symbol)
+                        if quote is not None and 'error' not in quote:
+                            self._store(symbol, quote, expires_at)
+                        self._inflight.pop(symbol, None)
+                    flight.results = loaded
+                flight.event.set()
+            results.update(loaded)
+
+        for symbol, other in waiting:
+            if not other.event.wait(self.wait_timeout):
+                results[symbol] = {'error': f'Timed out waiting for stock price for {symbol}'}
+            elif other.error is not None:
+                raise other.error
+            elif symbol in other.results:
+                results[symbol] = other.results[symbol]
+            else:
+                results[symbol] = {'error': 'No data found for the symbol'}
+
+        return results
+
+    def put_many(self, quotes, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            for symbol, quote in quotes.items():
+                if quote is not None and 'error' not in quote:
+                    self._store(symbol, quote, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'in_flight': len(self._inflight),
+                'max_size': self.max_size,
+                'ttl': self.ttl
+            }
+
+
+quote_cache = QuoteCache()
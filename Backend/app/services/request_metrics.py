@@ -0,0 +1,315 @@
+import os
+import hmac
+import time
+import random
+import cProfile
+import logging
+import threading
+from datetime import datetime
+from flask import Response, abort, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+TIMED_KINDS = ('db', 'provider', 'commit', 'pool')
+PROVIDER_METHODS = ('get_quote', 'get_quotes', 'get_history', 'get_metadata')
+ASYNC_PROVIDER_METHODS = ('aget_quotes', 'aget_history', 'aget_metadata')
+
+
+def _label_string(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, name):
+        lines = []
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            prefix = _label_string(labels)
+            sep = ',' if prefix else ''
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{name}_bucket{{{prefix}{sep}le="{bound}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{{prefix}{sep}le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{prefix}}} {total:.6f}')
+            lines.append(f'{name}_count{{{prefix}}} {count}')
+        return lines
+
+
+def _timings():
+    if not has_request_context():
+        return None
+    return g.get('_request_timings')
+
+
+def record(kind, seconds):
+    timings = _timings()
+    if timings is not None:
+        entry = timings.setdefault(kind, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+class TimedProvider:
+    # Proxies the configured MarketDataProvider so every upstream call made
+    # while serving a request is counted against it
+    def __init__(self, provider):
+        self._provider = provider
+
+    def __getattr__(self, name):
+        attr = getattr(self._provider, name)
+        if name in ASYNC_PROVIDER_METHODS:
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await attr(*args, **kwargs)
+                finally:
+                    record('provider', time.perf_counter() - start)
+            return timed_async
+        if name not in PROVIDER_METHODS:
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                record('provider', time.perf_counter() - start)
+        return timed
+
+
+class TimedQueuePool(QueuePool):
+    # QueuePool that reports how long each checkout waited for a connection,
+    # including opening a new one when the pool has room to grow
+    bind_name = 'primary'
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            request_metrics.observe_pool_wait(self.bind_name, waited)
+            record('pool', waited)
+
+
+def _timed_pool(bind_name):
+    # One subclass per bind so the label survives Pool.recreate()
+    return type('TimedQueuePool', (TimedQueuePool,), {'bind_name': bind_name})
+
+
+def instrument_pools(config):
+    # Runs before db.init_app so the engines are created with timed pools
+    if not config.get('REQUEST_METRICS_ENABLED'):
+        return
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS', {}), poolclass=_timed_pool('primary'))
+    binds = {}
+    for key, bind in config.get('SQLALCHEMY_BINDS', {}).items():
+        options = dict(bind) if isinstance(bind, dict) else {'url': bind}
+        options['poolclass'] = _timed_pool(key)
+        binds[key] = options
+    config['SQLALCHEMY_BINDS'] = binds
+
+
+def pool_stats(engines):
+    stats = []
+    for key, engine in engines.items():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            stats.append((f'db_pool_{key or "primary"}', {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow()
+            }))
+    return stats
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._latency = Histogram()
+        self._pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self._counters = {kind: {} for kind in TIMED_KINDS}
+        self._collectors = []
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['request_metrics'] = self
+        self.enabled = app.config.get('REQUEST_METRICS_ENABLED', False)
+        if not self.enabled:
+            return
+
+        app.extensions['market_data'] = TimedProvider(app.extensions['market_data'])
+        self._listen()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if app.config.get('METRICS_TOKEN'):
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+        from app.services.quote_cache import quote_cache
+        self.add_collector(lambda: [('quote_cache', quote_cache.stats())])
+        from app.services.price_hub import price_hub
+        self.add_collector(lambda: [('price_stream', price_hub.stats())])
+        from app import db
+        self.add_collector(lambda: pool_stats(db.engines))
+
+    def add_collector(self, collector):
+        # collector() returns (prefix, {name: number}) pairs exported as gauges
+        self._collectors.append(collector)
+
+    def observe_pool_wait(self, bind_name, seconds):
+        with self._lock:
+            self._pool_wait.observe((('bind', bind_name),), seconds)
+
+    # ----------- INSTRUMENTATION --------------
+
+    def _listen(self):
+        if event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        event.listen(Session, 'before_commit', _before_commit)
+        event.listen(Session, 'after_commit', _after_commit)
+
+    def _before_request(self):
+        g._request_timings = {}
+        g._request_started = time.perf_counter()
+        g._request_profiler = None
+        config = self.app.config
+        if config.get('PROFILE_SLOW_REQUESTS') and random.random() < config.get('PROFILE_SAMPLE_RATE', 0.1):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g._request_profiler = profiler
+            except ValueError:
+                # Another profiler is already active on this thread
+                pass
+
+    def _after_request(self, response):
+        started = g.get('_request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        timings = g.get('_request_timings', {})
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+
+        with self._lock:
+            self._latency.observe((('method', request.method), ('route', endpoint), ('status', str(response.status_code))), elapsed)
+            for kind in TIMED_KINDS:
+                count, seconds = timings.get(kind, (0, 0.0))
+                totals = self._counters[kind].setdefault(endpoint, [0, 0.0])
+                totals[0] += count
+                totals[1] += seconds
+
+        parts = []
+        for kind in TIMED_KINDS:
+            if kind in timings:
+                count, seconds = timings[kind]
+                parts.append(f'{kind};dur={seconds * 1000:.1f};desc="{count} calls"')
+        parts.append(f'total;dur={elapsed * 1000:.1f}')
+        response.headers.add('Server-Timing', ', '.join(parts))
+
+        profiler = g.pop('_request_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed * 1000 >= self.app.config.get('PROFILE_SLOW_THRESHOLD_MS', 500):
+                self._dump_profile(profiler, endpoint, elapsed)
+        return response
+
+    def _dump_profile(self, profiler, endpoint, elapsed):
+        directory = self.app.config.get('PROFILE_DIR') or os.path.join(self.app.instance_path, 'profiles')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            name = endpoint.strip('/').replace('/', '_').replace('<', '').replace('>', '') or 'root'
+            path = os.path.join(directory, f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{name}_{int(elapsed * 1000)}ms.prof")
+            profiler.dump_stats(path)
+        except OSError:
+            logger.exception('Could not write request profile')
+
+    # ----------- EXPORT --------------
+
+    def render(self):
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by route',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            lines += self._latency.render('http_request_duration_seconds')
+            lines += [
+                '# HELP db_pool_wait_seconds Time spent waiting for a pooled database connection',
+                '# TYPE db_pool_wait_seconds histogram',
+            ]
+            lines += self._pool_wait.render('db_pool_wait_seconds')
+            for kind in TIMED_KINDS:
+                lines.append(f'# TYPE request_{kind}_calls_total counter')
+                for endpoint, (count, _) in sorted(self._counters[kind].items()):
+                    lines.append(f'request_{kind}_calls_total{{route="{endpoint}"}} {count}')
+                lines.append(f'# TYPE request_{kind}_seconds_total counter')
+                for endpoint, (_, seconds) in sorted(self._counters[kind].items()):
+                    lines.append(f'request_{kind}_seconds_total{{route="{endpoint}"}} {seconds:.6f}')
+
+        for collector in self._collectors:
+            for prefix, values in collector():
+                for name, value in values.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        lines.append(f'# TYPE {prefix}_{name} gauge')
+                        lines.append(f'{prefix}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        # Scrapers authenticate with Authorization: Bearer <METRICS_TOKEN>
+        expected = f"Bearer {self.app.config['METRICS_TOKEN']}"
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected.encode()):
+            abort(401)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_query_started')
+    if started:
+        record('db', time.perf_counter() - started.pop())
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        started = context.connection.info.get('_query_started')
+        if started:
+            record('db', time.perf_counter() - started.pop())
+
+
+def _before_commit(session):
+    session.info['_commit_started'] = time.perf_counter()
+
+
+def _after_commit(session):
+    started = session.info.pop('_commit_started', None)
+    if started is not None:
+        record('commit', time.perf_counter() - started)
+
+
+request_metrics = RequestMetrics()
@@ -1,70 +1,165 @@
-import yfinance as yf
 from app.models.stock_cache import StockCache
+from app.services.quote_cache import quote_cache
+from app.services.market_data import get_provider
+from app.utils.aio import gather_limited, run_async
+from app.utils.bulk import upsert
 from app import db
+from flask import current_app
 from datetime import datetime, timedelta
+import time
+import logging
 
-def get_stock_price(symbol):
-    cached = StockCache.query.filter_by(symbol=symbol.upper()).first()
-    now = datetime.utcnow()
+logger = logging.getLogger(__name__)
+
+_recent_symbols = {}
+RECENT_SYMBOLS_LIMIT = 5000
+
+_price_listeners = []
 
-    # If cache exists and is recent, use it for info, but still get fresh price data
-    if cached and cached.last_updated > now - timedelta(days=1) and cached.long_name:
-        long_name = cached.long_name
-        logo_url = cached.logo_url
-    else:
+def add_price_listener(listener):
+    # Services register from init_app, which runs once per create_app()
+    if listener not in _price_listeners:
+        _price_listeners.append(listener)
+
+def _notify_price_listeners(results):
+    prices = {symbol: quote['price'] for symbol, quote in results.items() if 'price' in quote}
+    if not prices:
+        return
+    for listener in _price_listeners:
         try:
-            stock_info = yf.Ticker(symbol.upper()).info
-            long_name = stock_info.get('longName')
-            logo_url = stock_info.get('logo_url')
+            listener(prices)
         except Exception:
-            long_name = None
-            logo_url = None
+            logger.exception('Price listener failed')
+
+def _normalize_symbols(symbols):
+    return list(dict.fromkeys(symbol.upper() for symbol in symbols if symbol))
 
+async def _fetch_info(provider, symbol):
     try:
-        stock = yf.Ticker(symbol.upper())
-        data = stock.history(period='2d')
-        
-        if data.empty:
-            return {'error': 'No data found for the symbol'}
-        
-        price = data['Close'].iloc[-1]
-        
-        if len(data) > 1:
-            previous_close = data['Close'].iloc[-2]
-            change = price - previous_close
-            percent_change = (change / previous_close) * 100 if previous_close != 0 else 0
+        metadata = await provider.aget_metadata(symbol)
+        return metadata.get('long_name'), metadata.get('logo_url')
+    except Exception:
+        return None, None
+
+async def _fetch_upstream(provider, symbols, stale, limit, batch_size):
+    # Quote batches and metadata lookups overlap instead of running one
+    # after another; the semaphore caps concurrent upstream requests
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+    results = await gather_limited(
+        limit,
+        [provider.aget_quotes(batch) for batch in batches] + [_fetch_info(provider, symbol) for symbol in stale],
+        return_exceptions=True
+    )
+    quotes = {}
+    errors = {}
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            errors.update({symbol: result for symbol in batch})
         else:
-            daily_open = data['Open'].iloc[-1]
-            change = price - daily_open
-            percent_change = (change / daily_open) * 100 if daily_open != 0 else 0
-
-        if cached:
-            cached.price = price
-            cached.long_name = long_name
-            cached.logo_url = logo_url
-            cached.last_updated = now
+            quotes.update(result)
+    return quotes, errors, dict(zip(stale, results[len(batches):]))
+
+def _fetch_stock_prices(symbols):
+    provider = get_provider()
+    now = datetime.utcnow()
+    cached_rows = {
+        row.symbol: row
+        for row in StockCache.query.filter(StockCache.symbol.in_(symbols)).all()
+    }
+
+    # Company info rarely changes, so only refresh it once a day per symbol
+    info = {}
+    stale = []
+    for symbol in symbols:
+        cached = cached_rows.get(symbol)
+        if cached and cached.last_updated > now - timedelta(days=1) and cached.long_name:
+            info[symbol] = (cached.long_name, cached.logo_url)
         else:
-            cached = StockCache(
-                symbol=symbol.upper(), 
-                price=price, 
-                long_name=long_name, 
-                logo_url=logo_url, 
-                last_updated=now
-            )
-        
-        db.session.add(cached)
-        db.session.commit()
-        
-        return {
-            'symbol': cached.symbol,
+            stale.append(symbol)
+
+    quotes, errors, fetched_info = run_async(_fetch_upstream(
+        provider,
+        symbols,
+        stale,
+        current_app.config.get('UPSTREAM_CONCURRENCY', 8),
+        current_app.config.get('UPSTREAM_BATCH_SIZE', 100)
+    ))
+    info.update(fetched_info)
+
+    results = {}
+    rows = []
+    for symbol in symbols:
+        if symbol in errors:
+            results[symbol] = {"error": f"Failed to fetch stock price for {symbol}: {str(errors[symbol])}"}
+            continue
+        quote = quotes.get(symbol)
+        if quote is None:
+            results[symbol] = {'error': 'No data found for the symbol'}
+            continue
+
+        price, change, percent_change = quote['price'], quote['change'], quote['percent_change']
+
+        long_name, logo_url = info[symbol]
+        rows.append({
+            'symbol': symbol,
+            'price': price,
+            'long_name': long_name,
+            'logo_url': logo_url,
+            'last_updated': now
+        })
+
+        results[symbol] = {
+            'symbol': symbol,
             'price': round(price, 3),
             'change': round(change, 3),
             'percent_change': round(percent_change, 3),
             'long_name': long_name,
             'logo_url': logo_url,
-            'last_updated': cached.last_updated.isoformat()
-        }
-    except Exception as e:
-         return {
-            "error": f"Failed to fetch stock price for {symbol}: {str(e)}"
+            'last_updated': now.isoformat()
         }
+
+    # Always written to the primary: the rows above may have been read from
+    # a lagging replica in a use_replica view, and the upsert does not care
+    # whether the symbol exists yet
+    try:
+        upsert(StockCache, rows, ['symbol'], bind=db.engine)
+        db.session.commit()
+    except Exception:
+        logger.exception('Could not update the stock cache for %s', ', '.join(row['symbol'] for row in rows))
+        db.session.rollback()
+
+    _notify_price_listeners(results)
+    return results
+
+def _track_requested(symbols):
+    now = time.monotonic()
+    for symbol in symbols:
+        _recent_symbols[symbol] = now
+    if len(_recent_symbols) > RECENT_SYMBOLS_LIMIT:
+        oldest = sorted(_recent_symbols.items(), key=lambda item: item[1])
+        for symbol, _ in oldest[:len(_recent_symbols) - RECENT_SYMBOLS_LIMIT]:
+            _recent_symbols.pop(symbol, None)
+
+def get_recent_symbols(window):
+    cutoff = time.monotonic() - window
+    return [symbol for symbol, seen in list(_recent_symbols.items()) if seen >= cutoff]
+
+def refresh_stock_prices(symbols, ttl=None):
+    symbols = _normalize_symbols(symbols)
+    if not symbols:
+        return {}
+    results = _fetch_stock_prices(symbols)
+    quote_cache.put_many(results, ttl=ttl)
+    return results
+
+def get_stock_prices(symbols):
+    symbols = _normalize_symbols(symbols)
+    if not symbols:
+        return {}
+    _track_requested(symbols)
+    return quote_cache.get_many(symbols, _fetch_stock_prices)
+
+def get_stock_price(symbol):
+    if not symbol:
+        return {'error': 'No data found for the symbol'}
+    return get_stock_prices([symbol])[symbol.upper()]
@@ -0,0 +1,103 @@
+from flask import Response, current_app, jsonify, request, stream_with_context
+from app import db
+from app.models.transaction import Transaction
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_before, page_size, parse_fields
+from app.utils.streaming import STREAM_CHUNK_SIZE, ndjson_lines, csv_chunks
+
+TRANSACTION_FIELDS = {
+    'id': Transaction.id,
+    'user_id': Transaction.user_id,
+    'symbol': Transaction.symbol,
+    'type': Transaction.type,
+    'shares': Transaction.shares,
+    'price': Transaction.price,
+    'timestamp': Transaction.timestamp,
+}
+
+DEFAULT_FIELDS = ['symbol', 'type', 'shares', 'price', 'timestamp']
+
+
+def _format(field, value):
+    if value is None:
+        return None
+    if field == 'price':
+        return round(value, 2)
+    if field == 'timestamp':
+        return value.isoformat()
+    return value
+
+
+def _query(fields, user_id=None, cursor=None):
+    columns = [Transaction.id.label('_id'), Transaction.timestamp.label('_ts')]
+    columns += [TRANSACTION_FIELDS[field].label(field) for field in fields]
+    query = db.session.query(*columns)
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    if cursor is not None:
+        query = query.filter(keyset_before(Transaction.timestamp, Transaction.id, cursor))
+    return query.order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+
+
+def get_page(fields, limit, user_id=None, cursor=None):
+    rows = _query(fields, user_id, cursor).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last._ts, last._id)
+    items = [{field: _format(field, getattr(row, field)) for field in fields} for row in rows]
+    return items, next_cursor
+
+
+def _iter_rows(fields, user_id=None, cursor=None):
+    query = _query(fields, user_id, cursor).execution_options(yield_per=STREAM_CHUNK_SIZE)
+    for row in query:
+        yield [_format(field, getattr(row, field)) for field in fields]
+
+
+def stream_ndjson(fields, user_id=None, cursor=None):
+    return ndjson_lines(fields, _iter_rows(fields, user_id, cursor))
+
+
+def stream_csv(fields, user_id=None, cursor=None):
+    return csv_chunks(fields, _iter_rows(fields, user_id, cursor))
+
+
+def history_response(user_id=None, default_fields=DEFAULT_FIELDS, empty_message=None):
+    args = request.args
+    fields = parse_fields(args, TRANSACTION_FIELDS, default_fields)
+    if fields is None:
+        return jsonify({'error': f"Invalid fields. Choose from: {', '.join(TRANSACTION_FIELDS)}"}), 400
+
+    cursor = None
+    if args.get('cursor'):
+        cursor = decode_cursor(args['cursor'])
+        if cursor is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    response_format = args.get('format', 'json')
+    if response_format == 'ndjson':
+        return Response(
+            stream_with_context(stream_ndjson(fields, user_id, cursor)),
+            mimetype='application/x-ndjson'
+        )
+    if response_format == 'csv':
+        return Response(
+            stream_with_context(stream_csv(fields, user_id, cursor)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=transactions.csv'}
+        )
+    if response_format != 'json':
+        return jsonify({'error': 'Invalid format. Use "json", "ndjson" or "csv".'}), 400
+
+    limit = page_size(args, current_app.config['TRANSACTION_PAGE_SIZE'], current_app.config['TRANSACTION_PAGE_SIZE_MAX'])
+    if limit is None:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    items, next_cursor = get_page(fields, limit, user_id, cursor)
+    if not items and cursor is None and empty_message:
+        return jsonify({'message': empty_message}), 404
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
@@ -0,0 +1,96 @@
+import numpy as np
+from app import db
+from app.models.portfolio import Portfolio
+from app.services.stock_service import get_stock_prices
+
+
+class Holdings:
+    def __init__(self, rows):
+        self.user_id = np.array([row[0] for row in rows], dtype=np.int64)
+        self.symbol = np.array([row[1].upper() for row in rows], dtype=object)
+        self.shares = np.array([row[2] for row in rows], dtype=np.float64)
+        self.avg_price = np.array([row[3] for row in rows], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.user_id)
+
+
+def load_holdings(user_ids=None):
+    query = db.session.query(Portfolio.user_id, Portfolio.symbol, Portfolio.shares, Portfolio.avg_price)
+    if user_ids is not None:
+        query = query.filter(Portfolio.user_id.in_(list(user_ids)))
+    return Holdings(query.order_by(Portfolio.id).all())
+
+
+def price_vector(symbols, prices=None):
+    if not len(symbols):
+        return np.array([], dtype=np.float64)
+    unique, inverse = np.unique(symbols.astype(str), return_inverse=True)
+    if prices is None:
+        prices = get_stock_prices(unique.tolist())
+    quoted = np.array([prices.get(symbol, {}).get('price', np.nan) for symbol in unique.tolist()], dtype=np.float64)
+    return quoted[inverse]
+
+
+class Valuation:
+    def __init__(self, holdings, prices=None):
+        self.holdings = holdings
+        self.quoted_price = price_vector(holdings.symbol, prices)
+        self.priced = ~np.isnan(self.quoted_price)
+        # Fall back to the average price when a quote is unavailable
+        self.market_price = np.where(self.priced, self.quoted_price, holdings.avg_price)
+        self.market_value = holdings.shares * self.market_price
+        self.cost_basis = holdings.shares * holdings.avg_price
+        self.profit = self.market_value - self.cost_basis
+
+    @property
+    def total_value(self):
+        return float(self.market_value.sum())
+
+    @property
+    def total_cost(self):
+        return float(self.cost_basis.sum())
+
+    def rows(self):
+        h = self.holdings
+        return [
+            {
+                'symbol': symbol,
+                'shares': shares,
+                'avg_price': avg_price,
+                'market_price': market_price,
+                'market_value': market_value,
+                'profit': profit,
+                'total_invested': total_invested
+            }
+            for symbol, shares, avg_price, market_price, market_value, profit, total_invested in zip(
+                h.symbol.tolist(),
+                h.shares.tolist(),
+                np.round(h.avg_price, 2).tolist(),
+                np.round(self.market_price, 2).tolist(),
+                np.round(self.market_value, 2).tolist(),
+                np.round(self.profit, 2).tolist(),
+                np.round(self.cost_basis, 2).tolist()
+            )
+        ]
+
+    def totals_by_user(self):
+        user_ids, inverse = np.unique(self.holdings.user_id, return_inverse=True)
+        value = np.bincount(inverse, weights=self.market_value, minlength=len(user_ids))
+        cost = np.bincount(inverse, weights=self.cost_basis, minlength=len(user_ids))
+        return {
+            user_id: {
+                'portfolio_value': round(v, 2),
+                'total_cost_basis': round(c, 2),
+                'net_gain_loss': round(v - c, 2)
+            }
+            for user_id, v, c in zip(user_ids.tolist(), value.tolist(), cost.tolist())
+        }
+
+
+def value_portfolio(user_id):
+    return Valuation(load_holdings([user_id]))
+
+
+def value_users(user_ids=None):
+    return Valuation(load_holdings(user_ids)).totals_by_user()
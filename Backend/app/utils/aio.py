@@ -0,0 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+_runner = ThreadPoolExecutor(max_workers=4, thread_name_prefix='aio-runner')
+
+
+async def gather_limited(limit, awaitables, return_exceptions=False):
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def bounded(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*[bounded(a) for a in awaitables], return_exceptions=return_exceptions)
+
+
+def run_async(coro):
+    # Lets synchronous service code drive a coroutine whether or not the
+    # calling thread already has an event loop (e.g. inside an async view)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    return _runner.submit(asyncio.run, coro).result()
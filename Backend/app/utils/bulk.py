@@ -0,0 +1,35 @@
+from app import db
+
+
+def upsert(model, rows, keys, update=None, bind=None):
+    # Multi-row INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE; SQLAlchemy
+    # batches the rows into as few statements as the driver allows.
+    # `update` limits which columns an existing row takes from the new one;
+    # `bind` pins the statement to an engine instead of the session's routing.
+    if not rows:
+        return 0
+    table = model.__table__
+    update = [column for column in (update or rows[0]) if column not in keys]
+    dialect = (bind or db.session.get_bind()).dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table)
+        if update:
+            statement = statement.on_conflict_do_update(
+                index_elements=keys, set_={column: statement.excluded[column] for column in update}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=keys)
+    elif dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        # A no-op assignment keeps existing rows untouched when nothing is updated
+        assignments = {column: statement.inserted[column] for column in update} or {keys[0]: table.c[keys[0]]}
+        statement = statement.on_duplicate_key_update(assignments)
+    else:
+        raise ValueError(f'Bulk upserts are not supported on {dialect}')
+    db.session.execute(statement, rows, bind_arguments={'bind': bind} if bind is not None else None)
+    return len(rows)
@@ -1,4 +1,4 @@
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 import pytz
 
 def is_market_open(user_timezone: str):
@@ -24,4 +24,29 @@ def is_market_open(user_timezone: str):
         'timezone': user_timezone,
         'market_opens_at': market_open_time.strftime('%H:%M:%S'),
         'market_closes_at': market_close_time.strftime('%H:%M:%S')
-    }, 200
\ No newline at end of file
+    }, 200
+
+
+def next_market_close(market_timezone: str, now=None):
+    # Naive UTC datetime of the next regular-session close, used to expire DAY orders
+    tz = pytz.timezone(market_timezone)
+    local = (now or datetime.utcnow()).replace(tzinfo=pytz.utc).astimezone(tz)
+    day = local.date()
+    if local.time() >= time(16, 0):
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    close = tz.localize(datetime.combine(day, time(16, 0)))
+    return close.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def last_session_date(market_timezone: str, now=None):
+    # Date of the most recent regular session that has already closed
+    tz = pytz.timezone(market_timezone)
+    local = (now or datetime.utcnow()).replace(tzinfo=pytz.utc).astimezone(tz)
+    day = local.date()
+    if local.time() < time(16, 0):
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
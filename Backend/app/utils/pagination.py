@@ -0,0 +1,46 @@
+import base64
+from datetime import datetime
+from sqlalchemy import or_, and_
+
+
+def encode_cursor(timestamp, row_id):
+    raw = f'{timestamp.isoformat()}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_before(timestamp_column, id_column, cursor):
+    # Rows strictly after the cursor in (timestamp DESC, id DESC) order
+    timestamp, row_id = cursor
+    return or_(
+        timestamp_column < timestamp,
+        and_(timestamp_column == timestamp, id_column < row_id)
+    )
+
+
+def page_size(args, default, maximum):
+    try:
+        limit = int(args.get('limit', default))
+    except (TypeError, ValueError):
+        return None
+    if limit <= 0:
+        return None
+    return min(limit, maximum)
+
+
+def parse_fields(args, allowed, default):
+    requested = args.get('fields')
+    if not requested:
+        return list(default)
+    fields = [field.strip() for field in requested.split(',') if field.strip()]
+    if not fields or any(field not in allowed for field in fields):
+        return None
+    return fields
@@ -0,0 +1,98 @@
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app import db
+from app.models.user import User
+from app.models.admin import Admin
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.models.stock_cache import StockCache
+from app.models.community_shop import CommunityShop
+from app.models.community_purchase import CommunityPurchase
+from app.models.learning_article import LearningArticle
+from app.models.price_history import PriceBar
+from app.models.order import Order
+from app.models.equity_snapshot import EquitySnapshot
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def hot_queries():
+    # The statements the request paths run per call, with sample parameters.
+    # Queries that read a whole table on purpose (leaderboard rebuilds,
+    # unfiltered admin listings) are deliberately left out.
+    since = datetime(2024, 1, 1)
+    return {
+        'auth.login': select(User).where(User.username == 'user'),
+        'auth.register_email': select(User.id).where(User.email == 'user@example.com'),
+        'admin_auth.login': select(Admin).where(Admin.email == 'admin@example.com'),
+        'portfolio.holdings': select(Portfolio).where(Portfolio.user_id == 1),
+        'order.holding': select(Portfolio.id).where(Portfolio.user_id == 1, Portfolio.symbol == 'AAPL'),
+        'transaction.history': (
+            select(Transaction.id, Transaction.symbol, Transaction.timestamp)
+            .where(Transaction.user_id == 1, Transaction.timestamp < since)
+            .order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+            .limit(101)
+        ),
+        'stock.quotes': select(StockCache).where(StockCache.symbol.in_(['AAPL', 'MSFT'])),
+        'stock.history': (
+            select(PriceBar.ts, PriceBar.close)
+            .where(PriceBar.symbol == 'AAPL', PriceBar.interval == '1d', PriceBar.ts >= since - timedelta(days=365))
+            .order_by(PriceBar.ts)
+        ),
+        'community.shop': select(CommunityShop).where(CommunityShop.available == True),
+        'community.purchase_exists': select(CommunityPurchase.id).where(
+            CommunityPurchase.user_id == 1, CommunityPurchase.item_id == 1
+        ),
+        'community.my_items': (
+            select(CommunityPurchase, CommunityShop)
+            .join(CommunityShop)
+            .where(CommunityPurchase.user_id == 1)
+        ),
+        'orders.open_book': select(Order).where(Order.status == 'OPEN'),
+        'orders.list': (
+            select(Order)
+            .where(Order.user_id == 1)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(500)
+        ),
+        'portfolio.performance': (
+            select(EquitySnapshot.day, EquitySnapshot.equity)
+            .where(EquitySnapshot.user_id == 1, EquitySnapshot.day >= since.date())
+            .order_by(EquitySnapshot.day)
+        ),
+        'help.latest': select(LearningArticle).order_by(LearningArticle.created_at.desc()).limit(10),
+    }
+
+
+def explain(statement):
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect == 'sqlite':
+        plan = [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql)]
+        scans = [match.group(1) for match in map(SQLITE_SCAN.match, plan) if match]
+    elif dialect == 'postgresql':
+        # Small or empty tables make the planner prefer sequential scans even
+        # when an index exists; disabling them shows whether one is usable
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = [row[0] for row in connection.exec_driver_sql('EXPLAIN ' + sql)]
+        scans = [match.group(1) for match in map(POSTGRES_SCAN.search, plan) if match]
+    else:
+        rows = connection.exec_driver_sql('EXPLAIN ' + sql).mappings().all()
+        plan = [f"{row['table']}: type={row['type']} key={row['key']}" for row in rows]
+        scans = [row['table'] for row in rows if row['type'] == 'ALL']
+    return plan, scans
+
+
+def check_query_plans():
+    results = []
+    try:
+        for name, statement in hot_queries().items():
+            plan, scans = explain(statement)
+            results.append({'name': name, 'plan': plan, 'full_scans': scans})
+    finally:
+        db.session.rollback()
+    return results
@@ -0,0 +1,37 @@
+from functools import wraps
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+
+def _replica_requested():
+    return has_app_context() and g.get('_use_replica', False)
+
+
+class RoutingSession(Session):
+    # Reads in a use_replica view go to the replica bind when one is
+    # configured; flushes, DML and SELECT ... FOR UPDATE stay on the primary
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+            and getattr(clause, '_for_update_arg', None) is None
+            and _replica_requested()
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_replica(f):
+    # Left set for the rest of the request so streamed responses that query
+    # after the view returns stay on the replica too
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g._use_replica = True
+        return f(*args, **kwargs)
+    return decorated_function
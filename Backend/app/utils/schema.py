@@ -0,0 +1,70 @@
+import sqlalchemy as sa
+from alembic import op
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def has_table(table):
+    return _inspector().has_table(table)
+
+
+def has_index(table, name):
+    inspector = _inspector()
+    if not inspector.has_table(table):
+        return False
+    indexes = inspector.get_indexes(table) + inspector.get_unique_constraints(table)
+    return any(index['name'] == name for index in indexes)
+
+
+def _invalid_postgres_index(name):
+    # An interrupted CREATE INDEX CONCURRENTLY leaves the index behind
+    # marked invalid: it exists but is never used, nor enforced if unique
+    return op.get_bind().execute(
+        sa.text(
+            'SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+            'WHERE c.relname = :name AND NOT i.indisvalid'
+        ),
+        {'name': name}
+    ).first() is not None
+
+
+def create_table_if_missing(table, *columns, **kwargs):
+    if not has_table(table):
+        op.create_table(table, *columns, **kwargs)
+
+
+def create_index_online(name, table, columns, unique=False):
+    # Builds the index without blocking writes: CONCURRENTLY on PostgreSQL
+    # (which cannot run inside a transaction), an in-place non-locking
+    # ALTER on MySQL/MariaDB, and a plain CREATE INDEX elsewhere
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql' and _invalid_postgres_index(name):
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    elif has_index(table, name):
+        return
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+    elif dialect in ('mysql', 'mariadb'):
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        op.execute(
+            f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    else:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def drop_index_online(name, table):
+    if not has_index(table, name):
+        return
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    elif dialect in ('mysql', 'mariadb'):
+        op.execute(f"ALTER TABLE {table} DROP INDEX {name}, ALGORITHM=INPLACE, LOCK=NONE")
+    else:
+        op.drop_index(name, table_name=table)
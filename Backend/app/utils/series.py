@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the points that preserve the
+    # visual shape of the series when thinning it to `threshold` points.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def ohlc_buckets(t, o, h, l, c, v, points):
+    n = len(t)
+    if points >= n or points < 1:
+        return t, o, h, l, c, v
+    starts = np.linspace(0, n, points, endpoint=False).astype(np.int64)
+    ends = np.append(starts[1:], n) - 1
+    return (
+        t[starts],
+        o[starts],
+        np.maximum.reduceat(h, starts),
+        np.minimum.reduceat(l, starts),
+        c[ends],
+        np.add.reduceat(v, starts)
+    )
+
+
+def history_columns(frame):
+    index = frame.index if frame.index.tz is None else frame.index.tz_convert('UTC')
+    return (
+        index.as_unit('s').asi8.astype(np.int64),
+        frame['Open'].to_numpy(dtype=np.float64),
+        frame['High'].to_numpy(dtype=np.float64),
+        frame['Low'].to_numpy(dtype=np.float64),
+        frame['Close'].to_numpy(dtype=np.float64),
+        frame['Volume'].fillna(0).to_numpy(dtype=np.float64)
+    )
+
+
+def downsample(columns, points, method='lttb'):
+    if not points:
+        return columns
+    if method == 'ohlc':
+        return ohlc_buckets(*columns, points)
+    idx = lttb_indices(columns[0].astype(np.float64), columns[4], points)
+    return tuple(column[idx] for column in columns)
+
+
+def history_rows(columns, tz=None):
+    t, o, h, l, c, v = columns
+    dates = pd.to_datetime(t, unit='s', utc=True)
+    dates = dates.tz_convert(tz) if tz is not None else dates
+    return [
+        {"date": date, "timestamp": ts, "open": op, "high": hi, "low": lo, "close": cl, "volume": vol}
+        for date, ts, op, hi, lo, cl, vol in zip(
+            dates.strftime('%Y-%m-%d').tolist(), t.tolist(), o.tolist(), h.tolist(), l.tolist(), c.tolist(), v.tolist()
+        )
+    ]
@@ -0,0 +1,25 @@
+import csv
+import io
+import json
+
+STREAM_CHUNK_SIZE = 1000
+
+
+def ndjson_lines(fields, rows):
+    for values in rows:
+        yield json.dumps(dict(zip(fields, values))) + '\n'
+
+
+def csv_chunks(fields, rows, chunk_size=STREAM_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    count = 0
+    for values in rows:
+        writer.writerow(values)
+        count += 1
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
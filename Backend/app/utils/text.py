@@ -0,0 +1,7 @@
+from bs4 import BeautifulSoup
+
+
+def html_to_text(html):
+    if html is None:
+        return None
+    return BeautifulSoup(html, 'lxml').get_text(separator='\n')
@@ -0,0 +1,71 @@
+# ASGI entry point: uvicorn asgi:app --host 0.0.0.0 --port $PORT
+#
+# Requests run on a bounded thread pool (ASGI_THREADS) so a single process
+# keeps serving while other requests wait on yfinance or newsapi, instead
+# of being capped at one request per worker as under sync gunicorn.
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from app import create_app
+
+
+class _PooledInstance(WsgiToAsgiInstance):
+    # Only the public WsgiToAsgiInstance surface is used here (build_environ,
+    # start_response, sync_send), so an asgiref upgrade cannot silently
+    # change how requests are dispatched
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        # asgiref runs wrapped WSGI apps on one shared thread by default,
+        # which would serialize every request
+        await sync_to_async(self._run, thread_sensitive=False, executor=self.executor)(body)
+
+    def _run(self, body):
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            self.sync_send({'type': 'http.response.start', 'status': 400, 'headers': [(b'content-type', b'text/plain')]})
+            self.sync_send({'type': 'http.response.body', 'body': b'Bad Request'})
+            return
+        result = self.wsgi_application(environ, self.start_response)
+        try:
+            for output in result:
+                if not output:
+                    continue
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                self.sync_send({'type': 'http.response.body', 'body': output, 'more_body': True})
+        finally:
+            # Runs Flask's teardown handlers, as a WSGI server would
+            if hasattr(result, 'close'):
+                result.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    def __init__(self, wsgi_application, threads):
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            # Startup work already happened in create_app
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    self.executor.shutdown(wait=False)
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        await _PooledInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+flask_app = create_app()
+app = PooledWsgiToAsgi(flask_app, flask_app.config['ASGI_THREADS'])
@@ -0,0 +1,86 @@
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+
+def symbol_names(count):
+    return [f'SYM{i:03d}' for i in range(count)]
+
+
+def write_replay_data(directory, symbols, days=500, seed=0):
+    # Seeded random walks so every run replays identical prices
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    dates = pd.bdate_range(end=pd.Timestamp('2025-06-30'), periods=days)
+    for symbol in symbols:
+        start = rng.uniform(20, 500)
+        close = start * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+        spread = close * rng.uniform(0.002, 0.02, days)
+        frame = pd.DataFrame({
+            'Date': dates.strftime('%Y-%m-%d'),
+            'Open': close + rng.uniform(-1, 1, days) * spread,
+            'High': close + spread,
+            'Low': close - spread,
+            'Close': close,
+            'Volume': rng.integers(1e5, 1e7, days)
+        })
+        frame.to_csv(os.path.join(directory, f'{symbol}.csv'), index=False)
+    pd.DataFrame({
+        'symbol': symbols,
+        'long_name': [f'{symbol} Holdings Inc.' for symbol in symbols],
+        'logo_url': [None] * len(symbols)
+    }).to_csv(os.path.join(directory, 'symbols.csv'), index=False)
+
+
+def seed_database(db, users, holdings_per_user, transactions_per_user, symbols, seed=0, chunk_size=5000):
+    from app.models.user import User
+    from app.models.portfolio import Portfolio
+    from app.models.transaction import Transaction
+
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+    holdings_per_user = min(holdings_per_user, len(symbols))
+
+    def flush(model, rows):
+        for start in range(0, len(rows), chunk_size):
+            db.session.execute(insert(model), rows[start:start + chunk_size])
+
+    flush(User, [{
+        'id': user_id,
+        'username': f'bench{user_id}',
+        'email': f'bench{user_id}@example.com',
+        'balance': 1e9,
+        'community_score': int(rng.integers(0, 500)),
+        'created_at': now
+    } for user_id in range(1, users + 1)])
+
+    holdings = []
+    transactions = []
+    for user_id in range(1, users + 1):
+        for index in rng.choice(len(symbols), holdings_per_user, replace=False):
+            holdings.append({
+                'user_id': user_id,
+                'symbol': symbols[index],
+                'shares': float(rng.integers(1, 200)),
+                'avg_price': float(rng.uniform(20, 500)),
+                'updated_at': now
+            })
+        offsets = np.sort(rng.integers(0, 365 * 86400, transactions_per_user))
+        picks = rng.integers(0, len(symbols), transactions_per_user)
+        for offset, index in zip(offsets.tolist(), picks.tolist()):
+            transactions.append({
+                'user_id': user_id,
+                'symbol': symbols[index],
+                'shares': float(rng.integers(1, 50)),
+                'price': float(rng.uniform(20, 500)),
+                'type': 'BUY' if rng.random() < 0.6 else 'SELL',
+                'timestamp': now - timedelta(seconds=offset)
+            })
+        if len(transactions) >= chunk_size:
+            flush(Transaction, transactions)
+            transactions = []
+    flush(Portfolio, holdings)
+    flush(Transaction, transactions)
+    db.session.commit()
@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.data import symbol_names, write_replay_data, seed_database
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test and micro-benchmark the API against an offline replay provider.')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--holdings', type=int, default=10, help='holdings per user')
+    parser.add_argument('--transactions', type=int, default=100, help='transactions per user')
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--days', type=int, default=500, help='daily bars per symbol')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests per endpoint')
+    parser.add_argument('--iterations', type=int, default=1000, help='iterations per micro-benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*', help='run only the named benchmarks')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='previous results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p50 slowdown before flagging a regression')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary database and replay data')
+    return parser.parse_args(argv)
+
+
+def summarize(name, samples, elapsed, statuses=None):
+    samples_ms = np.asarray(samples) * 1000
+    result = {
+        'name': name,
+        'count': len(samples),
+        'p50_ms': round(float(np.percentile(samples_ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(samples_ms, 99)), 3),
+        'mean_ms': round(float(samples_ms.mean()), 3),
+        'max_ms': round(float(samples_ms.max()), 3),
+        'throughput_per_s': round(len(samples) / elapsed, 1) if elapsed else None
+    }
+    if statuses is not None:
+        result['statuses'] = {str(status): statuses.count(status) for status in sorted(set(statuses))}
+    return result
+
+
+def measure(name, call, count, warmup, with_status=False):
+    for i in range(warmup):
+        call(i)
+    samples = []
+    statuses = []
+    started = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        status = call(i)
+        samples.append(time.perf_counter() - t0)
+        if with_status:
+            statuses.append(status)
+    elapsed = time.perf_counter() - started
+    return summarize(name, samples, elapsed, statuses or None)
+
+
+def endpoint_benchmarks(app, args, symbols):
+    from flask_jwt_extended import create_access_token
+
+    client = app.test_client()
+    with app.app_context():
+        headers = [
+            {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+            for user_id in range(1, min(args.users, 500) + 1)
+        ]
+
+    def get(url):
+        return lambda i: client.get(url(i), headers=headers[i % len(headers)]).status_code
+
+    def buy(i):
+        return client.post(
+            '/api/transaction/buy',
+            json={'symbol': symbols[i % len(symbols)], 'shares': 1},
+            headers=headers[i % len(headers)]
+        ).status_code
+
+    return {
+        'GET /portfolio': get(lambda i: '/api/portfolio'),
+        'GET /portfolio/value': get(lambda i: '/api/portfolio/value'),
+        'GET /leaderboard': get(lambda i: '/api/leaderboard'),
+        'POST /transaction/buy': buy,
+        'GET /transaction/history': get(lambda i: '/api/transaction/history'),
+        'GET /stock/history': get(lambda i: f'/api/stock/history/{symbols[i % len(symbols)]}?range=1y&interval=1d'),
+    }
+
+
+def micro_benchmarks(app, symbols):
+    from app.services.quote_cache import quote_cache
+    from app.services.stock_service import get_stock_price
+    from app.services.history_store import history_store
+    from app.services.valuation import value_portfolio
+    from app.services.transaction_history import get_page, DEFAULT_FIELDS
+    from app.utils.series import history_columns, history_rows, downsample
+    from app.services.backtest import load_prices, run_strategy
+
+    with app.app_context():
+        frame = history_store.get_history(symbols[0], period='1y', interval='1d')
+        prices = load_prices(symbols, frame.index[0].date(), frame.index[-1].date())
+    columns = history_columns(frame)
+
+    def in_context(fn):
+        def call(i):
+            with app.app_context():
+                fn(i)
+        return call
+
+    def cold_price(i):
+        quote_cache.clear()
+        get_stock_price(symbols[i % len(symbols)])
+
+    return {
+        'get_stock_price (cached)': in_context(lambda i: get_stock_price(symbols[i % len(symbols)])),
+        'get_stock_price (cold)': in_context(cold_price),
+        'history_columns': lambda i: history_columns(frame),
+        'history_rows': lambda i: history_rows(columns, frame.index.tz),
+        'downsample lttb 100': lambda i: downsample(columns, 100, 'lttb'),
+        'valuation rows': in_context(lambda i: value_portfolio(i % 100 + 1).rows()),
+        'transaction page format': in_context(lambda i: get_page(DEFAULT_FIELDS, 100, user_id=i % 100 + 1)),
+        'backtest sma crossover': lambda i: run_strategy(prices, {'type': 'sma_crossover', 'fast': 10, 'slow': 50}, 100000, details=False),
+    }
+
+
+def compare(results, path, tolerance):
+    with open(path) as f:
+        baseline = {entry['name']: entry for entry in json.load(f)['results']}
+    regressions = []
+    for entry in results:
+        previous = baseline.get(entry['name'])
+        if not previous or not previous['p50_ms']:
+            continue
+        change = entry['p50_ms'] / previous['p50_ms'] - 1
+        entry['p50_change'] = round(change, 3)
+        if change > tolerance:
+            regressions.append(entry['name'])
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='stocksim-bench-')
+    replay_dir = os.path.join(workdir, 'replay')
+    symbols = symbol_names(args.symbols)
+    write_replay_data(replay_dir, symbols, days=args.days, seed=args.seed)
+
+    # Config reads the environment at import time, so it is set before the app is imported
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'MARKET_DATA_PROVIDER': 'replay',
+        'MARKET_DATA_REPLAY_DIR': replay_dir,
+        'PRICE_REFRESHER_ENABLED': 'false',
+        'ORDER_ENGINE_ENABLED': 'false',
+        'REQUEST_METRICS_ENABLED': 'false',
+        'FORECAST_WORKERS': '0',
+        'FORECAST_CACHE_DIR': os.path.join(workdir, 'forecasts'),
+    })
+    from app import create_app, db
+    from flask_migrate import upgrade
+
+    app = create_app()
+    logging.getLogger('alembic').setLevel(logging.WARNING)
+    with app.app_context():
+        upgrade()
+        started = time.perf_counter()
+        seed_database(db, args.users, args.holdings, args.transactions, symbols, seed=args.seed)
+        seed_seconds = time.perf_counter() - started
+
+    results = []
+    suites = [
+        ('endpoint', endpoint_benchmarks(app, args, symbols), args.requests, args.warmup),
+        ('micro', micro_benchmarks(app, symbols), args.iterations, min(args.warmup, args.iterations)),
+    ]
+    for kind, benchmarks, count, warmup in suites:
+        for name, call in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            result = measure(name, call, count, warmup, with_status=kind == 'endpoint')
+            result['kind'] = kind
+            results.append(result)
+            print(f"{name:<32} p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms  {result['throughput_per_s']:>9} /s")
+
+    regressions = compare(results, args.compare, args.tolerance) if args.compare else []
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'users': args.users,
+            'holdings': args.holdings,
+            'transactions': args.transactions,
+            'symbols': args.symbols,
+            'days': args.days,
+            'requests': args.requests,
+            'iterations': args.iterations,
+            'seed': args.seed
+        },
+        'seed_seconds': round(seed_seconds, 3),
+        'results': results,
+        'regressions': regressions
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {args.output}')
+
+    if args.keep:
+        print(f'Benchmark data kept in {workdir}')
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,24 +3,149 @@ import os
 
 load_dotenv()
 
+
+def _database_uri(db_url, engine_options):
+    if 'mysql' in db_url and '?ssl=true' in db_url:
+        # Handle SSL for MySQL (like SkySQL)
+        engine_options['connect_args'] = {'ssl': {'true': True}}
+        return db_url.split('?')[0]
+    if 'postgresql' in db_url and not 'sslmode' in db_url:
+        # Add sslmode for Render's PostgreSQL if not present
+        return f"{db_url}?sslmode=require"
+    return db_url
+
+
+def _pool_options(db_url):
+    # SQLite keeps SQLAlchemy's own pool defaults
+    if db_url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        # Recycled before typical server/proxy idle timeouts drop the connection
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+
 class Config:
     db_url = os.environ.get('DATABASE_URL')
-    
+
     SQLALCHEMY_ENGINE_OPTIONS = {}
     if db_url:
-        if 'mysql' in db_url and '?ssl=true' in db_url:
-            # Handle SSL for MySQL (like SkySQL)
-            SQLALCHEMY_DATABASE_URI = db_url.split('?')[0]
-            SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'ssl': {'true': True}}
-        elif 'postgresql' in db_url and not 'sslmode' in db_url:
-            # Add sslmode for Render's PostgreSQL if not present
-            SQLALCHEMY_DATABASE_URI = f"{db_url}?sslmode=require"
-        else:
-            SQLALCHEMY_DATABASE_URI = db_url
+        SQLALCHEMY_DATABASE_URI = _database_uri(db_url, SQLALCHEMY_ENGINE_OPTIONS)
     else:
         # Fallback to a local SQLite database
         SQLALCHEMY_DATABASE_URI = 'sqlite:///app.db'
+    SQLALCHEMY_ENGINE_OPTIONS.update(_pool_options(SQLALCHEMY_DATABASE_URI))
+
+    # Optional read replica; read-only routes (leaderboard, transaction
+    # history, admin listings, help) query it and may lag the primary slightly
+    replica_url = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {}
+    if replica_url:
+        replica_options = {}
+        replica_options['url'] = _database_uri(replica_url, replica_options)
+        replica_options.update(_pool_options(replica_options['url']))
+        SQLALCHEMY_BINDS['replica'] = replica_options
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'a-super-secret-key'
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'another-super-secret-key'
+
+    # 'yfinance' for live data, 'replay' to serve prices from local CSV/Parquet files
+    MARKET_DATA_PROVIDER = os.environ.get('MARKET_DATA_PROVIDER', 'yfinance')
+    MARKET_DATA_REPLAY_DIR = os.environ.get('MARKET_DATA_REPLAY_DIR', os.path.join(os.path.dirname(__file__), 'app', 'data', 'replay'))
+    MARKET_DATA_REPLAY_LATENCY_MS = float(os.environ.get('MARKET_DATA_REPLAY_LATENCY_MS', 0))
+    MARKET_DATA_REPLAY_STEP_SECONDS = float(os.environ.get('MARKET_DATA_REPLAY_STEP_SECONDS', 0))
+
+    QUOTE_CACHE_TTL = int(os.environ.get('QUOTE_CACHE_TTL', 15))
+    QUOTE_CACHE_MAX_SIZE = int(os.environ.get('QUOTE_CACHE_MAX_SIZE', 2048))
+
+    # Background refresher keeping StockCache and the quote cache warm
+    PRICE_REFRESHER_ENABLED = os.environ.get('PRICE_REFRESHER_ENABLED', 'false').lower() == 'true'
+    PRICE_REFRESH_INTERVAL_OPEN = int(os.environ.get('PRICE_REFRESH_INTERVAL_OPEN', 15))
+    PRICE_REFRESH_INTERVAL_CLOSED = int(os.environ.get('PRICE_REFRESH_INTERVAL_CLOSED', 300))
+    PRICE_REFRESH_BATCH_SIZE = int(os.environ.get('PRICE_REFRESH_BATCH_SIZE', 100))
+    PRICE_REFRESH_RECENT_WINDOW = int(os.environ.get('PRICE_REFRESH_RECENT_WINDOW', 900))
+    PRICE_MAX_STALENESS = int(os.environ.get('PRICE_MAX_STALENESS', 60))
+    MARKET_TIMEZONE = os.environ.get('MARKET_TIMEZONE', 'America/New_York')
+
+    LEADERBOARD_REBUILD_INTERVAL = int(os.environ.get('LEADERBOARD_REBUILD_INTERVAL', 300))
+
+    # Fitted Prophet models are cached per symbol and last trading date
+    FORECAST_CACHE_DIR = os.environ.get('FORECAST_CACHE_DIR')
+    FORECAST_CACHE_SIZE = int(os.environ.get('FORECAST_CACHE_SIZE', 32))
+    FORECAST_DISK_CACHE_SIZE = int(os.environ.get('FORECAST_DISK_CACHE_SIZE', 256))
+    FORECAST_WORKERS = int(os.environ.get('FORECAST_WORKERS', 2))
+    FORECAST_FIT_TIMEOUT = int(os.environ.get('FORECAST_FIT_TIMEOUT', 300))
+    # Longest forecast horizon a client may request, in days
+    FORECAST_MAX_DAYS = int(os.environ.get('FORECAST_MAX_DAYS', 365))
+
+    # Strategy backtests; parameter sweeps fan out over a process pool
+    BACKTEST_WORKERS = int(os.environ.get('BACKTEST_WORKERS', 2))
+    BACKTEST_MAX_SYMBOLS = int(os.environ.get('BACKTEST_MAX_SYMBOLS', 50))
+    BACKTEST_MAX_RUNS = int(os.environ.get('BACKTEST_MAX_RUNS', 200))
+    BACKTEST_TIMEOUT = int(os.environ.get('BACKTEST_TIMEOUT', 120))
+
+    # Seconds before the newest stored history bar is re-fetched from the provider
+    HISTORY_MAX_TAIL_AGE = int(os.environ.get('HISTORY_MAX_TAIL_AGE', 900))
+
+    ORDER_MAX_RETRIES = int(os.environ.get('ORDER_MAX_RETRIES', 3))
+    TRANSACTION_PAGE_SIZE = int(os.environ.get('TRANSACTION_PAGE_SIZE', 100))
+    TRANSACTION_PAGE_SIZE_MAX = int(os.environ.get('TRANSACTION_PAGE_SIZE_MAX', 1000))
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', 100))
+    ADMIN_PAGE_SIZE_MAX = int(os.environ.get('ADMIN_PAGE_SIZE_MAX', 1000))
+    TRANSACTION_BATCH_MAX_LEGS = int(os.environ.get('TRANSACTION_BATCH_MAX_LEGS', 100))
+
+    # Server-Sent Events price streams: seconds between shared polls, per-stream symbol cap
+    PRICE_STREAM_INTERVAL = int(os.environ.get('PRICE_STREAM_INTERVAL', 5))
+    PRICE_STREAM_MAX_SYMBOLS = int(os.environ.get('PRICE_STREAM_MAX_SYMBOLS', 50))
+    PRICE_STREAM_KEEPALIVE = int(os.environ.get('PRICE_STREAM_KEEPALIVE', 15))
+    # Open streams per process (keep below GUNICORN_THREADS/ASGI_THREADS) and
+    # seconds before a stream is closed for the client to reconnect
+    PRICE_STREAM_MAX_CONNECTIONS = int(os.environ.get('PRICE_STREAM_MAX_CONNECTIONS', 24))
+    PRICE_STREAM_MAX_AGE = int(os.environ.get('PRICE_STREAM_MAX_AGE', 300))
+
+    # Resting limit/stop orders, matched on a background thread from the price stream.
+    # The thread starts with the first request a process serves, and only the
+    # process holding the database lease matches orders
+    ORDER_ENGINE_ENABLED = os.environ.get('ORDER_ENGINE_ENABLED', 'false').lower() == 'true'
+    ORDER_BOOK_RELOAD_INTERVAL = int(os.environ.get('ORDER_BOOK_RELOAD_INTERVAL', 30))
+    ORDER_ENGINE_LEASE_SECONDS = int(os.environ.get('ORDER_ENGINE_LEASE_SECONDS', 15))
+
+    # Concurrent upstream requests per price fetch, and symbols per quote request
+    UPSTREAM_CONCURRENCY = int(os.environ.get('UPSTREAM_CONCURRENCY', 8))
+    UPSTREAM_BATCH_SIZE = int(os.environ.get('UPSTREAM_BATCH_SIZE', 100))
+
+    # Request threads per process when served through asgi.py
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 64))
+
+    # Seconds the rendered help article list is served from memory
+    HELP_CACHE_TTL = int(os.environ.get('HELP_CACHE_TTL', 300))
+
+    # Business headlines proxied from NewsAPI; point the base URL at a stub server for testing
+    NEWS_API_KEY = os.environ.get('NEWS_API_KEY')
+    NEWS_API_BASE_URL = os.environ.get('NEWS_API_BASE_URL', 'https://newsapi.org/v2')
+    NEWS_CACHE_TTL = int(os.environ.get('NEWS_CACHE_TTL', 300))
+    NEWS_STALE_TTL = int(os.environ.get('NEWS_STALE_TTL', 3600))
+    NEWS_CONNECT_TIMEOUT = float(os.environ.get('NEWS_CONNECT_TIMEOUT', 3))
+    NEWS_READ_TIMEOUT = float(os.environ.get('NEWS_READ_TIMEOUT', 10))
+    NEWS_POOL_SIZE = int(os.environ.get('NEWS_POOL_SIZE', 10))
+    NEWS_CIRCUIT_THRESHOLD = int(os.environ.get('NEWS_CIRCUIT_THRESHOLD', 5))
+    NEWS_CIRCUIT_RESET = int(os.environ.get('NEWS_CIRCUIT_RESET', 60))
+
+    # Per-request query/provider/commit timings, Server-Timing headers and /metrics
+    REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'false').lower() == 'true'
+    # /metrics is only served when a token is set, and scrapers must send it
+    # as Authorization: Bearer <token>
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Sampled cProfile dumps of requests slower than the threshold (needs REQUEST_METRICS_ENABLED)
+    PROFILE_SLOW_REQUESTS = os.environ.get('PROFILE_SLOW_REQUESTS', 'false').lower() == 'true'
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.1))
+    PROFILE_SLOW_THRESHOLD_MS = int(os.environ.get('PROFILE_SLOW_THRESHOLD_MS', 500))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')
+
+    # Seconds a migration waits for a table lock before failing instead of blocking traffic
+    MIGRATION_LOCK_TIMEOUT = int(os.environ.get('MIGRATION_LOCK_TIMEOUT', 5))
@@ -0,0 +1,15 @@
+# gunicorn -c gunicorn.conf.py "app:create_app()"
+#
+# Threaded workers: each Server-Sent Events stream (/api/stream/*) holds a
+# request thread for its lifetime, so sync workers would be taken out by a
+# few open browser tabs. PRICE_STREAM_MAX_CONNECTIONS caps streams per
+# process below GUNICORN_THREADS so the rest of the API keeps its threads.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+# gthread workers heartbeat from their main loop, so long-lived streams do not trip this
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
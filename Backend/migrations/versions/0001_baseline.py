@@ -0,0 +1,149 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.schema import create_table_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by the old create_db.py already have some or all of
+    # these tables, so each one is only created when missing
+    create_table_if_missing(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('first_name', sa.String(length=50), nullable=True),
+        sa.Column('last_name', sa.String(length=50), nullable=True),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('phone_number', sa.String(length=20), nullable=True),
+        sa.Column('date_of_birth', sa.Date(), nullable=True),
+        sa.Column('address', sa.String(length=255), nullable=True),
+        sa.Column('password_hash', sa.String(length=256), nullable=True),
+        sa.Column('balance', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('community_score', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+    )
+    create_table_if_missing(
+        'admin',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+    )
+    create_table_if_missing(
+        'stock_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('long_name', sa.String(length=255), nullable=True),
+        sa.Column('logo_url', sa.String(length=255), nullable=True),
+        sa.Column('last_updated', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol')
+    )
+    create_table_if_missing(
+        'community_shop',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('cost', sa.Float(), nullable=False),
+        sa.Column('score_value', sa.Integer(), nullable=False),
+        sa.Column('emoji', sa.String(length=10), nullable=False),
+        sa.Column('available', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table_if_missing(
+        'learning_articles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('source_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table_if_missing(
+        'portfolio',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('shares', sa.Float(), nullable=False),
+        sa.Column('avg_price', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table_if_missing(
+        'transactions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('shares', sa.Float(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('type', sa.String(length=4), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table_if_missing(
+        'community_purchase',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['item_id'], ['community_shop.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table_if_missing(
+        'price_history',
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('interval', sa.String(length=5), nullable=False),
+        sa.Column('ts', sa.DateTime(), nullable=False),
+        sa.Column('open', sa.Float(), nullable=False),
+        sa.Column('high', sa.Float(), nullable=False),
+        sa.Column('low', sa.Float(), nullable=False),
+        sa.Column('close', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'interval', 'ts')
+    )
+    create_table_if_missing(
+        'price_history_sync',
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('interval', sa.String(length=5), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('tz', sa.String(length=50), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('symbol', 'interval')
+    )
+
+
+def downgrade():
+    op.drop_table('price_history_sync')
+    op.drop_table('price_history')
+    op.drop_table('community_purchase')
+    op.drop_table('transactions')
+    op.drop_table('portfolio')
+    op.drop_table('learning_articles')
+    op.drop_table('community_shop')
+    op.drop_table('stock_cache')
+    op.drop_table('admin')
+    op.drop_table('users')
@@ -0,0 +1,132 @@
+"""indexes and unique constraints for hot query paths
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:30:00
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+from app.utils.schema import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_path_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+portfolio = sa.table(
+    'portfolio',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('symbol', sa.String),
+    sa.column('shares', sa.Float),
+    sa.column('avg_price', sa.Float)
+)
+
+community_purchase = sa.table(
+    'community_purchase',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('item_id', sa.Integer)
+)
+
+community_shop = sa.table(
+    'community_shop',
+    sa.column('id', sa.Integer),
+    sa.column('cost', sa.Float),
+    sa.column('score_value', sa.Integer)
+)
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.Integer),
+    sa.column('balance', sa.Float),
+    sa.column('community_score', sa.Integer)
+)
+
+
+def _merge_duplicate_holdings(bind):
+    # Concurrent buys could insert a second row for the same holding before
+    # the unique index existed; fold them into the oldest row
+    duplicates = bind.execute(
+        sa.select(portfolio.c.user_id, portfolio.c.symbol)
+        .group_by(portfolio.c.user_id, portfolio.c.symbol)
+        .having(sa.func.count() > 1)
+    ).all()
+    for user_id, symbol in duplicates:
+        rows = bind.execute(
+            sa.select(portfolio.c.id, portfolio.c.shares, portfolio.c.avg_price)
+            .where(portfolio.c.user_id == user_id, portfolio.c.symbol == symbol)
+            .order_by(portfolio.c.id)
+        ).all()
+        shares = sum(row.shares for row in rows)
+        avg_price = sum(row.shares * row.avg_price for row in rows) / shares if shares else rows[0].avg_price
+        bind.execute(portfolio.update().where(portfolio.c.id == rows[0].id).values(shares=shares, avg_price=avg_price))
+        bind.execute(portfolio.delete().where(portfolio.c.id.in_([row.id for row in rows[1:]])))
+
+
+def _refund_duplicate_purchases(bind):
+    # A double-clicked purchase charged the item twice before the unique
+    # index existed; keep the oldest row and undo the balance debit and
+    # community score of every extra one
+    rows = bind.execute(
+        sa.select(
+            community_purchase.c.id, community_purchase.c.user_id, community_purchase.c.item_id,
+            community_shop.c.cost, community_shop.c.score_value
+        )
+        .select_from(
+            community_purchase.outerjoin(community_shop, community_shop.c.id == community_purchase.c.item_id)
+        )
+        .order_by(community_purchase.c.id)
+    ).all()
+    seen = set()
+    extra = []
+    for row in rows:
+        if (row.user_id, row.item_id) in seen:
+            extra.append(row)
+        seen.add((row.user_id, row.item_id))
+    unpriced = [row.id for row in extra if row.cost is None]
+    if unpriced:
+        raise RuntimeError(
+            f'Duplicate community purchases {unpriced} reference deleted shop items, so their '
+            'refund is unknown; settle them by hand before upgrading'
+        )
+    for row in extra:
+        logger.warning(
+            'Refunding duplicate community purchase %s (user %s, item %s): %.2f balance, %s score',
+            row.id, row.user_id, row.item_id, row.cost, row.score_value
+        )
+        bind.execute(
+            users.update().where(users.c.id == row.user_id).values(
+                balance=users.c.balance + row.cost,
+                community_score=users.c.community_score - row.score_value
+            )
+        )
+        bind.execute(community_purchase.delete().where(community_purchase.c.id == row.id))
+
+
+def upgrade():
+    bind = op.get_bind()
+    _merge_duplicate_holdings(bind)
+    _refund_duplicate_purchases(bind)
+
+    create_index_online('uq_portfolio_user_id_symbol', 'portfolio', ['user_id', 'symbol'], unique=True)
+    create_index_online('ix_transactions_user_id_timestamp', 'transactions', ['user_id', 'timestamp'])
+    create_index_online(
+        'uq_community_purchase_user_id_item_id', 'community_purchase', ['user_id', 'item_id'], unique=True
+    )
+    create_index_online('ix_community_shop_available', 'community_shop', ['available'])
+    create_index_online('ix_learning_articles_created_at', 'learning_articles', ['created_at'])
+
+
+def downgrade():
+    drop_index_online('ix_learning_articles_created_at', 'learning_articles')
+    drop_index_online('ix_community_shop_available', 'community_shop')
+    drop_index_online('uq_community_purchase_user_id_item_id', 'community_purchase')
+    drop_index_online('ix_transactions_user_id_timestamp', 'transactions')
+    drop_index_online('uq_portfolio_user_id_symbol', 'portfolio')
@@ -0,0 +1,27 @@
+"""add learning_articles.content_text
+
+Revision ID: 0003_article_content_text
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_article_content_text'
+down_revision = '0002_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable with no default, so this is a metadata-only change; existing
+    # rows are rendered lazily the first time they are served
+    op.add_column('learning_articles', sa.Column('content_text', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('learning_articles') as batch_op:
+        batch_op.drop_column('content_text')
@@ -0,0 +1,50 @@
+"""resting limit and stop orders
+
+Revision ID: 0004_orders
+Revises: 0003_article_content_text
+Create Date: 2026-10-18 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.schema import create_table_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_orders'
+down_revision = '0003_article_content_text'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table_if_missing(
+        'orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('side', sa.String(length=4), nullable=False),
+        sa.Column('order_type', sa.String(length=10), nullable=False),
+        sa.Column('shares', sa.Float(), nullable=False),
+        sa.Column('limit_price', sa.Float(), nullable=True),
+        sa.Column('stop_price', sa.Float(), nullable=True),
+        sa.Column('time_in_force', sa.String(length=3), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('triggered', sa.Boolean(), nullable=False),
+        sa.Column('reason', sa.String(length=255), nullable=True),
+        sa.Column('fill_price', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('filled_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # A brand new table takes no traffic yet, so plain index builds are safe
+    op.create_index('ix_orders_status_symbol', 'orders', ['status', 'symbol'])
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_symbol', table_name='orders')
+    op.drop_table('orders')
@@ -0,0 +1,37 @@
+"""daily per-user equity snapshots
+
+Revision ID: 0005_equity_snapshots
+Revises: 0004_orders
+Create Date: 2026-10-18 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.schema import create_table_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_equity_snapshots'
+down_revision = '0004_orders'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The (user_id, day) primary key serves the per-user range reads, so no
+    # secondary index is needed
+    create_table_if_missing(
+        'equity_snapshots',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('cash', sa.Float(), nullable=False),
+        sa.Column('positions_value', sa.Float(), nullable=False),
+        sa.Column('equity', sa.Float(), nullable=False),
+        sa.Column('positions', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('equity_snapshots')
@@ -0,0 +1,31 @@
+"""leases for background services that must run in one process
+
+Revision ID: 0006_service_leases
+Revises: 0005_equity_snapshots
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.schema import create_table_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_service_leases'
+down_revision = '0005_equity_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table_if_missing(
+        'service_leases',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('holder', sa.String(length=100), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('service_leases')
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from datetime import date, timedelta
+
+# Config reads the environment at import time
+REPLAY_DIR = tempfile.mkdtemp(prefix='replay-')
+os.environ.update({
+    'DATABASE_URL': 'sqlite://',
+    'MARKET_DATA_PROVIDER': 'replay',
+    'MARKET_DATA_REPLAY_DIR': REPLAY_DIR,
+    'PRICE_REFRESHER_ENABLED': 'false',
+    'ORDER_ENGINE_ENABLED': 'false',
+    'REQUEST_METRICS_ENABLED': 'false',
+    'FORECAST_WORKERS': '0',
+    'BACKTEST_WORKERS': '0',
+})
+os.environ.pop('DATABASE_REPLICA_URL', None)
+
+import pandas as pd
+import pytest
+from app import create_app, db
+from app.services.quote_cache import quote_cache
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def replay_quote(app):
+    # replay_quote('AAPL', 100.0) makes the replay provider quote AAPL at 100
+    paths = []
+
+    def write(symbol, price):
+        path = os.path.join(REPLAY_DIR, f'{symbol}.csv')
+        pd.DataFrame({'date': [(date.today() - timedelta(days=1)).isoformat()], 'close': [price]}).to_csv(path, index=False)
+        paths.append(path)
+        quote_cache.clear()
+
+    yield write
+    for path in paths:
+        os.remove(path)
+    quote_cache.clear()
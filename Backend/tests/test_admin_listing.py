@@ -0,0 +1,56 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.community_shop import CommunityShop
+from app.models.user import User
+
+ADMIN = '/super-secret-admin-zone'
+
+
+@pytest.fixture
+def admin(app):
+    db.session.add_all([
+        User(username=f'user{i}', email=f'user{i}@{"corp" if i % 2 else "mail"}.com', balance=100.0 * i)
+        for i in range(1, 6)
+    ])
+    db.session.add_all([
+        CommunityShop(name='Hat', description='', cost=5.0, score_value=1, emoji='h', available=True),
+        CommunityShop(name='Cape', description='', cost=9.0, score_value=2, emoji='c', available=False),
+    ])
+    db.session.commit()
+    token = create_access_token(identity='1', additional_claims={'role': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_users_are_paginated_sorted_and_counted(client, admin):
+    response = client.get(f'{ADMIN}/admin/users?sort=-balance&limit=2&page=2&fields=username,balance', headers=admin)
+
+    assert response.status_code == 200
+    assert response.headers['X-Total-Count'] == '5'
+    assert response.json == [{'username': 'user3', 'balance': 300.0}, {'username': 'user2', 'balance': 200.0}]
+
+
+def test_search_and_filters_run_in_sql(client, admin):
+    found = client.get(f'{ADMIN}/admin/users?q=corp&fields=username', headers=admin)
+    assert [row['username'] for row in found.json] == ['user1', 'user3', 'user5']
+
+    available = client.get(f'{ADMIN}/admin/community-shop?available=false&fields=name', headers=admin)
+    assert available.json == [{'name': 'Cape'}]
+
+
+def test_listings_stream_as_csv(client, admin):
+    response = client.get(f'{ADMIN}/admin/users?format=csv&fields=id,username&sort=id', headers=admin)
+
+    assert response.mimetype == 'text/csv'
+    assert response.get_data(as_text=True).split()[:2] == ['id,username', '1,user1']
+
+
+@pytest.mark.parametrize('query', ['sort=password', 'fields=password', 'id=abc', 'page=0', 'format=xml'])
+def test_invalid_listing_arguments_are_rejected(client, admin, query):
+    assert client.get(f'{ADMIN}/admin/users?{query}', headers=admin).status_code == 400
+
+
+def test_listings_require_the_admin_role(client, admin):
+    token = create_access_token(identity='1', additional_claims={'role': 'user'})
+
+    assert client.get(f'{ADMIN}/admin/users', headers={'Authorization': f'Bearer {token}'}).status_code == 403
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgi import _PooledInstance
+
+
+class _Body:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def _call(wsgi_app, executor):
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': '/x', 'query_string': b'',
+        'http_version': '1.1', 'headers': [], 'root_path': ''
+    }
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(_PooledInstance(wsgi_app, executor)(scope, receive, send))
+    return sent
+
+
+def test_requests_run_on_the_pool_and_close_the_response():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='asgi-test')
+    seen = {}
+    body = _Body([b'hello ', b'', b'world'])
+
+    def wsgi_app(environ, start_response):
+        seen['thread'] = threading.current_thread().name
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return body
+
+    sent = _call(wsgi_app, executor)
+    executor.shutdown()
+
+    assert seen['thread'].startswith('asgi-test')
+    assert sent[0]['type'] == 'http.response.start' and sent[0]['status'] == 200
+    assert b''.join(message.get('body', b'') for message in sent[1:]) == b'hello world'
+    assert sent[-1] == {'type': 'http.response.body'}
+    assert body.closed
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from flask_jwt_extended import create_access_token
+from app.services import backtest
+from app.services.backtest import Backtester, BacktestTimeout
+
+
+def _slow_run_many(data, strategies, capital):
+    time.sleep(1)
+    return []
+
+
+def test_slow_sweep_times_out_and_retires_the_pool(app, monkeypatch):
+    monkeypatch.setattr(backtest, '_run_many', _slow_run_many)
+    monkeypatch.setattr(backtest, 'load_prices', lambda symbols, start, end: {'close': np.zeros((1, 1))})
+    runner = Backtester(workers=2, timeout=0.1)
+    pool = runner._pool = ThreadPoolExecutor(max_workers=2)
+
+    with pytest.raises(BacktestTimeout):
+        runner.run(['AAA'], None, None, {'type': 'sma_crossover'}, 1000, sweep={'fast': [5, 10, 15]})
+
+    assert runner._pool is None
+    pool.shutdown(wait=True)
+
+
+def test_default_start_handles_leap_day(app, client):
+    headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+
+    response = client.post('/api/backtest', headers=headers, json={
+        'symbols': ['AAA'], 'strategy': {'type': 'sma_crossover'}, 'end': '2024-02-29'
+    })
+
+    assert response.status_code == 400
+    assert response.json['error'] != 'Invalid start, end or capital'
+
+
+@pytest.mark.parametrize('capital', ['NaN', 'Infinity', '-Infinity', '0'])
+def test_non_finite_capital_is_rejected(app, client, capital):
+    headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+    body = '{"symbols": ["AAA"], "strategy": {"type": "sma_crossover"}, "capital": %s}' % capital
+
+    response = client.post('/api/backtest', headers=headers, data=body, content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid start, end or capital'
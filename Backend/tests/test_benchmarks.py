@@ -0,0 +1,42 @@
+import json
+from app import db
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.models.user import User
+from benchmarks.data import seed_database, symbol_names, write_replay_data
+from benchmarks.run import compare, summarize
+
+
+def test_replay_data_is_reproducible(tmp_path):
+    symbols = symbol_names(2)
+    write_replay_data(tmp_path / 'a', symbols, days=20, seed=7)
+    write_replay_data(tmp_path / 'b', symbols, days=20, seed=7)
+
+    for name in ('SYM000.csv', 'SYM001.csv', 'symbols.csv'):
+        assert (tmp_path / 'a' / name).read_text() == (tmp_path / 'b' / name).read_text()
+
+
+def test_seeded_database_has_the_requested_shape(app):
+    seed_database(db, users=3, holdings_per_user=2, transactions_per_user=4, symbols=symbol_names(5), chunk_size=2)
+
+    assert User.query.count() == 3
+    assert Portfolio.query.count() == 6
+    assert Transaction.query.count() == 12
+
+
+def test_regressions_are_flagged_past_the_tolerance(tmp_path):
+    baseline = tmp_path / 'before.json'
+    baseline.write_text(json.dumps({'results': [
+        {'name': 'GET /leaderboard', 'p50_ms': 10.0}, {'name': 'valuation', 'p50_ms': 2.0}
+    ]}))
+    results = [
+        summarize('GET /leaderboard', [0.0125] * 5, 1.0, [200] * 5),
+        summarize('valuation', [0.0022] * 5, 1.0),
+        summarize('new benchmark', [0.001], 1.0),
+    ]
+
+    assert results[0]['p50_ms'] == 12.5
+    assert results[0]['statuses'] == {'200': 5}
+    assert compare(results, baseline, tolerance=0.2) == ['GET /leaderboard']
+    assert results[1]['p50_change'] == 0.1
+    assert 'p50_change' not in results[2]
@@ -0,0 +1,91 @@
+import os
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.user import User
+from app.models.transaction import Transaction
+from app.models.community_shop import CommunityShop
+from app.models.community_purchase import CommunityPurchase
+from app.models.equity_snapshot import EquitySnapshot
+from app.services.equity_snapshots import snapshot_backfill, snapshot_equity
+from app.utils.market import last_session_date
+from conftest import REPLAY_DIR
+
+
+@pytest.fixture
+def sessions(app):
+    # The last ten trading days, with AAA closing at 10, 11, 12, ...
+    end = last_session_date(app.config['MARKET_TIMEZONE'])
+    days = [day.date() for day in pd.bdate_range(end=end, periods=10)]
+    path = os.path.join(REPLAY_DIR, 'AAA.csv')
+    pd.DataFrame({'date': [day.isoformat() for day in days], 'close': [10.0 + i for i in range(len(days))]}).to_csv(path, index=False)
+    yield days
+    os.remove(path)
+
+
+def _at(day):
+    # Mid-session in New York
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=16)
+
+
+def _snapshots(user_id):
+    return {
+        snapshot.day: snapshot
+        for snapshot in EquitySnapshot.query.filter_by(user_id=user_id).order_by(EquitySnapshot.day)
+    }
+
+
+def test_cash_and_positions_follow_trades(app, sessions):
+    user = User(username='trader', email='t@example.com', balance=1000.0 - 10 * 12.0, created_at=_at(sessions[0]))
+    db.session.add(user)
+    db.session.commit()
+    db.session.add(Transaction(user_id=user.id, symbol='AAA', shares=10, price=12.0, type='BUY', timestamp=_at(sessions[2])))
+    db.session.commit()
+
+    snapshot_equity(user_ids=[user.id])
+    snapshots = _snapshots(user.id)
+
+    assert list(snapshots) == sessions
+    before, bought, last = snapshots[sessions[1]], snapshots[sessions[2]], snapshots[sessions[-1]]
+    assert (before.cash, before.positions_value, before.equity) == (1000.0, 0.0, 1000.0)
+    assert (bought.cash, bought.positions_value) == (880.0, 120.0)
+    assert last.positions == {'AAA': 10.0}
+    assert last.equity == 880.0 + 10 * 19.0
+
+
+def test_community_purchases_are_cash_flows(app, sessions):
+    user = User(username='shopper', email='s@example.com', balance=1000.0 - 250.0, created_at=_at(sessions[0]))
+    item = CommunityShop(name='Badge', description='A badge', cost=250.0, score_value=5, emoji='*')
+    db.session.add_all([user, item])
+    db.session.commit()
+    db.session.add(CommunityPurchase(user_id=user.id, item_id=item.id, timestamp=_at(sessions[4])))
+    db.session.commit()
+
+    snapshot_equity(user_ids=[user.id])
+    snapshots = _snapshots(user.id)
+
+    assert snapshots[sessions[3]].cash == 1000.0
+    assert snapshots[sessions[4]].cash == 750.0
+    assert snapshots[sessions[-1]].cash == 750.0
+
+
+def test_performance_serves_existing_snapshots_and_backfills_in_background(app, client, sessions, monkeypatch):
+    user = User(username='reader', email='r@example.com', balance=1000.0, created_at=_at(sessions[0]))
+    db.session.add(user)
+    db.session.commit()
+    monkeypatch.setattr(snapshot_backfill, 'start', lambda: None)
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    response = client.get('/api/portfolio/performance?range=1mo', headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['backfilling'] is True
+    assert len(response.json['series']) == 1
+    assert EquitySnapshot.query.count() == 0
+
+    assert snapshot_backfill.run_pending() == len(sessions)
+    response = client.get('/api/portfolio/performance?range=1mo', headers=headers)
+    assert response.json['backfilling'] is False
+    assert len(response.json['series']) >= len(sessions)
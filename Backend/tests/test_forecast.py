@@ -0,0 +1,12 @@
+def test_forecast_horizon_is_bounded(app, client):
+    app.config['FORECAST_MAX_DAYS'] = 30
+
+    assert client.get('/api/stock/forecast?symbol=AAPL&days=31').status_code == 400
+    assert client.get('/api/stock/forecast?symbol=AAPL&days=0').status_code == 400
+    assert client.get('/api/stock/forecast?symbol=AAPL&days=soon').status_code == 400
+
+
+def test_model_cache_defaults_outside_the_instance_folder(app):
+    from app.services.forecast_service import forecast_service
+
+    assert not forecast_service.cache_dir.startswith(app.instance_path)
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import insert
+from app import db
+from app.models.learning_article import LearningArticle
+from app.services.help_cache import help_cache
+from app.utils.text import html_to_text
+
+
+@pytest.fixture
+def articles(app):
+    help_cache.invalidate()
+    yield
+    help_cache.invalidate()
+
+
+def _article(title='Orders', content='<p>Limit orders</p>'):
+    article = LearningArticle(title=title, summary='', content=content, source_url='https://example.com')
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def test_article_revalidates_with_its_etag(client, articles):
+    article = _article()
+
+    response = client.get(f'/api/help/article/{article.id}')
+    assert response.status_code == 200
+    assert response.json['content'] == html_to_text('<p>Limit orders</p>')
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    again = client.get(f'/api/help/article/{article.id}', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert client.get('/api/help/article/999').status_code == 404
+
+
+def test_rows_without_content_text_are_filled_on_first_read(client, articles):
+    # Bulk inserts skip the ORM events that render content_text
+    article_id = db.session.execute(
+        insert(LearningArticle).values(title='Imported', content='<h1>Stops</h1><p>trigger</p>')
+    ).inserted_primary_key[0]
+    db.session.commit()
+
+    response = client.get(f'/api/help/article/{article_id}')
+
+    assert response.json['content'] == html_to_text('<h1>Stops</h1><p>trigger</p>')
+    db.session.expire_all()
+    assert db.session.get(LearningArticle, article_id).content_text == response.json['content']
+
+
+def test_article_list_is_cached_until_an_article_changes(client, articles):
+    article = _article()
+    first = client.get('/api/help/articles')
+    assert [item['title'] for item in first.json] == ['Orders']
+    assert client.get('/api/help/articles', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    article.content = '<p>Limit and stop orders</p>'
+    db.session.commit()
+
+    changed = client.get('/api/help/articles', headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.json[0]['content'] == html_to_text('<p>Limit and stop orders</p>')
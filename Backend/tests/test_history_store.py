@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from app import db
+from app.models.price_history import PriceBar
+from app.services.history_store import history_store
+
+
+def _frame(closes, start='2025-01-01'):
+    index = pd.date_range(start, periods=len(closes), freq='D', tz='UTC', name='Date')
+    return pd.DataFrame({
+        'Open': closes, 'High': closes, 'Low': closes, 'Close': closes, 'Volume': [100.0] * len(closes)
+    }, index=index)
+
+
+def _stored(symbol):
+    return [
+        (bar.ts.date().isoformat(), bar.close)
+        for bar in PriceBar.query.filter_by(symbol=symbol, interval='1d').order_by(PriceBar.ts)
+    ]
+
+
+def test_store_bars_keeps_timestamps_aligned_across_gap_rows(app):
+    written = history_store.store_bars('AAPL', '1d', _frame([1.0, np.nan, 3.0, 4.0]))
+    db.session.commit()
+
+    assert written == 3
+    assert _stored('AAPL') == [('2025-01-01', 1.0), ('2025-01-03', 3.0), ('2025-01-04', 4.0)]
+
+
+def test_store_bars_replaces_overlapping_range(app):
+    history_store.store_bars('AAPL', '1d', _frame([1.0, 2.0, 3.0]))
+    history_store.store_bars('AAPL', '1d', _frame([20.0, np.nan, 40.0], start='2025-01-02'))
+    db.session.commit()
+
+    assert _stored('AAPL') == [('2025-01-01', 1.0), ('2025-01-02', 20.0), ('2025-01-04', 40.0)]
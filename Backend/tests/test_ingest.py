@@ -0,0 +1,50 @@
+from datetime import datetime
+from app import db
+from app.models.price_history import PriceBar
+from app.models.stock_cache import StockCache
+from app.services.ingest import import_history, import_symbols
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def _prices():
+    return {row.symbol: row.price for row in StockCache.query}
+
+
+def test_blank_price_keeps_the_cached_price(app, tmp_path):
+    db.session.add(StockCache(symbol='AAPL', price=190.0, long_name='Apple'))
+    db.session.commit()
+    path = _write(tmp_path, 'symbols.csv', 'symbol,long_name,price\nAAPL,Apple Inc.,\nMSFT,Microsoft,300\n')
+
+    stats = import_symbols([path])
+
+    assert stats.rows == 2
+    assert _prices() == {'AAPL': 190.0, 'MSFT': 300.0}
+    assert StockCache.query.filter_by(symbol='AAPL').one().long_name == 'Apple Inc.'
+
+
+def test_new_symbols_without_a_price_take_the_last_close(app, tmp_path):
+    db.session.add(PriceBar(
+        symbol='NVDA', interval='1d', ts=datetime(2025, 1, 2), open=1.0, high=1.0, low=1.0, close=140.0, volume=0.0
+    ))
+    db.session.commit()
+    path = _write(tmp_path, 'symbols.csv', 'symbol\nnvda\nZZZZ\n')
+
+    import_symbols([path])
+
+    assert _prices() == {'NVDA': 140.0, 'ZZZZ': 0.0}
+
+
+def test_history_reimport_rewrites_the_same_bars(app, tmp_path):
+    path = _write(tmp_path, 'AAPL_1d.csv', 'date,close\n2025-01-02,10\n2025-01-03,\n2025-01-06,12\n')
+
+    import_history([path], interval='1d')
+    _write(tmp_path, 'AAPL_1d.csv', 'date,close\n2025-01-02,10.5\n2025-01-06,12\n')
+    import_history([path], interval='1d')
+
+    bars = PriceBar.query.filter_by(symbol='AAPL').order_by(PriceBar.ts).all()
+    assert [(bar.ts.date().isoformat(), bar.close) for bar in bars] == [('2025-01-02', 10.5), ('2025-01-06', 12.0)]
@@ -0,0 +1,88 @@
+import threading
+import time
+from app import create_app, db
+from app.models.user import User
+from app.models.portfolio import Portfolio
+from app.services import stock_service
+from app.services.leaderboard import Leaderboard, leaderboard
+from app.services.valuation import load_holdings
+
+
+def _users(*balances):
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', balance=balance) for i, balance in enumerate(balances)]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+def test_concurrent_cold_requests_build_once(app):
+    board = Leaderboard()
+    empty = load_holdings()
+    calls = []
+
+    def slow_load(user_ids=None):
+        calls.append(user_ids)
+        time.sleep(0.2)
+        return [], empty, {}
+
+    board._load = slow_load
+    threads = [threading.Thread(target=board.ensure_loaded) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [None]
+    assert board.generation == 1
+
+
+def test_trade_during_rebuild_is_not_lost(app):
+    alice, bob = _users(1000.0, 500.0)
+    board = Leaderboard()
+    load = board._load
+
+    def load_then_trade(user_ids=None):
+        result = load(user_ids)
+        if user_ids is None:
+            # A buy commits and notifies after the full read has been taken
+            db.session.add(Portfolio(user_id=bob.id, symbol='ZZZ', shares=10, avg_price=100.0))
+            bob.balance = 0.0
+            db.session.commit()
+            board.apply_trade(bob.id, 'ZZZ', 10, 0.0, 100.0)
+        return result
+
+    board._load = load_then_trade
+    board.rebuild()
+
+    assert not board._building
+    assert board._users[bob.id]['balance'] == 0.0
+    assert board._holdings[bob.id] == {'ZZZ': 10}
+    # Replaying the trade on top of the re-read row would have doubled it
+    assert board._holders['ZZZ'] == {bob.id: 10}
+
+
+def test_removed_user_during_rebuild_is_dropped(app):
+    alice, bob = _users(1000.0, 500.0)
+    board = Leaderboard()
+    load = board._load
+
+    def load_then_delete(user_ids=None):
+        result = load(user_ids)
+        if user_ids is None:
+            db.session.delete(bob)
+            db.session.commit()
+            board.remove_user(bob.id)
+        return result
+
+    board._load = load_then_delete
+    board.rebuild()
+
+    assert set(board._users) == {alice.id}
+    assert [entry['user_id'] for entry in board.top('money')] == [alice.id]
+
+
+def test_listeners_register_once_per_service(app):
+    create_app()
+    create_app()
+
+    assert stock_service._price_listeners.count(leaderboard.apply_prices) == 1
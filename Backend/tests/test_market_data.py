@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from app.services.market_data import ReplayProvider, create_provider, period_to_timedelta
+
+
+@pytest.fixture
+def replay_dir(tmp_path):
+    days = pd.bdate_range('2025-01-06', periods=5)
+    pd.DataFrame({'date': days.strftime('%Y-%m-%d'), 'close': [100.0, 102.0, 101.0, 105.0, 110.0]}).to_csv(
+        tmp_path / 'AAA.csv', index=False
+    )
+    pd.DataFrame({'symbol': ['aaa'], 'long_name': ['Triple A Corp'], 'logo_url': [None]}).to_csv(
+        tmp_path / 'symbols.csv', index=False
+    )
+    return str(tmp_path)
+
+
+def test_replay_quotes_the_last_bar_against_the_previous_close(replay_dir):
+    quotes = ReplayProvider(replay_dir).get_quotes(['AAA', 'MISSING'])
+
+    assert list(quotes) == ['AAA']
+    assert quotes['AAA']['price'] == 110.0
+    assert quotes['AAA']['change'] == 5.0
+    assert quotes['AAA']['percent_change'] == pytest.approx(5 / 105 * 100)
+
+
+def test_replay_history_is_cut_to_the_period(replay_dir):
+    provider = ReplayProvider(replay_dir)
+
+    history = provider.get_history('AAA', period='2d', interval='1d')
+
+    # Both ends inclusive: Wednesday through Friday
+    assert history['Close'].tolist() == [101.0, 105.0, 110.0]
+    assert list(history.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert provider.get_history('MISSING', period='1mo', interval='1d').empty
+
+
+def test_replay_steps_through_bars_over_time(replay_dir, monkeypatch):
+    provider = ReplayProvider(replay_dir, step_seconds=60)
+    monkeypatch.setattr('app.services.market_data.time.time', lambda: provider.started_at + 125)
+
+    # Two steps in, the replay is on the third bar
+    assert provider.get_quote('AAA')['price'] == 101.0
+
+
+def test_replay_metadata_comes_from_symbols_csv(replay_dir):
+    provider = ReplayProvider(replay_dir)
+
+    assert provider.get_metadata('AAA') == {'long_name': 'Triple A Corp', 'logo_url': None}
+    assert provider.get_metadata('BBB') == {'long_name': 'BBB', 'logo_url': None}
+
+
+def test_provider_is_chosen_by_config(replay_dir):
+    config = {'MARKET_DATA_PROVIDER': 'replay', 'MARKET_DATA_REPLAY_DIR': replay_dir}
+    assert isinstance(create_provider(config), ReplayProvider)
+    with pytest.raises(ValueError):
+        create_provider({'MARKET_DATA_PROVIDER': 'bloomberg'})
+    with pytest.raises(ValueError):
+        period_to_timedelta('3q')
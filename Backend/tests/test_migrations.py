@@ -0,0 +1,53 @@
+import importlib.util
+import os
+import pytest
+import sqlalchemy as sa
+from app import db
+from app.models.community_purchase import CommunityPurchase
+from app.models.community_shop import CommunityShop
+from app.models.user import User
+
+_path = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'versions', '0002_hot_path_indexes.py')
+_spec = importlib.util.spec_from_file_location('hot_path_indexes', _path)
+hot_path_indexes = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hot_path_indexes)
+
+
+@pytest.fixture
+def duplicate_purchases(app):
+    # Recreates the pre-0002 schema, which had no unique purchase index
+    db.session.execute(sa.text('DROP INDEX uq_community_purchase_user_id_item_id'))
+    user = User(username='buyer', email='buyer@example.com', balance=800.0, community_score=30)
+    item = CommunityShop(name='Badge', description='A badge', cost=100.0, score_value=10, emoji='*')
+    db.session.add_all([user, item])
+    db.session.flush()
+    db.session.add_all([CommunityPurchase(user_id=user.id, item_id=item.id) for _ in range(3)])
+    db.session.commit()
+    return user, item
+
+
+def test_duplicate_purchases_are_refunded(duplicate_purchases):
+    user, item = duplicate_purchases
+    first = min(purchase.id for purchase in CommunityPurchase.query)
+
+    with db.engine.begin() as connection:
+        hot_path_indexes._refund_duplicate_purchases(connection)
+
+    db.session.expire_all()
+    assert [purchase.id for purchase in CommunityPurchase.query] == [first]
+    refunded = db.session.get(User, user.id)
+    assert refunded.balance == 1000.0
+    assert refunded.community_score == 10
+
+
+def test_duplicates_of_deleted_items_stop_the_upgrade(duplicate_purchases):
+    user, item = duplicate_purchases
+    db.session.execute(sa.delete(CommunityShop).where(CommunityShop.id == item.id))
+    db.session.commit()
+
+    with pytest.raises(RuntimeError, match='settle them by hand'):
+        with db.engine.begin() as connection:
+            hot_path_indexes._refund_duplicate_purchases(connection)
+
+    assert CommunityPurchase.query.count() == 3
+    assert db.session.get(User, user.id).balance == 800.0
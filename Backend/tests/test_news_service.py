@@ -0,0 +1,75 @@
+import pytest
+import requests
+from app.services.news_service import CircuitBreaker, NewsService, NewsUnavailable
+
+
+class _Response:
+    def __init__(self, status_code, articles=()):
+        self.status_code = status_code
+        self.headers = {}
+        self._articles = list(articles)
+
+    def json(self):
+        return {'articles': self._articles}
+
+
+class _Session:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, *args, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _service(*outcomes):
+    service = NewsService()
+    service.breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    service.session = _Session(*outcomes)
+    return service
+
+
+def test_client_error_on_the_half_open_trial_closes_the_breaker():
+    service = _service(requests.ConnectionError('down'), _Response(404), _Response(200))
+
+    with pytest.raises(NewsUnavailable):
+        service._fetch()
+    assert service.breaker.state == 'half-open'
+
+    with pytest.raises(NewsUnavailable) as error:
+        service._fetch()
+    assert error.value.status == 404
+
+    # The next call reaches upstream instead of being refused by a stuck trial
+    body, _ = service._fetch()
+    assert body == b'[]'
+    assert service.session.calls == 3
+    assert service.breaker.state == 'closed'
+
+
+def test_server_errors_and_rate_limits_open_the_breaker():
+    service = _service(_Response(429))
+    service.breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+
+    with pytest.raises(NewsUnavailable):
+        service._fetch()
+    assert service.breaker.state == 'open'
+
+    with pytest.raises(NewsUnavailable, match='temporarily unavailable'):
+        service._fetch()
+    assert service.session.calls == 1
+
+
+def test_unexpected_errors_still_end_the_trial():
+    service = _service(requests.Timeout('slow'), RuntimeError('boom'), _Response(200))
+
+    with pytest.raises(NewsUnavailable):
+        service._fetch()
+    with pytest.raises(RuntimeError):
+        service._fetch()
+    service._fetch()
+    assert service.session.calls == 3
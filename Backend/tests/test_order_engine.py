@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.user import User
+from app.models.order import Order
+from app.models.service_lease import ServiceLease
+from app.services import order_engine as order_engine_module
+from app.services.order_engine import OrderEngine, order_engine
+from app.services.order_service import OrderRejected
+
+
+def _user(balance=10000.0):
+    user = User(username='trader', email='trader@example.com', balance=balance)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _order(user, **values):
+    fields = {
+        'user_id': user.id, 'symbol': 'AAPL', 'side': 'BUY', 'order_type': 'LIMIT',
+        'shares': 10.0, 'limit_price': 100.0, 'time_in_force': 'GTC', 'status': 'OPEN', 'triggered': False
+    }
+    fields.update(values)
+    order = Order(**fields)
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _engine():
+    engine = OrderEngine()
+    engine.holder = 'test:1'
+    return engine
+
+
+def test_buy_limit_fills_only_at_or_below_limit(app):
+    user = _user()
+    order = _order(user)
+    engine = _engine()
+    engine._reload()
+
+    engine._match('AAPL', 101.0)
+    assert db.session.get(Order, order.id).status == 'OPEN'
+
+    engine._match('AAPL', 99.5)
+    db.session.expire_all()
+    filled = db.session.get(Order, order.id)
+    assert filled.status == 'FILLED'
+    assert filled.fill_price == 99.5
+    assert db.session.get(User, user.id).balance == 10000.0 - 995.0
+
+
+def test_expired_day_order_does_not_fill_before_the_sweep(app):
+    user = _user()
+    order = _order(user, time_in_force='DAY', expires_at=datetime.utcnow() + timedelta(hours=1))
+    engine = _engine()
+    engine._reload()
+
+    # Expires after the book was loaded, before the next reload marks it EXPIRED
+    order.expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+    engine._match('AAPL', 90.0)
+
+    db.session.expire_all()
+    assert db.session.get(Order, order.id).status == 'OPEN'
+    assert db.session.get(User, user.id).balance == 10000.0
+
+    engine._reload()
+    db.session.expire_all()
+    assert db.session.get(Order, order.id).status == 'EXPIRED'
+
+
+def test_stop_limit_rests_as_limit_after_trigger(app):
+    user = _user()
+    order = _order(user, order_type='STOP_LIMIT', stop_price=105.0, limit_price=104.0)
+    engine = _engine()
+    engine._reload()
+
+    engine._match('AAPL', 105.5)
+    db.session.expire_all()
+    triggered = db.session.get(Order, order.id)
+    assert triggered.triggered and triggered.status == 'OPEN'
+
+    engine._match('AAPL', 104.5)
+    db.session.expire_all()
+    assert db.session.get(Order, order.id).status == 'OPEN'
+
+    engine._match('AAPL', 104.0)
+    db.session.expire_all()
+    assert db.session.get(Order, order.id).status == 'FILLED'
+
+
+def test_write_conflict_keeps_the_order_for_the_next_price(app, monkeypatch):
+    user = _user()
+    order = _order(user)
+    engine = _engine()
+    engine._reload()
+    attempts = []
+
+    def conflicted(*args, **kwargs):
+        attempts.append(args)
+        raise OrderRejected({'error': 'conflict'}, 409)
+
+    monkeypatch.setattr(order_engine_module, 'fill_order', conflicted)
+    engine._match('AAPL', 99.0)
+    assert len(attempts) == 1
+    assert order.id in engine._live
+
+    monkeypatch.undo()
+    engine._match('AAPL', 99.0)
+    db.session.expire_all()
+    assert db.session.get(Order, order.id).status == 'FILLED'
+
+
+def test_only_one_process_holds_the_lease(app):
+    first, second = _engine(), _engine()
+    second.holder = 'test:2'
+
+    assert first._hold_lease()
+    assert not second._hold_lease()
+
+    # The holder stops renewing; the lease passes on once it expires
+    lease = db.session.get(ServiceLease, 'order_engine')
+    lease.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert second._hold_lease()
+    first._lease_until = None
+    assert not first._hold_lease()
+
+
+def test_orders_from_other_processes_are_loaded_between_reloads(app):
+    user = _user()
+    engine = _engine()
+    engine._reload()
+    order = _order(user)
+
+    engine._load_new()
+    assert order.id in engine._live
+
+
+def test_place_order_rejected_when_engine_disabled(app, client):
+    user = _user()
+    token = create_access_token(identity=str(user.id))
+    assert not order_engine.enabled
+
+    response = client.post('/api/orders', headers={'Authorization': f'Bearer {token}'}, json={
+        'symbol': 'AAPL', 'type': 'BUY', 'order_type': 'LIMIT', 'shares': 1, 'limit_price': 100
+    })
+
+    assert response.status_code == 503
+    assert Order.query.count() == 0
+
+
+@pytest.fixture
+def engine_enabled(app, monkeypatch, replay_quote):
+    # AAPL is quoted, so nothing but validation stands between a body and the book
+    replay_quote('AAPL', 100.0)
+    monkeypatch.setattr(order_engine, 'enabled', True)
+    monkeypatch.setattr(order_engine, 'submit', lambda order, price=None: None)
+
+
+def _post_order(client, user, body):
+    token = create_access_token(identity=str(user.id))
+    return client.post(
+        '/api/orders', headers={'Authorization': f'Bearer {token}'}, data=body, content_type='application/json'
+    )
+
+
+def test_place_order_accepts_a_valid_limit(client, engine_enabled):
+    body = '{"symbol": "AAPL", "type": "BUY", "order_type": "LIMIT", "shares": 1, "limit_price": 99}'
+    response = _post_order(client, _user(), body)
+
+    assert response.status_code == 201
+    assert Order.query.one().limit_price == 99.0
+
+
+@pytest.mark.parametrize('body', [
+    '{"symbol": "AAPL", "type": "BUY", "order_type": "LIMIT", "shares": 1, "limit_price": NaN}',
+    '{"symbol": "AAPL", "type": "BUY", "order_type": "LIMIT", "shares": 1, "limit_price": Infinity}',
+    '{"symbol": "AAPL", "type": "BUY", "order_type": "STOP", "shares": 1, "stop_price": -Infinity}',
+    '{"symbol": "AAPL", "type": "BUY", "order_type": "LIMIT", "shares": NaN, "limit_price": 100}',
+    '{"symbol": "AAPL", "type": "BUY", "order_type": "LIMIT", "shares": Infinity, "limit_price": 100}',
+    '{"symbol": "AAPL", "type": "BUY", "order_type": "LIMIT", "shares": 1}',
+])
+def test_place_order_rejects_non_finite_or_missing_prices(client, engine_enabled, body):
+    response = _post_order(client, _user(), body)
+
+    assert response.status_code == 400
+    assert Order.query.count() == 0
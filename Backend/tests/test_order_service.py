@@ -0,0 +1,72 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.order_service import OrderRejected, fill_order
+
+
+@pytest.fixture
+def trader(app):
+    user = User(username='trader', email='trader@example.com', balance=1000.0)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _post(client, user, side, body):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    return client.post(f'/api/transaction/{side}', headers=headers, data=body, content_type='application/json')
+
+
+@pytest.mark.parametrize('side', ['buy', 'sell'])
+@pytest.mark.parametrize('body', [
+    '{"symbol": "AAPL", "shares": NaN}',
+    '{"symbol": "AAPL", "shares": Infinity}',
+    '{"symbol": "AAPL", "shares": "ten"}',
+    '{"symbol": "AAPL", "shares": -1}',
+    '{"symbol": ["AAPL"], "shares": 1}',
+    '{"symbol": " ", "shares": 1}',
+    '{"shares": 1}',
+])
+def test_invalid_orders_are_rejected(client, trader, replay_quote, side, body):
+    replay_quote('AAPL', 10.0)
+
+    response = _post(client, trader, side, body)
+
+    assert response.status_code == 400
+    assert Transaction.query.count() == 0
+
+
+def test_buy_then_sell_settles_balance_and_holding(client, trader, replay_quote):
+    replay_quote('AAPL', 10.0)
+
+    assert _post(client, trader, 'buy', '{"symbol": "aapl", "shares": 30}').status_code == 200
+    holding = Portfolio.query.filter_by(user_id=trader.id, symbol='AAPL').one()
+    assert (holding.shares, holding.avg_price) == (30.0, 10.0)
+
+    response = _post(client, trader, 'sell', '{"symbol": "AAPL", "shares": 30}')
+    assert response.status_code == 200
+    assert response.json['new_balance'] == 1000.0
+    assert Portfolio.query.count() == 0
+    assert Transaction.query.count() == 2
+
+
+def test_rejected_orders_leave_no_trace(client, trader, replay_quote):
+    replay_quote('AAPL', 10.0)
+
+    assert _post(client, trader, 'buy', '{"symbol": "AAPL", "shares": 101}').status_code == 400
+    assert _post(client, trader, 'sell', '{"symbol": "AAPL", "shares": 1}').status_code == 400
+    assert db.session.get(User, trader.id).balance == 1000.0
+    assert Transaction.query.count() == 0
+
+
+def test_fill_order_guards_the_balance_inside_the_transaction(trader):
+    # The route's pre-check can be stale; the guarded UPDATE is what holds
+    with pytest.raises(OrderRejected, match='Insufficient funds'):
+        fill_order(trader.id, 'AAPL', 200, 'BUY', 10.0)
+
+    db.session.expire_all()
+    assert db.session.get(User, trader.id).balance == 1000.0
+    assert Portfolio.query.count() == 0
@@ -0,0 +1,52 @@
+from app import db
+from app.models.portfolio import Portfolio
+from app.models.stock_cache import StockCache
+from app.models.user import User
+from app.services import price_refresher as price_refresher_module
+from app.services.price_refresher import PriceRefresher
+from app.services.quote_cache import quote_cache
+
+
+def _refresher(app):
+    refresher = PriceRefresher()
+    refresher.app = app
+    return refresher
+
+
+def test_refresh_covers_held_recent_and_sourced_symbols(app, monkeypatch):
+    user = User(username='holder', email='holder@example.com', balance=0.0)
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Portfolio(user_id=user.id, symbol='aaa', shares=1.0, avg_price=1.0))
+    db.session.commit()
+    monkeypatch.setattr(price_refresher_module, 'get_recent_symbols', lambda window: ['BBB'])
+    app.config['PRICE_REFRESH_BATCH_SIZE'] = 2
+    batches = []
+    monkeypatch.setattr(
+        price_refresher_module, 'refresh_stock_prices', lambda symbols, ttl=None: batches.append(symbols)
+    )
+    sourced = []
+
+    def source():
+        sourced.append(True)
+        return ['ccc', 'AAA']
+
+    refresher = _refresher(app)
+    # Registered again by a second create_app(); still asked once
+    refresher.add_symbol_source(source)
+    refresher.add_symbol_source(source)
+
+    assert refresher.refresh_once() == 3
+    assert len(sourced) == 1
+    assert batches == [['AAA', 'BBB'], ['CCC']]
+
+
+def test_refresh_warms_the_quote_cache_and_stock_cache(app, replay_quote):
+    replay_quote('AAA', 42.0)
+    refresher = _refresher(app)
+    refresher.add_symbol_source(lambda: ['AAA'])
+
+    refresher.refresh_once()
+
+    assert StockCache.query.filter_by(symbol='AAA').one().price == 42.0
+    assert quote_cache.get_many(['AAA'], lambda symbols: {})['AAA']['price'] == 42.0
@@ -0,0 +1,58 @@
+import threading
+import time
+import pytest
+from app.services.quote_cache import QuoteCache
+
+
+def _coalesced(loader):
+    # Runs a second get_many while the first one's loader is in flight
+    cache = QuoteCache()
+    started, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def leader_loader(symbols):
+        started.set()
+        release.wait(5)
+        return loader(symbols)
+
+    def leader():
+        try:
+            outcome['leader'] = cache.get_many(['AAPL'], leader_loader)
+        except Exception as e:
+            outcome['leader'] = e
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: outcome.update(waiter=_call(cache)))
+    waiter.start()
+    while cache.stats()['coalesced'] == 0:
+        time.sleep(0.001)
+    release.set()
+    thread.join(5)
+    waiter.join(5)
+    return outcome
+
+
+def _call(cache):
+    try:
+        return cache.get_many(['AAPL'], lambda symbols: pytest.fail('waiter must not load'))
+    except Exception as e:
+        return e
+
+
+def test_waiters_share_the_leaders_result():
+    outcome = _coalesced(lambda symbols: {'AAPL': {'symbol': 'AAPL', 'price': 190.0}})
+
+    assert outcome['waiter'] == {'AAPL': {'symbol': 'AAPL', 'price': 190.0}}
+
+
+def test_waiters_see_the_leaders_upstream_failure():
+    def failing(symbols):
+        raise ConnectionError('upstream refused')
+
+    outcome = _coalesced(failing)
+
+    assert isinstance(outcome['leader'], ConnectionError)
+    assert isinstance(outcome['waiter'], ConnectionError)
+    assert 'upstream refused' in str(outcome['waiter'])
@@ -0,0 +1,66 @@
+import pytest
+from flask import g
+from sqlalchemy import select
+from app import create_app, db
+from app.models.stock_cache import StockCache
+from app.models.user import User
+from app.utils.bulk import upsert
+from app.utils.replica import REPLICA_BIND
+from config import Config, _pool_options
+
+
+@pytest.fixture
+def replica_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_BINDS', {REPLICA_BIND: f'sqlite:///{tmp_path}/replica.db'})
+    app = create_app()
+    with app.test_request_context():
+        db.create_all()
+        db.metadata.create_all(db.engines[REPLICA_BIND])
+        yield app
+        db.session.remove()
+        db.metadata.drop_all(db.engines[REPLICA_BIND])
+        db.drop_all()
+    # init_app registered a metadata for the bind; later apps have no replica
+    db.metadatas.pop(REPLICA_BIND, None)
+
+
+def _add_user(name):
+    db.session.add(User(username=name, email=f'{name}@example.com', balance=100.0))
+    db.session.commit()
+
+
+def test_reads_go_to_the_replica_only_when_requested(replica_app):
+    _add_user('primary')
+
+    assert User.query.count() == 1
+    g._use_replica = True
+    # The replica has not caught up with the write
+    assert User.query.count() == 0
+
+
+def test_writes_and_locking_reads_stay_on_the_primary(replica_app):
+    g._use_replica = True
+    _add_user('written')
+
+    primary = db.engines[None]
+    assert db.session.get_bind(clause=select(User).with_for_update()) is primary
+    with primary.connect() as connection:
+        assert connection.execute(select(User.username)).scalars().all() == ['written']
+    with db.engines[REPLICA_BIND].connect() as connection:
+        assert connection.execute(select(User.username)).scalars().all() == []
+
+
+def test_bulk_upserts_can_be_pinned_to_the_primary(replica_app):
+    g._use_replica = True
+    upsert(StockCache, [{'symbol': 'AAPL', 'price': 190.0}], ['symbol'], bind=db.engine)
+    db.session.commit()
+
+    with db.engine.connect() as connection:
+        assert connection.execute(select(StockCache.price)).scalars().all() == [190.0]
+
+
+def test_pool_options_apply_to_server_databases_only():
+    assert _pool_options('sqlite:///app.db') == {}
+    options = _pool_options('postgresql://db/app')
+    assert options['pool_pre_ping'] is True
+    assert options['pool_size'] > 0 and options['pool_recycle'] > 0
@@ -0,0 +1,27 @@
+import pytest
+from app import create_app
+from config import Config
+
+
+def _metrics_client(monkeypatch, token):
+    monkeypatch.setattr(Config, 'REQUEST_METRICS_ENABLED', True)
+    monkeypatch.setattr(Config, 'METRICS_TOKEN', token)
+    return create_app().test_client()
+
+
+def test_metrics_require_the_configured_token(monkeypatch):
+    client = _metrics_client(monkeypatch, 's3cret')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert 'quote_cache' in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('token', [None, ''])
+def test_metrics_are_not_served_without_a_token(monkeypatch, token):
+    client = _metrics_client(monkeypatch, token)
+
+    assert client.get('/metrics').status_code == 404
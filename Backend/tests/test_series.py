@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.history_store import history_store
+from app.utils.series import downsample, history_columns, history_rows, lttb_indices
+
+
+def _frame(n=10):
+    index = pd.date_range('2025-01-02 14:30', periods=n, freq='min', tz='America/New_York')
+    values = np.arange(1.0, n + 1)
+    return pd.DataFrame({
+        'Open': values, 'High': values + 1, 'Low': values - 1, 'Close': values, 'Volume': [np.nan] + [100.0] * (n - 1)
+    }, index=index)
+
+
+def test_rows_match_the_frame_they_came_from():
+    frame = _frame(3)
+
+    rows = history_rows(history_columns(frame), frame.index.tz)
+
+    assert rows[0] == {
+        'date': '2025-01-02', 'timestamp': int(frame.index[0].timestamp()),
+        'open': 1.0, 'high': 2.0, 'low': 0.0, 'close': 1.0, 'volume': 0.0
+    }
+    assert [row['close'] for row in rows] == [1.0, 2.0, 3.0]
+
+
+def test_lttb_keeps_endpoints_and_the_requested_count():
+    x = np.arange(100, dtype=np.float64)
+    y = np.sin(x / 5)
+
+    selected = lttb_indices(x, y, 10)
+
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert np.all(np.diff(selected) > 0)
+    assert len(lttb_indices(x, y, 200)) == 100
+
+
+def test_ohlc_buckets_aggregate_each_bucket():
+    t, o, h, l, c, v = downsample(history_columns(_frame(10)), 2, 'ohlc')
+
+    assert o.tolist() == [1.0, 6.0]
+    assert h.tolist() == [6.0, 11.0]
+    assert l.tolist() == [0.0, 5.0]
+    assert c.tolist() == [5.0, 10.0]
+    assert v.tolist() == [400.0, 500.0]
+
+
+@pytest.mark.parametrize('response_format', ['rows', 'columnar'])
+def test_history_formats_carry_the_same_bars(app, client, monkeypatch, response_format):
+    frame = _frame(5)
+    monkeypatch.setattr(history_store, 'get_history', lambda symbol, period, interval: frame)
+
+    response = client.get(f'/api/stock/history/aapl?range=1d&interval=1m&format={response_format}')
+
+    assert response.status_code == 200
+    body = response.json
+    closes = body['c'] if response_format == 'columnar' else [row['close'] for row in body['history']]
+    assert body['symbol'] == 'AAPL'
+    assert closes == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_history_rejects_unknown_formats(app, client):
+    assert client.get('/api/stock/history/AAPL?format=csv').status_code == 400
+    assert client.get('/api/stock/history/AAPL?downsample=mean').status_code == 400
@@ -0,0 +1,44 @@
+from app import db
+from app.models.stock_cache import StockCache
+from app.services.market_data import get_provider
+from app.services.stock_service import get_stock_price, get_stock_prices
+
+
+def _count_quote_batches(monkeypatch):
+    provider = get_provider()
+    batches = []
+    get_quotes = provider.get_quotes
+
+    def counted(symbols):
+        batches.append(sorted(symbols))
+        return get_quotes(symbols)
+
+    monkeypatch.setattr(provider, 'get_quotes', counted)
+    return batches
+
+
+def test_symbols_are_fetched_in_batches_and_cached(app, monkeypatch, replay_quote):
+    for symbol, price in (('AAA', 10.0), ('BBB', 20.0), ('CCC', 30.0)):
+        replay_quote(symbol, price)
+    app.config['UPSTREAM_BATCH_SIZE'] = 2
+    batches = _count_quote_batches(monkeypatch)
+
+    quotes = get_stock_prices(['aaa', 'BBB', 'AAA', 'CCC', 'NOPE'])
+
+    assert sorted(quotes) == ['AAA', 'BBB', 'CCC', 'NOPE']
+    assert {symbol: quotes[symbol]['price'] for symbol in ('AAA', 'BBB', 'CCC')} == {
+        'AAA': 10.0, 'BBB': 20.0, 'CCC': 30.0
+    }
+    assert quotes['NOPE'] == {'error': 'No data found for the symbol'}
+    assert sorted(symbol for batch in batches for symbol in batch) == ['AAA', 'BBB', 'CCC', 'NOPE']
+    assert len(batches) == 2
+    assert {row.symbol: row.price for row in StockCache.query} == {'AAA': 10.0, 'BBB': 20.0, 'CCC': 30.0}
+
+    # Served from the quote cache on the next request
+    assert get_stock_price('bbb')['price'] == 20.0
+    assert len(batches) == 2
+
+
+def test_blank_symbol_is_an_error(app):
+    assert get_stock_price('') == {'error': 'No data found for the symbol'}
+    assert get_stock_prices(['', None]) == {}
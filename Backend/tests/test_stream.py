@@ -0,0 +1,45 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app.services.price_hub import price_hub
+
+
+@pytest.fixture
+def stream_limits():
+    saved = price_hub.max_streams, price_hub.stream_lifetime
+    yield
+    price_hub.max_streams, price_hub.stream_lifetime = saved
+
+
+def _prices_url(symbols='AAPL'):
+    # Passed as a query parameter, the way EventSource clients send it
+    return f'/api/stream/prices?symbols={symbols}&jwt={create_access_token(identity="1")}'
+
+
+def test_stream_ends_after_its_lifetime_and_releases_its_slot(app, client, stream_limits):
+    price_hub.stream_lifetime = 0
+
+    response = client.get(_prices_url())
+    body = response.get_data(as_text=True)
+    response.close()
+
+    assert response.status_code == 200
+    assert body.startswith('retry: ')
+    assert 'event: snapshot' in body
+    assert price_hub.stats()['streams'] == 0
+    assert price_hub.stats()['subscriptions'] == 0
+
+
+def test_streams_are_capped_per_process(app, client, stream_limits):
+    price_hub.max_streams = 0
+
+    response = client.get(_prices_url())
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+def test_anonymous_clients_cannot_take_a_stream_slot(app, client, stream_limits):
+    response = client.get('/api/stream/prices?symbols=AAPL')
+
+    assert response.status_code == 401
+    assert price_hub.stats()['streams'] == 0
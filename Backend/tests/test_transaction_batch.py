@@ -0,0 +1,24 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+@pytest.mark.parametrize('leg', [
+    {'symbol': 123, 'type': 'BUY', 'shares': 1},
+    {'symbol': ['AAPL'], 'type': 'BUY', 'shares': 1},
+    {'symbol': 'AAPL', 'type': 'BUY', 'shares': 'nan'},
+    {'symbol': 'AAPL', 'type': 'BUY', 'shares': 'inf'},
+    {'symbol': '  ', 'type': 'BUY', 'shares': 1},
+])
+def test_invalid_legs_are_rejected(app, client, leg):
+    user = User(username='trader', email='trader@example.com', balance=1000.0)
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    response = client.post('/api/transaction/batch', headers=headers, json={'orders': [leg]})
+
+    assert response.status_code == 400
+    assert Transaction.query.count() == 0
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+@pytest.fixture
+def history(app):
+    user = User(username='trader', email='trader@example.com', balance=0.0)
+    other = User(username='other', email='other@example.com', balance=0.0)
+    db.session.add_all([user, other])
+    db.session.flush()
+    start = datetime(2025, 1, 2, 15)
+    # Pairs share a timestamp, so the cursor has to break ties on id
+    for i in range(7):
+        db.session.add(Transaction(
+            user_id=user.id, symbol=f'S{i}', shares=1.0, price=10.0 + i, type='BUY',
+            timestamp=start + timedelta(minutes=i // 2)
+        ))
+    db.session.add(Transaction(user_id=other.id, symbol='X', shares=1.0, price=1.0, type='BUY', timestamp=start))
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+def _expected():
+    return [f'S{i}' for i in (6, 5, 4, 3, 2, 1, 0)]
+
+
+def test_cursor_pages_cover_every_row_once(client, history):
+    symbols = []
+    url = '/api/transaction/history?limit=3&fields=symbol,price'
+    while url:
+        response = client.get(url, headers=history)
+        assert response.status_code == 200
+        symbols += [item['symbol'] for item in response.json]
+        assert set(response.json[0]) == {'symbol', 'price'}
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/transaction/history?limit=3&fields=symbol,price&cursor={cursor}' if cursor else None
+
+    assert symbols == _expected()
+
+
+def test_streamed_formats_return_the_full_history(client, history):
+    ndjson = client.get('/api/transaction/history?format=ndjson&fields=symbol', headers=history)
+    assert [json.loads(line)['symbol'] for line in ndjson.get_data(as_text=True).splitlines()] == _expected()
+
+    csv = client.get('/api/transaction/history?format=csv&fields=symbol', headers=history)
+    assert csv.mimetype == 'text/csv'
+    assert csv.get_data(as_text=True).split() == ['symbol'] + _expected()
+
+
+@pytest.mark.parametrize('query', ['cursor=not-a-cursor', 'limit=0', 'fields=password', 'format=xml'])
+def test_invalid_arguments_are_rejected(client, history, query):
+    assert client.get(f'/api/transaction/history?{query}', headers=history).status_code == 400
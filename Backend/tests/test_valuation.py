@@ -0,0 +1,45 @@
+from app import db
+from app.models.portfolio import Portfolio
+from app.models.user import User
+from app.services.valuation import Holdings, Valuation, value_users
+
+
+def test_valuation_matches_per_holding_arithmetic():
+    holdings = Holdings([(1, 'aapl', 10.0, 100.0), (1, 'MSFT', 2.0, 300.0), (2, 'AAPL', 5.0, 120.0)])
+    prices = {'AAPL': {'price': 110.0}, 'MSFT': {'error': 'No data found for the symbol'}}
+
+    valuation = Valuation(holdings, prices)
+
+    # MSFT has no quote, so it is valued at its average price
+    assert valuation.market_price.tolist() == [110.0, 300.0, 110.0]
+    assert valuation.total_value == 10 * 110 + 2 * 300 + 5 * 110
+    assert valuation.total_cost == 10 * 100 + 2 * 300 + 5 * 120
+    assert valuation.totals_by_user() == {
+        1: {'portfolio_value': 1700.0, 'total_cost_basis': 1600.0, 'net_gain_loss': 100.0},
+        2: {'portfolio_value': 550.0, 'total_cost_basis': 600.0, 'net_gain_loss': -50.0},
+    }
+    assert valuation.rows()[0] == {
+        'symbol': 'AAPL', 'shares': 10.0, 'avg_price': 100.0, 'market_price': 110.0,
+        'market_value': 1100.0, 'profit': 100.0, 'total_invested': 1000.0
+    }
+
+
+def test_empty_holdings_value_to_zero():
+    valuation = Valuation(Holdings([]), {})
+
+    assert valuation.total_value == 0.0
+    assert valuation.rows() == []
+    assert valuation.totals_by_user() == {}
+
+
+def test_value_users_prices_stored_holdings(app, replay_quote):
+    replay_quote('AAA', 12.0)
+    user = User(username='holder', email='holder@example.com', balance=0.0)
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Portfolio(user_id=user.id, symbol='AAA', shares=3.0, avg_price=10.0))
+    db.session.commit()
+
+    assert value_users([user.id]) == {
+        user.id: {'portfolio_value': 36.0, 'total_cost_basis': 30.0, 'net_gain_loss': 6.0}
+    }